@@ -24,6 +24,10 @@ if __name__ != '__main__':
     app.logger.handlers = gunicorn_logger.handlers
     app.logger.setLevel(gunicorn_logger.level)
 
+# Time subprocesses and outbound requests of the modules imported below
+from common.utils import instrumentation
+instrumentation.install_hooks()
+
 from api import extensions, views
 from api.default_settings import DefaultConfig
 
@@ -42,5 +46,10 @@ def get_locale():
 from common.extensions.database import db
 migrate = Migrate(app, db)
 
+from common.utils import pagecache
+pagecache.track_table_changes()
+
+instrumentation.instrument(app, 'api')
+
 api = extensions.create_api(app)
 views.register_blueprints(api)
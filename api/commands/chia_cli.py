@@ -28,7 +28,7 @@ from common.models import plots as p, plottings as pl
 from common.utils import converters
 from api import app, utils
 from api.models import chia
-from api.commands import websvcs
+from api.commands import rpc, websvcs
 
 # When reading tail of chia plots check output, limit to this many lines
 MAX_LOG_LINES = 2000
@@ -39,9 +39,18 @@ WALLET_SETTINGS_FILE = '/root/.chia/machinaris/config/wallet_settings.json'
 # Blockchains which dropped compatibility with `show -c` commands around v1.6
 BLOCKCHAINS_USING_PEER_CMD = ['cactus', 'chia', 'chinilla', 'littlelambocoin', 'maize', 'one', 'tad']
 
+# Legacy blockchains lag Chia's RPC clients, so they are still scraped via their CLI
+def rpc_supported(blockchain):
+    return not globals.legacy_blockchain(blockchain)
+
 def load_farm_summary(blockchain):
     chia_binary = globals.get_blockchain_binary(blockchain)
     if globals.farming_enabled():
+        if rpc_supported(blockchain):
+            try:
+                return chia.FarmSummary([], blockchain, rpc_summary=rpc.RPC().get_farm_summary(blockchain))
+            except Exception as ex:
+                app.logger.info("Falling back to CLI for {0} farm summary as RPC failed: {1}".format(blockchain, str(ex)))
         proc = Popen("{0} farm summary".format(chia_binary), stdout=PIPE, stderr=PIPE, shell=True)
         try:
             outs, errs = proc.communicate(timeout=30)
@@ -85,6 +94,11 @@ def save_config(config, blockchain):
 def load_wallet_show(blockchain):
     if not globals.wallet_running():
         return None
+    if rpc_supported(blockchain):
+        try:
+            return chia.Wallet("", blockchain, rpc_balances=rpc.RPC().get_wallet_balances())
+        except Exception as ex:
+            app.logger.info("Falling back to CLI for {0} wallet show as RPC failed: {1}".format(blockchain, str(ex)))
     chia_binary = globals.get_blockchain_binary(blockchain)
     wallet_show = ""
     child = pexpect.spawn("{0} wallet show".format(chia_binary))
@@ -109,6 +123,11 @@ def load_wallet_show(blockchain):
     return chia.Wallet(wallet_show)
 
 def load_blockchain_show(blockchain):
+    if rpc_supported(blockchain):
+        try:
+            return chia.Blockchain([], rpc_state=rpc.RPC().get_blockchain_state())
+        except Exception as ex:
+            app.logger.info("Falling back to CLI for {0} blockchain show as RPC failed: {1}".format(blockchain, str(ex)))
     chia_binary = globals.get_blockchain_binary(blockchain)
     proc = Popen("{0} show --state".format(chia_binary), stdout=PIPE, stderr=PIPE, shell=True)
     try:
@@ -122,6 +141,11 @@ def load_blockchain_show(blockchain):
     return chia.Blockchain(globals.strip_data_layer_msg(outs.decode('utf-8').splitlines()))
 
 def load_connections_show(blockchain):
+    if rpc_supported(blockchain):
+        try:
+            return chia.Connections([], rpc_connections=rpc.RPC().get_connections())
+        except Exception as ex:
+            app.logger.info("Falling back to CLI for {0} connections show as RPC failed: {1}".format(blockchain, str(ex)))
     chia_binary = globals.get_blockchain_binary(blockchain)
     if blockchain in BLOCKCHAINS_USING_PEER_CMD:  # These now support only the 'peer' command
         proc = Popen("{0} peer -c full_node".format(chia_binary), stdout=PIPE, stderr=PIPE, shell=True)
@@ -137,7 +161,28 @@ def load_connections_show(blockchain):
         raise Exception("For connections show, the process timeout expired!")
     return chia.Connections(globals.strip_data_layer_msg(outs.decode('utf-8').splitlines()))
 
+# Deriving the farmer/pool keys and first address needs the keychain, so `keys show` output is
+# cached and only re-run when the wallet RPC reports a different set of key fingerprints.  Keys are
+# added by the WebUI's process, so without fingerprints to compare, the command is run every time.
+last_keys_show = None
+last_keys_show_load_time = None
 def load_keys_show(blockchain):
+    global last_keys_show, last_keys_show_load_time
+    fingerprints = None
+    if rpc_supported(blockchain):
+        try:
+            fingerprints = rpc.RPC().get_key_fingerprints()
+        except Exception as ex:
+            app.logger.debug("Unable to list {0} key fingerprints via RPC: {1}".format(blockchain, str(ex)))
+    if fingerprints is not None and last_keys_show and last_keys_show_load_time >= \
+            (datetime.datetime.now() - datetime.timedelta(days=globals.RELOAD_MINIMUM_DAYS)):
+        if fingerprints == last_keys_show.fingerprints:
+            return last_keys_show
+    last_keys_show = chia.Keys(run_keys_show(blockchain), fingerprints)
+    last_keys_show_load_time = datetime.datetime.now()
+    return last_keys_show
+
+def run_keys_show(blockchain):
     chia_binary = globals.get_blockchain_binary(blockchain)
     # If a legacy blockchain that hasn't kept pace with Chia, there is only non-observer key
     if globals.legacy_blockchain(blockchain):
@@ -152,7 +197,7 @@ def load_keys_show(blockchain):
         proc.kill()
         proc.communicate()
         raise Exception("For keys show, the process timeout expired!")
-    return chia.Keys(globals.strip_data_layer_msg(outs.decode('utf-8').splitlines()))
+    return globals.strip_data_layer_msg(outs.decode('utf-8').splitlines())
 
 def restart_farmer(blockchain):
     chia_binary = globals.get_blockchain_binary(blockchain)
@@ -283,7 +328,7 @@ def dispatch_action(job):
         if action == 'restart':
             restart_farmer(blockchain)
         elif action == 'delete_for_replotting':
-            delete_plots(blockchain, job['free_ksize'], job['plot_files'])
+            delete_plots(blockchain, job['free_ksize'], job['plot_files'], job.get('free_gibs'))
     elif service == 'wallet':
         if action == 'start':
             start_wallet(blockchain)
@@ -380,7 +425,7 @@ def get_free_bytes(dir):  # Unused as shutil gives this more easily
         app.logger.error("Failed to determine free space for {0} because {1}".format(dir, str(ex)))
     return 0
 
-def delete_plots(blockchain, free_ksize, plot_files):
+def delete_plots(blockchain, free_ksize, plot_files, free_gibs=None):
     if not blockchain in pl.PLOTTABLE_BLOCKCHAINS:
         app.logger.error("REPLOT: {0} is not a plottable blockchain so no plot deletes allowed.".format(blockchain.capitalize()))
         return
@@ -390,7 +435,11 @@ def delete_plots(blockchain, free_ksize, plot_files):
             total, used, free = shutil.disk_usage(dir)
             #free = get_free_bytes(dir) # Use shutil instead.
             app.logger.debug("REPLOT: For {0} found {1} free space.".format(dir, converters.sizeof_fmt(free)))
-            if (free == 0) or (free >= (p.FREE_GIBS_REQUIRED_FOR_KSIZE[free_ksize] * 1024 * 1024 * 1024)):
+            # Controller may ask for room for several pending plots on this disk, else just one
+            required_gibs = p.FREE_GIBS_REQUIRED_FOR_KSIZE[free_ksize]
+            if free_gibs and dir in free_gibs:
+                required_gibs = free_gibs[dir]
+            if (free == 0) or (free >= (required_gibs * 1024 * 1024 * 1024)):
                 app.logger.info("REPLOT: Skipping plot deletion request as found {0} of free space on disk. Plot: {1}".format(converters.sizeof_fmt(free), plot_file))
                 continue # Also treat free space of exactly zero as highly suspicious and don't delete plots in that case
             app.logger.info("REPLOT: With only {0} free space on disk, removing old plot file: {1}".format(converters.sizeof_fmt(free), plot_file))
@@ -0,0 +1,156 @@
+#
+# Farm-wide metrics held by the controller, exported at /metrics/openmetrics.
+# Request handlers update the registry as workers send their plots, challenges and partials.
+# Scheduled jobs run in the gunicorn master process rather than the request worker, so their
+# metrics are kept in the same registry there and periodically saved to the cache folder.
+#
+
+import datetime
+import os
+import re
+import threading
+import time
+import traceback
+
+from common.extensions.database import db
+from common.models import plots as p
+from common.models import challenges as c
+from common.utils import caches, metrics
+from api import app
+
+SCHEDULER_METRICS_FILE = caches.CACHE_DIR + '/scheduler_metrics.json'
+
+# Saving the scheduler metrics after every job would rewrite the file several times a second
+SCHEDULER_METRICS_SAVE_SECS = 15
+
+PLOT_KSIZE = re.compile(r'-k(\d+)-')
+
+registry = metrics.Registry()
+
+plots_count = registry.gauge('machinaris_plots',
+    "Plots farmed, by harvester and ksize.", ('hostname', 'blockchain', 'ksize'))
+plots_bytes = registry.gauge('machinaris_plots_size_bytes',
+    "Size of plots farmed, by harvester and ksize.", ('hostname', 'blockchain', 'ksize'))
+challenges = registry.counter('machinaris_challenges',
+    "Challenges received from farmers.", ('hostname', 'blockchain'))
+proofs_found = registry.counter('machinaris_proofs_found',
+    "Proofs found in challenges received from farmers.", ('hostname', 'blockchain'))
+challenge_lookup = registry.histogram('machinaris_challenge_lookup_seconds',
+    "Time taken by harvesters to look up plots for a challenge.", ('hostname', 'blockchain'),
+    buckets=[ ms / 1000 for ms in c.LOOKUP_BUCKETS_MS ])
+partials = registry.counter('machinaris_partials',
+    "Partials submitted to pools.", ('blockchain', 'pool_url'))
+worker_ping = registry.histogram('machinaris_worker_ping_seconds',
+    "Round trip time of the controller's ping to each worker.", ('hostname', 'port'))
+worker_up = registry.gauge('machinaris_worker_up',
+    "Whether the worker responded to the controller's last ping.", ('hostname', 'port'))
+scheduler_job = registry.histogram('machinaris_scheduler_job_seconds',
+    "Duration of scheduled jobs.", ('job',))
+scheduler_job_errors = registry.counter('machinaris_scheduler_job_errors',
+    "Scheduled jobs which raised an exception.", ('job',))
+database_bytes = registry.gauge('machinaris_database_size_bytes',
+    "Size on disk of each controller database, including its write-ahead log.", ('database',))
+
+last_saved = { 'at': 0 }
+save_lock = threading.Lock()
+
+def plot_ksize(file):
+    match = PLOT_KSIZE.search(file)
+    return match.group(1) if match else 'unknown'
+
+def record_plots(hostname, blockchain):
+    # Plots are added and removed in batches per harvester, so recount just that harvester's plots
+    try:
+        rows = db.session.query(p.Plot.file, p.Plot.size).filter(p.Plot.hostname == hostname, p.Plot.blockchain == blockchain).all()
+        counts, sizes = {}, {}
+        for row in rows:
+            ksize = plot_ksize(row.file)
+            counts[ksize] = counts.get(ksize, 0) + 1
+            sizes[ksize] = sizes.get(ksize, 0) + row.size
+        for gauge, values in [(plots_count, counts), (plots_bytes, sizes)]:
+            gauge.replace({ (hostname, blockchain, ksize): value for ksize, value in values.items() }, prefix=(hostname, blockchain))
+    except Exception as ex:
+        app.logger.error("Failed to record plot metrics for {0} because {1}".format(hostname, str(ex)))
+
+def record_blockchain_plots(blockchain):
+    # After a full or partial re-sync of a blockchain's plots, like chia's from the farmer RPC in the scheduler
+    try:
+        hostnames = set([ row.hostname for row in db.session.query(p.Plot.hostname).filter(p.Plot.blockchain == blockchain).distinct() ])
+        with plots_count.lock:  # Also harvesters which no longer have any plots
+            hostnames.update([ key[0] for key in plots_count.values.keys() if key[1] == blockchain ])
+    except Exception as ex:
+        app.logger.error("Failed to record {0} plot metrics because {1}".format(blockchain, str(ex)))
+        return
+    for hostname in hostnames:
+        record_plots(hostname, blockchain)
+
+def record_challenges(items):
+    for item in items:
+        challenges.inc(item.hostname, item.blockchain)
+        if item.proofs_found:
+            proofs_found.inc(item.hostname, item.blockchain, amount=item.proofs_found)
+        if item.time_ms is not None:
+            challenge_lookup.observe(item.hostname, item.blockchain, value=item.time_ms / 1000)
+
+def record_partials(items):
+    for item in items:
+        partials.inc(item.blockchain, item.pool_url)
+
+def record_ping(worker, seconds):
+    if seconds is None:
+        worker_up.set(worker.hostname, worker.port, value=0)
+    else:
+        worker_up.set(worker.hostname, worker.port, value=1)
+        worker_ping.observe(worker.hostname, worker.port, value=seconds)
+
+def save_scheduler_metrics(force=False):
+    with save_lock:
+        if not force and time.time() - last_saved['at'] < SCHEDULER_METRICS_SAVE_SECS:
+            return
+        last_saved['at'] = time.time()
+    caches.get_cache(SCHEDULER_METRICS_FILE).save(registry.snapshot())
+
+def scheduler_listener(scheduler):
+    """
+    Returns an APScheduler listener for job executed and error events, timing each job by name.
+    Jobs are timed from their scheduled run time, so this includes any wait for a free executor thread.
+    """
+    names = {}
+    def listener(event):
+        try:
+            if not event.job_id in names:
+                job = scheduler.get_job(event.job_id)
+                names[event.job_id] = job.name if job else event.job_id
+            seconds = (datetime.datetime.now(datetime.timezone.utc) - event.scheduled_run_time).total_seconds()
+            scheduler_job.observe(names[event.job_id], value=max(seconds, 0))
+            if event.exception:
+                scheduler_job_errors.inc(names[event.job_id])
+            save_scheduler_metrics()
+        except Exception as ex:
+            app.logger.error("Failed to record scheduler job metrics because {0}".format(str(ex)))
+    return listener
+
+def record_database_sizes():
+    # A stat of each file, not a query, so cheap enough to refresh on scrape
+    sizes = {}
+    for bind, uri in app.config.get('SQLALCHEMY_BINDS', {}).items():
+        path = uri.replace('sqlite:///', '', 1)
+        size = 0
+        for file in [path, path + '-wal']:
+            try:
+                size += os.stat(file).st_size
+            except FileNotFoundError:
+                pass
+        sizes[(bind,)] = size
+    database_bytes.replace(sizes)
+
+def openmetrics():
+    record_database_sizes()
+    scheduler_snapshot = {}
+    try:
+        scheduler_snapshot = caches.get_cache(SCHEDULER_METRICS_FILE).load()
+    except Exception as ex:
+        app.logger.error("Failed to load scheduler metrics because {0}".format(str(ex)))
+        app.logger.error(traceback.format_exc())
+    # Series of both processes are rendered, like chives plots sent here and chia plots synced by the scheduler
+    return metrics.render(registry.snapshot(), scheduler_snapshot)
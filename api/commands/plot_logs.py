@@ -0,0 +1,127 @@
+#
+# Index of plotman job logs by plot id, kept in a small SQLite file beside the logs.
+# Only new or still-growing log files are read on each refresh, rather than the head
+# of every log file for every plot analyze request.
+#
+
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+import traceback
+
+from api import app
+
+LOGS_DIR = '/root/.chia/plotman/logs'
+INDEX_FILE = '/root/.chia/plotman/logs_index.db'
+
+# Plot id is written within the first few lines of chia, madmax and bladebit job logs
+HEAD_LINES = 50
+PLOT_ID_PATTERN = re.compile(r'\b([0-9a-f]{64})\b')
+
+# A log without a plot id yet is re-read while it is still being written, then given up on
+PENDING_LOG_SECS = 24 * 60 * 60
+
+index_lock = threading.Lock()
+last_refresh = { 'dir_mtime': None, 'pending': {} }
+
+def is_job_log(filename):
+    return filename.endswith(".log") and not filename.startswith('plotman.') and not filename.startswith('archiver.')
+
+def connect():
+    conn = sqlite3.connect(INDEX_FILE, timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS job_logs (log_file TEXT PRIMARY KEY, mtime REAL, plot_id TEXT)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_job_logs_plot_id ON job_logs (plot_id)")
+    return conn
+
+def read_plot_id(log_path):
+    try:
+        with open(log_path) as logfile:
+            for line in itertools.islice(logfile, 0, HEAD_LINES):
+                match = PLOT_ID_PATTERN.search(line)
+                if match:
+                    return match.group(1)
+    except:
+        app.logger.info("plot_logs: Skipping error when reading head of {0}".format(log_path))
+        app.logger.info(traceback.format_exc())
+    return None
+
+def scan_dir(conn):
+    # Directory mtime changed, so files were added or removed: reconcile the whole listing
+    indexed = { row[0]: row[1:] for row in conn.execute("SELECT log_file, mtime, plot_id FROM job_logs").fetchall() }
+    seen = set()
+    with os.scandir(LOGS_DIR) as entries:
+        for entry in entries:
+            if not entry.is_file() or not is_job_log(entry.name):
+                continue
+            seen.add(entry.name)
+            mtime = entry.stat().st_mtime
+            if entry.name in indexed and (indexed[entry.name][1] or indexed[entry.name][0] == mtime):
+                continue  # Plot id already known, or log unchanged since last read
+            conn.execute("INSERT OR REPLACE INTO job_logs (log_file, mtime, plot_id) VALUES (?, ?, ?)",
+                (entry.name, mtime, read_plot_id(entry.path)))
+    removed = [ (log_file,) for log_file in indexed if not log_file in seen ]
+    conn.executemany("DELETE FROM job_logs WHERE log_file = ?", removed)
+    return dict(conn.execute("SELECT log_file, mtime FROM job_logs WHERE plot_id IS NULL AND mtime > ?",
+        (time.time() - PENDING_LOG_SECS,)).fetchall())
+
+def scan_pending(conn, pending):
+    # Directory unchanged, but logs of just-started jobs may have written their plot id since
+    for log_file, mtime in list(pending.items()):
+        log_path = os.path.join(LOGS_DIR, log_file)
+        try:
+            current_mtime = os.stat(log_path).st_mtime
+        except FileNotFoundError:
+            del pending[log_file]
+            continue
+        if current_mtime == mtime:
+            continue
+        plot_id = read_plot_id(log_path)
+        conn.execute("UPDATE job_logs SET mtime = ?, plot_id = ? WHERE log_file = ?", (current_mtime, plot_id, log_file))
+        if plot_id or time.time() - current_mtime > PENDING_LOG_SECS:
+            del pending[log_file]
+        else:
+            pending[log_file] = current_mtime
+    return pending
+
+def refresh_index():
+    if not os.path.isdir(LOGS_DIR):
+        return
+    with index_lock:
+        time_start = time.time()
+        dir_mtime = os.stat(LOGS_DIR).st_mtime
+        conn = connect()
+        try:
+            with conn:
+                if dir_mtime != last_refresh['dir_mtime']:
+                    last_refresh['pending'] = scan_dir(conn)
+                    last_refresh['dir_mtime'] = dir_mtime
+                    app.logger.debug("plot_logs: Indexed job logs in {0} seconds.".format(round(time.time()-time_start, 2)))
+                elif last_refresh['pending']:
+                    last_refresh['pending'] = scan_pending(conn, last_refresh['pending'])
+        finally:
+            conn.close()
+
+def find_job_logs(plot_ids):
+    """Returns a map of plot id to the full path of its job log, for those plot ids found on this plotter."""
+    found = {}
+    try:
+        refresh_index()
+        if not os.path.exists(INDEX_FILE):
+            return found
+        plot_ids = list(set(plot_ids))
+        conn = connect()
+        try:
+            for i in range(0, len(plot_ids), 500):
+                batch = plot_ids[i:i+500]
+                rows = conn.execute("SELECT plot_id, log_file FROM job_logs WHERE plot_id IN ({0})".format(
+                    ','.join('?' * len(batch))), batch).fetchall()
+                for plot_id, log_file in rows:
+                    found[plot_id] = os.path.join(LOGS_DIR, log_file)
+        finally:
+            conn.close()
+    except Exception as ex:
+        app.logger.error("Failed to look up plotting job logs because: {0}".format(str(ex)))
+    return found
@@ -20,6 +20,8 @@ from flask import Flask, jsonify, abort, request, flash
 from subprocess import Popen, TimeoutExpired, PIPE, DEVNULL
 from api.models import plotman
 from api import app
+from api.commands import plot_logs
+from common.utils import plot_analyzer
 
 PLOTMAN_CONFIG = '/root/.chia/plotman/plotman.yaml'
 PLOTMAN_SAMPLE = '/machinaris/config/plotman.sample.yaml'
@@ -31,6 +33,13 @@ RELOAD_MINIMUM_SECS = 30
 # Only load this many recent transfer log files, ignore older ones
 NUM_RECENT_TRANSFER_LOGS = 25
 
+# Older plotman versions only print the status table, checked on first call
+status_json_supported = { 'value': True }
+
+ARCHIVING_LOGS_DIR = '/root/.chia/plotman/logs/archiving'
+
+transfer_tracker = plotman.TransferTracker(ARCHIVING_LOGS_DIR, NUM_RECENT_TRANSFER_LOGS)
+
 def check_plotter(plotter_path):
     if not os.path.exists(plotter_path):
         raise Exception("Plotter not yet built at {0}. Please allow 15 minutes for startup.".format(plotter_path))
@@ -49,6 +58,7 @@ def check_config():
                 elif config['plotting']['type'] == 'bladebit':
                     check_plotter('/usr/bin/bladebit')
                 # Chia/Chives default plotters are built-into the image itself.
+    return config
 
 def check_script():
     if not os.path.exists(PLOTMAN_SCRIPT):
@@ -59,7 +69,25 @@ def load_plotting_summary():
     if not check_script():
         raise Exception("No plotman script found yet at {0}. Container probably just launched. Please allow 15 minutes for startup." \
                 .format(PLOTMAN_SCRIPT))
-    check_config()
+    config = check_config()
+    if status_json_supported['value']:
+        proc = Popen("{0} {1}".format(PLOTMAN_SCRIPT,
+                    'status --json'), stdout=PIPE, stderr=PIPE, shell=True)
+        try:
+            outs, errs = proc.communicate(timeout=90)
+        except TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise Exception("The timeout expired during plotman status.")
+        if proc.returncode == 0 and not errs:
+            plotter = 'chia'
+            if config and 'plotting' in config and 'type' in config['plotting']:
+                plotter = config['plotting']['type']
+            return plotman.PlottingSummary.from_json(json.loads(outs.decode('utf-8')), plotter, get_plotman_pid())
+        if not '--json' in errs.decode('utf-8'):
+            raise Exception("Errors during plotman status:\n {0}".format(errs.decode('utf-8')))
+        app.logger.info("Plotman status does not support --json, so falling back to parsing its status table.")
+        status_json_supported['value'] = False
     proc = Popen("{0} {1}".format(PLOTMAN_SCRIPT,
                  'status'), stdout=PIPE, stderr=PIPE, shell=True)
     try:
@@ -73,21 +101,29 @@ def load_plotting_summary():
     cli_stdout = outs.decode('utf-8')
     return plotman.PlottingSummary(cli_stdout.splitlines(), get_plotman_pid())
 
-def load_archiving_summary():
-    # First collect any running rsync processes to see if transfer(s) are still in progress
-    rsync_processes = []
-    for process in psutil.process_iter():
-        cmdline = process.cmdline()
+def load_running_transfers():
+    running_transfers = []
+    for process in psutil.process_iter(['name']):
+        if process.info['name'] != 'rsync':
+            continue
+        try:
+            cmdline = process.cmdline()
+        except psutil.Error:
+            continue  # Rsync exited since listed
         if cmdline and (len(cmdline) > 0) and cmdline[0] == 'rsync' and '--info=progress2' in cmdline:
             app.logger.info("Found running rsync transfer: {0} {1}".format(process.pid, cmdline))
-            rsync_processes.append(process)
-    # Then load most recent transfers (running and not) from archiving log folder
-    transfers = []
-    for transfer_log in sorted(glob.iglob('/root/.chia/plotman/logs/archiving/*.transfer.log'), key=os.path.getctime, reverse=True)[:NUM_RECENT_TRANSFER_LOGS]:
-        transfer = plotman.Transfer(transfer_log, rsync_processes)
-        if transfer and transfer.log_file:
-            transfers.append(transfer)
-    return transfers
+            for piece in cmdline:
+                if piece.startswith('/') and piece.endswith('.plot'):
+                    running_transfers.append(piece)
+    return running_transfers
+
+def load_archiving_summary():
+    # Pick up any new transfer logs, then collect running rsync processes only if a transfer may still be in progress
+    transfer_tracker.discover()
+    running_transfers = []
+    if transfer_tracker.has_incomplete():
+        running_transfers = load_running_transfers()
+    return transfer_tracker.load(running_transfers)
 
 def dispatch_action(job):
     if not check_script():
@@ -257,44 +293,41 @@ def save_config(config, blockchain):
         start_archiver()
 
 def find_plotting_job_log(plot_id):
-    dir_path = '/root/.chia/plotman/logs'
-    directory = os.fsencode(dir_path)
-    for file in os.listdir(directory):
-        filename = os.fsdecode(file)
-        try:
-            if filename.endswith(".log") and not filename.startswith('plotman.') and not filename.startswith('archiver.'):
-                with open(os.path.join(str(dir_path), filename)) as logfile:
-                    for line in itertools.islice(logfile, 0, 50):
-                        if plot_id in line:
-                            return os.path.join(str(dir_path), filename)
-                continue
-            else:
-                continue
-        except:
-            app.logger.info("find_plotting_job_log: Skipping error when reading head of {0}".format(filename))
-            app.logger.info(traceback.format_exc())
+    return plot_logs.find_job_logs([plot_id]).get(plot_id)
+
+def plot_id_of(plot_file):
+    groups = re.match("plot(?:-mmx)?-k(\\d+)-(\\d+)-(\\d+)-(\\d+)-(\\d+)-(\\d+)-(\\w+).plot", plot_file)
+    if groups:
+        return groups[7]
     return None
 
 def analyze(plot_file):
-    groups = re.match("plot(?:-mmx)?-k(\d+)-(\d+)-(\d+)-(\d+)-(\d+)-(\d+)-(\w+).plot", plot_file)
-    if not groups:
+    plot_id = plot_id_of(plot_file)
+    if not plot_id:
         return "Invalid plot file name provided: {0}".format(plot_file)
-    plot_log_file = find_plotting_job_log(groups[7])
+    plot_log_file = find_plotting_job_log(plot_id)
     if plot_log_file:
-        proc = Popen("{0} {1} {2}".format(
-            PLOTMAN_SCRIPT,'analyze', plot_log_file), stdout=PIPE, stderr=PIPE, shell=True)
-        try:
-            outs, errs = proc.communicate(timeout=90)
-            if errs:
-                app.logger.error(errs.decode('utf-8'))
-                raise Exception("Failed to analyze plot.")
-        except TimeoutExpired:
-            proc.kill()
-            proc.communicate()
-            raise Exception("The timeout is expired attempting to start plot analyze.")
-        return outs.decode('utf-8')
+        record = plot_analyzer.analyze_file(plot_log_file)
+        if record:
+            return plot_analyzer.format_text(record)
     return None
 
+def analyze_batch(plot_files):
+    # Only plots whose job log is on this plotter are returned, so the controller can ask the next plotter for the rest
+    plot_ids = {}
+    for plot_file in plot_files:
+        plot_id = plot_id_of(plot_file)
+        if plot_id:
+            plot_ids[plot_file] = plot_id
+    plot_log_files = plot_logs.find_job_logs(plot_ids.values())
+    results = {}
+    for plot_file, plot_id in plot_ids.items():
+        if plot_id in plot_log_files:
+            record = plot_analyzer.analyze_file(plot_log_files[plot_id])
+            if record:
+                results[plot_file] = record
+    return results
+
 def get_prometheus_metrics():
     check_config()
     proc = Popen("{0} {1}".format(PLOTMAN_SCRIPT,
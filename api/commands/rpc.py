@@ -248,6 +248,30 @@ class RPC:
         invalid_plots = asyncio.run(self._load_harvester_warnings())
         return invalid_plots
 
+    # Get blockchain sync state and peak from the fullnode, replaces `chia show --state`
+    def get_blockchain_state(self):
+        return asyncio.run(self._load_blockchain_state())
+
+    # Get peer connections of the fullnode, replaces `chia show --connections`
+    def get_connections(self):
+        return asyncio.run(self._load_connections())
+
+    # Get farm summary from fullnode, farmer, and wallet, replaces `chia farm summary`
+    def get_farm_summary(self, blockchain):
+        return asyncio.run(self._load_farm_summary(blockchain))
+
+    # Get wallet sync status and balances, replaces `chia wallet show`
+    def get_wallet_balances(self):
+        if not globals.wallet_running():
+            return None
+        return asyncio.run(self._load_wallet_balances())
+
+    # Get fingerprints of all keys known to the wallet, used to detect changes to `chia keys show`
+    def get_key_fingerprints(self):
+        if not globals.wallet_running():
+            return None
+        return asyncio.run(self._load_key_fingerprints())
+
     # Get status of all pools (aka plotnfts)
     def get_pool_states(self, blockchain):
         pool_states = asyncio.run(self._get_pool_states(blockchain))
@@ -272,6 +296,158 @@ class RPC:
             app.logger.info("Error getting {0} blockchain pool states: {1}".format(blockchain, str(ex)))
         return pools
 
+    # Load the blockchain state, walking back from the peak to the last transaction block for a timestamp
+    async def _load_blockchain_state(self):
+        config = load_fork_config(DEFAULT_ROOT_PATH, 'config.yaml')
+        full_node_rpc_port = config["full_node"]["rpc_port"]
+        full_node = await FullNodeRpcClient.create(
+            'localhost', uint16(full_node_rpc_port), DEFAULT_ROOT_PATH, config
+        )
+        try:
+            result = await full_node.get_blockchain_state()
+            peak = result["peak"]
+            state = {
+                "synced": result["sync"]["synced"],
+                "sync_mode": result["sync"]["sync_mode"],
+                "sync_progress_height": result["sync"]["sync_progress_height"],
+                "sync_tip_height": result["sync"]["sync_tip_height"],
+                "space": int(result["space"]),
+                "difficulty": int(result["difficulty"]),
+                "sub_slot_iters": int(result["sub_slot_iters"]),
+                "peak_height": None,
+                "peak_hash": None,
+                "peak_time": None,
+            }
+            if peak is not None:
+                state["peak_height"] = int(peak.height)
+                state["peak_hash"] = "0x" + peak.header_hash.hex()
+                curr = peak
+                while curr is not None and not curr.is_transaction_block:
+                    curr = await full_node.get_block_record(curr.prev_hash)
+                if curr is not None:
+                    state["peak_time"] = int(curr.timestamp)
+        finally:
+            full_node.close()
+            await full_node.await_closed()
+        return state
+
+    # Load all peer connections of the fullnode
+    async def _load_connections(self):
+        connections = []
+        config = load_fork_config(DEFAULT_ROOT_PATH, 'config.yaml')
+        full_node_rpc_port = config["full_node"]["rpc_port"]
+        full_node = await FullNodeRpcClient.create(
+            'localhost', uint16(full_node_rpc_port), DEFAULT_ROOT_PATH, config
+        )
+        try:
+            for con in await full_node.get_connections():
+                node_id = con["node_id"]
+                connections.append({
+                    "type": int(con["type"]),
+                    "peer_host": con["peer_host"],
+                    "peer_port": con["peer_port"],
+                    "peer_server_port": con["peer_server_port"],
+                    "node_id": node_id.hex() if isinstance(node_id, bytes) else str(node_id).replace('0x', ''),
+                    "last_message_time": con["last_message_time"],
+                    "bytes_read": con["bytes_read"],
+                    "bytes_written": con["bytes_written"],
+                    "peak_height": con.get("peak_height"),
+                    "peak_hash": con.get("peak_hash"),
+                })
+        finally:
+            full_node.close()
+            await full_node.await_closed()
+        return connections
+
+    # Load the same values `chia farm summary` prints, without spawning the CLI
+    async def _load_farm_summary(self, blockchain):
+        summary = {}
+        config = load_fork_config(DEFAULT_ROOT_PATH, 'config.yaml')
+        summary["blockchain_state"] = await self._load_blockchain_state()
+        farmer_rpc_port = config["farmer"]["rpc_port"]
+        farmer = await FarmerRpcClient.create(
+            'localhost', uint16(farmer_rpc_port), DEFAULT_ROOT_PATH, config
+        )
+        try:
+            plot_count = 0
+            plots_size = 0
+            if hasattr(farmer, 'get_harvesters_summary'):  # Counts and sizes only, not the metadata of every plot
+                result = await farmer.get_harvesters_summary()
+                for harvester in result["harvesters"]:
+                    plot_count += harvester["plots"]
+                    plots_size += harvester["total_plot_size"]
+            else:  # Forks predating the summary endpoint
+                result = await farmer.get_harvesters()
+                for harvester in result["harvesters"]:
+                    plot_count += len(harvester["plots"])
+                    plots_size += sum(plot["file_size"] for plot in harvester["plots"])
+            summary["plot_count"] = plot_count
+            summary["plots_size"] = plots_size
+        finally:
+            farmer.close()
+            await farmer.await_closed()
+        summary["farmed_amount"] = None
+        if globals.wallet_running():
+            try:
+                wallet_rpc_port = config["wallet"]["rpc_port"]
+                wallet = await WalletRpcClient.create(
+                    'localhost', uint16(wallet_rpc_port), DEFAULT_ROOT_PATH, config
+                )
+                try:
+                    result = await wallet.get_farmed_amount()
+                finally:
+                    wallet.close()
+                    await wallet.await_closed()
+                summary["farmed_amount"] = result["farmed_amount"] / globals.get_mojos_per_coin(blockchain)
+                summary["fee_amount"] = result["fee_amount"] / globals.get_mojos_per_coin(blockchain)
+            except Exception as ex:
+                app.logger.info("Error getting {0} farmed amount via RPC: {1}".format(blockchain, str(ex)))
+        return summary
+
+    # Load wallet sync status and the balance of each wallet id
+    async def _load_wallet_balances(self):
+        config = load_fork_config(DEFAULT_ROOT_PATH, 'config.yaml')
+        wallet_rpc_port = config["wallet"]["rpc_port"]
+        wallet = await WalletRpcClient.create(
+            'localhost', uint16(wallet_rpc_port), DEFAULT_ROOT_PATH, config
+        )
+        try:
+            balances = {
+                "fingerprint": await wallet.get_logged_in_fingerprint(),
+                "height": int((await wallet.get_height_info())),
+                "synced": await wallet.get_synced(),
+                "syncing": await wallet.get_sync_status(),
+                "wallets": [],
+            }
+            for summary in await wallet.get_wallets():
+                result = await wallet.get_wallet_balance(str(summary["id"]))
+                balances["wallets"].append({
+                    "id": summary["id"],
+                    "name": summary["name"],
+                    "type": summary["type"],
+                    "confirmed_wallet_balance": result["confirmed_wallet_balance"],
+                    "unconfirmed_wallet_balance": result["unconfirmed_wallet_balance"],
+                    "spendable_balance": result["spendable_balance"],
+                })
+        finally:
+            wallet.close()
+            await wallet.await_closed()
+        return balances
+
+    # Load fingerprints of the public keys known to the wallet
+    async def _load_key_fingerprints(self):
+        config = load_fork_config(DEFAULT_ROOT_PATH, 'config.yaml')
+        wallet_rpc_port = config["wallet"]["rpc_port"]
+        wallet = await WalletRpcClient.create(
+            'localhost', uint16(wallet_rpc_port), DEFAULT_ROOT_PATH, config
+        )
+        try:
+            fingerprints = await wallet.get_public_keys()
+        finally:
+            wallet.close()
+            await wallet.await_closed()
+        return sorted(fingerprints)
+
     # Load all plots from all harvesters
     async def _load_all_plots(self):
         all_plots = []
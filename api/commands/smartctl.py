@@ -6,6 +6,10 @@ import http
 import json
 import os
 import requests
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
 
 from flask import Flask, jsonify, abort, request, flash
 from subprocess import Popen, TimeoutExpired, PIPE, STDOUT
@@ -15,6 +19,24 @@ from api.models import drives
 
 SMARTCTL_OVERRIDES_CONFIG = '/root/.chia/machinaris/config/drives_overrides.json'
 
+# Number of drives probed by smartctl at once
+MAX_CONCURRENT_PROBES = 8
+
+# Re-read full `smartctl -a` output at least this often, even if key attributes are unchanged
+FULL_INFO_TTL_SECS = 6 * 60 * 60
+
+# Returned by load_drive_info when a drive is spun down, so it isn't woken
+STANDBY_MODE = 'STANDBY'
+
+# Most recent full drive status by serial number, with the key attributes it was read at
+drives_by_serial = {}
+drives_lock = threading.Lock()
+
+# JSON output was added in smartctl 7.0, checked once against the installed version
+SMARTCTL_JSON_MIN_VERSION = (7, 0)
+json_supported = None
+json_lock = threading.Lock()
+
 def load_smartctl_overrides():
     data = {}
     if os.path.exists(SMARTCTL_OVERRIDES_CONFIG):
@@ -61,24 +83,86 @@ def load_drives_status():
             if not 'device_type' in  devices[device]: # User added override device to list, but accepts default type
                 devices[device]['device_type'] = device_type
             devices[device]['comment'] = comment
-        drive_results = []
-        for device in devices.keys():
-            info = load_drive_info(device, devices[device])
-            if info and not "No such device" in info:
-                #app.logger.info("Smartctl info parsed and device added: {0}".format(device))
-                drive_results.append(drives.DriveStatus(device, devices[device]['device_type'],
-                    devices[device]['comment'], info))
-            else:
-                app.logger.info("Smartctl reports no useful info for {0}".format(device))
-        return drive_results
-
-def load_drive_info(device_name, device_settings):
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PROBES) as executor:
+            results = executor.map(lambda device: probe_drive(device, devices[device]), devices.keys())
+        return [ drive for drive in results if drive ]
+
+def cached_drive(device):
+    with drives_lock:
+        for cached in drives_by_serial.values():
+            if cached['drive'].device == device:
+                return cached['drive']
+    return None
+
+def probe_drive(device, device_settings):
+    try:
+        # Cheap identity and attributes read first, full output only when something worth seeing changed
+        info = load_drive_info(device, device_settings, '-i -A')
+        if info == STANDBY_MODE:
+            app.logger.debug("Smartctl skipping {0} as it is in standby.".format(device))
+            return cached_drive(device)
+        if not info or "No such device" in info:
+            app.logger.info("Smartctl reports no useful info for {0}".format(device))
+            return None
+        probe = drives.DriveStatus(device, device_settings['device_type'], device_settings['comment'], info)
+        with drives_lock:
+            cached = drives_by_serial.get(probe.serial_number)
+        if probe.serial_number and cached and cached['drive'].device == device and \
+                cached['key_attributes'] == probe.key_attributes() and \
+                cached['loaded_at'] > time.time() - FULL_INFO_TTL_SECS:
+            return cached['drive']
+        info = load_drive_info(device, device_settings)
+        if not info or info == STANDBY_MODE or "No such device" in info:
+            app.logger.info("Smartctl reports no useful info for {0}".format(device))
+            return None
+        drive = drives.DriveStatus(device, device_settings['device_type'], device_settings['comment'], info)
+        if drive.serial_number:
+            with drives_lock:
+                drives_by_serial[drive.serial_number] = { 'drive': drive, 
+                    'key_attributes': probe.key_attributes(), 'loaded_at': time.time() }
+        return drive
+    except Exception as ex:
+        app.logger.info("Failed to probe drive {0} because {1}".format(device, str(ex)))
+        return None
+
+def parse_smartctl_version(output):
+    # First line is like: smartctl 7.2 2020-12-30 r5155 [x86_64-linux-5.15.0-58-generic] (local build)
+    for line in output.splitlines():
+        words = line.split()
+        if len(words) > 1 and words[0] == 'smartctl':
+            try:
+                return tuple(int(part) for part in words[1].split('.')[:2])
+            except ValueError:
+                return None
+    return None
+
+def smartctl_supports_json():
+    global json_supported
+    with json_lock:  # Drives are probed concurrently, so only the first asks for the version
+        if json_supported is None:
+            version = None
+            proc = Popen("smartctl --version", stdout=PIPE, stderr=PIPE, shell=True)
+            try:
+                outs, errs = proc.communicate(timeout=10)
+                version = parse_smartctl_version(outs.decode('utf-8'))
+            except TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+            json_supported = version is not None and version >= SMARTCTL_JSON_MIN_VERSION
+            app.logger.info("Smartctl version {0} found, so {1}using JSON output.".format(
+                '.'.join(str(part) for part in version) if version else 'unknown', '' if json_supported else 'not '))
+    return json_supported
+
+def load_drive_info(device_name, device_settings, options='-a'):
     #app.logger.info("{0} -> {1}".format(device_name, device_settings))
+    use_json = smartctl_supports_json()
+    if use_json:  # Typed values to parse, plus the usual text output to display
+        options = options + ' --json=o'
     if 'type_overridden' in device_settings:
-        cmd = "smartctl -a -n standby -d {0} {1}".format(device_settings['device_type'], device_name)
+        cmd = "smartctl {0} -n standby -d {1} {2}".format(options, device_settings['device_type'], device_name)
     else: # No override, use the default auto mode
-        cmd = "smartctl -a -n standby {0}".format(device_name)
-    app.logger.info("Executing: {0}".format(cmd))
+        cmd = "smartctl {0} -n standby {1}".format(options, device_name)
+    app.logger.debug("Executing: {0}".format(cmd))
     proc = Popen(cmd, stdout=PIPE, stderr=PIPE, shell=True)
     try:
         outs, errs = proc.communicate(timeout=10)
@@ -94,6 +178,8 @@ def load_drive_info(device_name, device_settings):
     if (proc.returncode & (1<<0)):
         app.logger.info("Failed commandline parse of {0}".format(cmd))
         return None
+    if (proc.returncode & (1<<1)) and 'STANDBY' in outs.decode('utf-8').upper():
+        return STANDBY_MODE  # Spun down, and `-n standby` kept it that way
     if (proc.returncode & (1<<1)):
         app.logger.info("Device open failed, device did not return an IDENTIFY DEVICE structure, or device is in a low-power mode. {0}".format(cmd))
         return None
@@ -5,25 +5,35 @@
 import trace
 import bs4
 import datetime
+import hashlib
 import http
 import json
 import os
 import re
 import requests
+import sqlalchemy as sa
+import threading
 import time
 import traceback
 
+from concurrent.futures import ThreadPoolExecutor
+
 from common.config import globals
+from common.extensions.database import db
+from common.models import wallets as w
+from common.utils import caches
 from api import app
 
 ALLTHEBLOCKS_REQUEST_INTERVAL_MINS = 15
 ALLTHEBLOCKS_MAX_TRANSACTION_PAGES = 20
+ALLTHEBLOCKS_MAX_CONCURRENT_REQUESTS = 4
+ALLTHEBLOCKS_MIN_REQUEST_INTERVAL_SECS = 0.5
+ALLTHEBLOCKS_URL = os.environ.get('alltheblocks_url', 'https://api.alltheblocks.net')
+WEB_SOURCES_REQUEST_TIMEOUT_SECS = 30
+WEB_SOURCES_FAILURES_TO_OPEN = 3
+WEB_SOURCES_OPEN_MINS = 60
+WEB_SOURCES_METRICS_FILE = '/root/.chia/machinaris/cache/web_sources_metrics.json'
 COLD_WALLET_ADDRESSES_FILE = '/root/.chia/machinaris/config/cold_wallet_addresses.json'
-COLD_WALLET_CACHE_FILE = '/root/.chia/machinaris/cache/cold_wallet_cache.json'
-COLD_WALLET_CACHE_DIR = '/root/.chia/machinaris/cache/cold_wallets'
-BLOCKCHAIN_PRICES_CACHE_FILE = '/root/.chia/machinaris/cache/blockchain_prices_cache.json'
-EXCHANGE_RATES_CACHE_FILE = '/root/.chia/machinaris/cache/exchange_rates_cache.json'
-BLOCKCHAIN_STATUSES_CACHE_FILE = '/root/.chia/machinaris/cache/blockchain_statuses_cache.json'
 SUPPORTED_BLOCKCHAINS = globals.get_supported_blockchains()
 
 def load_cold_wallet_addresses():
@@ -38,66 +48,158 @@ def load_cold_wallet_addresses():
             return data
     return data
 
-def load_cold_wallet_cache():
-    data = {}
-    if os.path.exists(COLD_WALLET_CACHE_FILE):
+class AllTheBlocksClient:
+    """Rate-limited JSON client for AllTheBlocks, shared by all request threads."""
+
+    def __init__(self, base_url, min_interval_secs, session=None):
+        self.base_url = base_url.rstrip('/')
+        self.min_interval_secs = min_interval_secs
+        self.session = session if session else requests.Session()
+        self.lock = threading.Lock()
+        self.next_request_time = 0
+
+    def get_json(self, path, params=None):
+        with self.lock:  # Space out requests across all threads
+            wait_secs = self.next_request_time - time.time()
+            if wait_secs > 0:
+                time.sleep(wait_secs)
+            self.next_request_time = time.time() + self.min_interval_secs
+        return json.loads(self.session.get(self.base_url + path, params=params, timeout=30).content)
+
+# Point ALLTHEBLOCKS_URL at a local fake server, or replace this client, to test without the real API
+atb_client = AllTheBlocksClient(ALLTHEBLOCKS_URL, ALLTHEBLOCKS_MIN_REQUEST_INTERVAL_SECS)
+
+class SourceUnavailable(Exception):
+    pass
+
+class WebSourcesClient:
+    """
+    Pooled HTTP client for the price and chain status sources.  Sends conditional
+    requests where a source returned an ETag or Last-Modified, and stops calling a
+    source for a while after repeated failures, so one dead API can't hold the scheduler.
+    """
+
+    def __init__(self, timeout_secs, failures_to_open, open_mins, session=None):
+        self.timeout_secs = timeout_secs
+        self.failures_to_open = failures_to_open
+        self.open_mins = open_mins
+        if session:
+            self.session = session
+        else:
+            self.session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=8)
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+        self.lock = threading.Lock()
+        self.sources = {}
+
+    def source(self, name):
+        with self.lock:
+            if not name in self.sources:
+                self.sources[name] = { 'etag': None, 'last_modified': None, 'body': None,
+                    'consecutive_failures': 0, 'open_until': None,
+                    'requests': 0, 'failures': 0, 'not_modified': 0, 'skipped': 0,
+                    'last_latency_secs': 0.0, 'total_latency_secs': 0.0, }
+            return self.sources[name]
+
+    def request(self, name, url, method='GET', **kwargs):
+        source = self.source(name)
+        if source['open_until'] and source['open_until'] > time.time():
+            source['skipped'] += 1
+            raise SourceUnavailable("Skipping {0} after {1} consecutive failures.".format(name, source['consecutive_failures']))
+        headers = kwargs.pop('headers', {})
+        if method == 'GET' and source['body'] is not None:
+            if source['etag']:
+                headers['If-None-Match'] = source['etag']
+            if source['last_modified']:
+                headers['If-Modified-Since'] = source['last_modified']
+        start = time.time()
         try:
-            with open(COLD_WALLET_CACHE_FILE) as f:
-                data = json.load(f)
-                # Now verify that cache file is in correct format, else discard
-                for address in data:
-                    try:
-                        data[address]['total_balance']  # Test that format is correct
-                    except Exception as ex:
-                        app.logger.info("Deleting old cold wallet cache file with legacy format. {0}".format(str(ex)))
-                        os.remove(COLD_WALLET_CACHE_FILE)
-                        return {}
-        except Exception as ex:
-            msg = "Unable to read cold wallet cache from {0} because {1}".format(COLD_WALLET_CACHE_FILE, str(ex))
-            app.logger.error(msg)
-            return data
-    return data
+            resp = self.session.request(method, url, headers=headers, timeout=self.timeout_secs, **kwargs)
+            if resp.status_code == 304:
+                source['not_modified'] += 1
+                body = source['body']
+            elif resp.status_code == 200:
+                body = resp.content
+                source['etag'] = resp.headers.get('ETag')
+                source['last_modified'] = resp.headers.get('Last-Modified')
+                source['body'] = body if (source['etag'] or source['last_modified']) else None
+            else:
+                raise Exception("Received {0} from {1}".format(resp.status_code, url))
+        except Exception:
+            source['failures'] += 1
+            source['consecutive_failures'] += 1
+            if source['consecutive_failures'] >= self.failures_to_open:
+                source['open_until'] = time.time() + self.open_mins * 60
+            raise
+        finally:
+            source['requests'] += 1
+            source['last_latency_secs'] = round(time.time() - start, 3)
+            source['total_latency_secs'] = round(source['total_latency_secs'] + source['last_latency_secs'], 3)
+        source['consecutive_failures'] = 0
+        source['open_until'] = None
+        return body
 
-def save_cold_wallet_cache(cold_wallet_cache):
-    app.logger.info("Saving cold wallet cache: {0}".format(cold_wallet_cache))
-    try:
-        with open(COLD_WALLET_CACHE_FILE, 'w') as f:
-            json.dump(cold_wallet_cache, f)
-    except Exception as ex:
-        app.logger.error("Failed to store cold wallet cache in {0} because {1}".format(COLD_WALLET_CACHE_FILE, str(ex)))
-
-def save_cold_wallet_transactions(blockchain, address, cold_wallet_transactions):
-    #app.logger.info("COLD TRANSACTIONS: {0}".format(cold_wallet_transactions))
-    cache_dir =  COLD_WALLET_CACHE_DIR + '/' + blockchain
-    if not os.path.exists(cache_dir):
-        os.makedirs(cache_dir)
-    cache_file = cache_dir + '/' + address + ".json"
-    try:
-        with open(cache_file, 'w') as f:
-            json.dump(cold_wallet_transactions, f)
-    except Exception as ex:
-        app.logger.error("Failed to store cold wallet transactions in {0} because {1}".format(cache_file, str(ex)))
+    def get_text(self, name, url):
+        return self.request(name, url).decode('utf-8')
+
+    def get_json(self, name, url):
+        return json.loads(self.request(name, url))
+
+    def post_json(self, name, url, payload):
+        return json.loads(self.request(name, url, method='POST', data=json.dumps(payload)))
+
+    def metrics(self):
+        metrics = {}
+        with self.lock:
+            for name, source in self.sources.items():
+                metrics[name] = { key: source[key] for key in ['requests', 'failures', 'not_modified', 'skipped',
+                    'consecutive_failures', 'last_latency_secs', 'total_latency_secs'] }
+        return metrics
+
+    def save_metrics(self):
+        caches.get_cache(WEB_SOURCES_METRICS_FILE).save(self.metrics())
+
+web_client = WebSourcesClient(WEB_SOURCES_REQUEST_TIMEOUT_SECS, WEB_SOURCES_FAILURES_TO_OPEN, WEB_SOURCES_OPEN_MINS)
+
+def load_web_sources_metrics():
+    return caches.get_cache(WEB_SOURCES_METRICS_FILE).load()
+
+def transaction_coin_id(transaction):
+    if 'name' in transaction:
+        return transaction['name']
+    if 'coinName' in transaction:
+        return transaction['coinName']
+    # No coin id provided, so key on the whole record instead
+    return hashlib.sha256(json.dumps(transaction, sort_keys=True).encode('utf-8')).hexdigest()
 
 def request_cold_wallet_transactions_page(alltheblocks_blockchain, address, page_num, page_size):
-    url = f"https://api.alltheblocks.net/{alltheblocks_blockchain}/coin/address/{address}"
+    params = {}
     if page_num:
-        url += f"?pageNumber={page_num}"
+        params['pageNumber'] = page_num
     if page_size:
-        url += f"&pageSize={page_size}"
-    response = json.loads(requests.get(url, timeout=30).content)
+        params['pageSize'] = page_size
+    response = atb_client.get_json(f"/{alltheblocks_blockchain}/coin/address/{address}", params)
     #app.logger.info(response)
     return [ response['number'], response['size'], response['totalPages'], response['content'] ]
 
-def request_cold_wallet_transactions(blockchain, alltheblocks_blockchain, address, debug=False):
-    farmed_balance = 0
+def request_new_cold_wallet_transactions(blockchain, alltheblocks_blockchain, address, last_coin_id):
+    # Pages are newest first, so stop at the newest transaction stored by the last request
     records = []
-    app.logger.info("Requesting {0} wallet transactions for {1}".format(alltheblocks_blockchain, address))
+    app.logger.info("Requesting new {0} wallet transactions for {1}".format(alltheblocks_blockchain, address))
     page_num = None
     page_size = None
     while True:
         [page_num, page_size, total_pages, transactions] = request_cold_wallet_transactions_page(alltheblocks_blockchain, address, page_num, page_size)
-        records.extend(transactions)
-        if page_num >= total_pages:
+        caught_up = False
+        for rec in transactions:
+            if last_coin_id and transaction_coin_id(rec) == last_coin_id:
+                caught_up = True
+                break
+            records.append(rec)
+        if caught_up:
+            break  # Caught up with those stored previously
+        elif page_num >= total_pages:
             app.logger.info("Returning last page # {0} out of {1} for {2}".format(page_num, total_pages, blockchain))
             break
         elif page_num >= ALLTHEBLOCKS_MAX_TRANSACTION_PAGES:
@@ -105,122 +207,106 @@ def request_cold_wallet_transactions(blockchain, alltheblocks_blockchain, addres
             break  # have all the pages of response, or as many as we're going to get
         else: # get the next page
             page_num += 1
-    app.logger.info("Found {0} transactions for {1}: {2}.".format(len(records), blockchain, address))
-    for rec in records:
-        if rec['coinType'] == 'FARMER_REWARD':
-            farmed_balance += int(rec['amount']) / globals.get_mojos_per_coin(blockchain)
-    save_cold_wallet_transactions(blockchain, address, records)
-    #app.logger.info("Received cold wallet farmed balance of {0}".format(farmed_balance))
-    return farmed_balance
-
-def request_cold_wallet_balance(blockchain, cold_wallet_cache, alltheblocks_blockchain, address, debug=False):
-    total_balance = 0.0
-    farmed_balance = 0.0
-    if address in cold_wallet_cache: # First initialize to the last good values received.
-        try:
-            if 'total_balance' in cold_wallet_cache[address]:
-                total_balance = cold_wallet_cache[address]['total_balance']
-            if 'farmed_balance' in cold_wallet_cache[address]:
-                farmed_balance = cold_wallet_cache[address]['farmed_balance']
-        except Exception as ex:
-            app.logger.info("During request, deleting old cold wallet cache file with legacy format. {0}".format(str(ex)))
-            os.remove(COLD_WALLET_CACHE_FILE)
+    app.logger.info("Found {0} new transactions for {1}: {2}.".format(len(records), blockchain, address))
+    return records
+
+def request_cold_wallet(blockchain, address, last_coin_id):
+    # Runs on a request thread, so only talks to AllTheBlocks, leaving the database to the caller
+    total_balance = None
+    transactions = None
+    alltheblocks_blockchain = globals.get_alltheblocks_name(blockchain)
     app.logger.info("Requesting {0} wallet balance for {1}".format(alltheblocks_blockchain, address))
-    url = f"https://api.alltheblocks.net/{alltheblocks_blockchain}/address/{address}"
     try:
-        if debug:
-            http.client.HTTPConnection.debuglevel = 1
-        response = json.loads(requests.get(url, timeout=30).content)
+        response = atb_client.get_json(f"/{alltheblocks_blockchain}/address/{address}")
         if 'balance' in response:
             total_balance = response['balance'] / globals.get_mojos_per_coin(blockchain)
             app.logger.info("Received {0} cold wallet total balance of {1}".format(blockchain, total_balance))
         else:
             app.logger.error("Received malformed response from ATB: {0}".format(response))
     except Exception as ex:
-        app.logger.error("Failed to request cold wallet balance for {0} due to {1}".format(url, str(ex)))
-    finally:
-        http.client.HTTPConnection.debuglevel = 0
-    if total_balance > 0:
+        app.logger.error("Failed to request cold wallet balance for {0} {1} due to {2}".format(blockchain, address, str(ex)))
+    if total_balance:
         try:
-            farmed_balance = request_cold_wallet_transactions(blockchain, alltheblocks_blockchain, address, debug)
-            app.logger.info("Received {0} farmed wallet total balance of {1}".format(blockchain, farmed_balance))
+            transactions = request_new_cold_wallet_transactions(blockchain, alltheblocks_blockchain, address, last_coin_id)
         except Exception as ex:
-            app.logger.error("Failed to request cold wallet transactions for {0} due to {1}".format(url, str(ex)))
-        finally:
-            http.client.HTTPConnection.debuglevel = 0
-    if total_balance > 0:
-        # Store summary results for this cold wallet address
-        cold_wallet_cache[address] = {
-            'total_balance': total_balance,
-            'farmed_balance': farmed_balance
-        }
-    app.logger.info("Returning cold wallet total balance: {0}".format(total_balance))
-    return total_balance  # May be None if no good response received
+            app.logger.error("Failed to request cold wallet transactions for {0} {1} due to {2}".format(blockchain, address, str(ex)))
+    return [blockchain, address, total_balance, transactions]
+
+def store_cold_wallet(blockchain, address, total_balance, transactions):
+    wallet = db.session.query(w.ColdWallet).filter(w.ColdWallet.blockchain==blockchain, w.ColdWallet.address==address).first()
+    if not wallet:
+        wallet = w.ColdWallet(blockchain=blockchain, address=address)
+        db.session.add(wallet)
+    if total_balance is not None:  # Else keep last good balance received
+        wallet.total_balance = total_balance
+    if transactions:
+        records = {}  # Pages can shift as new transactions arrive, so drop any repeats
+        for rec in transactions:
+            records.setdefault(transaction_coin_id(rec), rec)
+        for row in db.session.query(w.ColdWalletTransaction.coin_id).filter(w.ColdWalletTransaction.blockchain==blockchain,
+                w.ColdWalletTransaction.address==address, w.ColdWalletTransaction.coin_id.in_(list(records.keys()))).all():
+            del records[row.coin_id]  # Already stored, as when the last one seen was no longer listed
+        db.session.bulk_save_objects([ w.ColdWalletTransaction(
+            blockchain=blockchain,
+            address=address,
+            coin_id=coin_id,
+            coin_type=rec.get('coinType'),
+            amount=int(rec['amount']) if 'amount' in rec else None,
+            timestamp=rec.get('timestamp'),
+        ) for coin_id, rec in records.items() ])
+        wallet.last_coin_id = transaction_coin_id(transactions[0])
+    farmed_mojos = db.session.query(sa.func.sum(w.ColdWalletTransaction.amount)).filter(
+        w.ColdWalletTransaction.blockchain==blockchain, w.ColdWalletTransaction.address==address,
+        w.ColdWalletTransaction.coin_type=='FARMER_REWARD').scalar()
+    wallet.farmed_balance = (farmed_mojos or 0) / globals.get_mojos_per_coin(blockchain)
+
+def refresh_cold_wallets(addresses_per_blockchain):
+    pending = []
+    for cold_blockchain in addresses_per_blockchain.keys():
+        last_coin_ids = dict(db.session.query(w.ColdWallet.address, w.ColdWallet.last_coin_id).filter(
+            w.ColdWallet.blockchain==cold_blockchain).all())
+        for address in addresses_per_blockchain[cold_blockchain]:
+            pending.append([cold_blockchain, address, last_coin_ids.get(address)])
+    with ThreadPoolExecutor(max_workers=ALLTHEBLOCKS_MAX_CONCURRENT_REQUESTS) as executor:
+        results = list(executor.map(lambda request: request_cold_wallet(*request), pending))
+    for [blockchain, address, total_balance, transactions] in results:
+        try:
+            store_cold_wallet(blockchain, address, total_balance, transactions)
+            db.session.commit()
+        except Exception as ex:
+            db.session.rollback()
+            app.logger.error("Failed to store cold wallet for {0} {1} due to {2}".format(blockchain, address, str(ex)))
+
+def load_cold_wallets(blockchain, addresses):
+    return db.session.query(w.ColdWallet).filter(w.ColdWallet.blockchain==blockchain, 
+        w.ColdWallet.address.in_(addresses)).all()
 
 last_cold_wallet_request_time = None
 def cold_wallet_balance(blockchain):
     global last_cold_wallet_request_time
-    total_balance = 0.0
     addresses_per_blockchain = load_cold_wallet_addresses()
-    cold_wallet_cache = load_cold_wallet_cache()
     # First poll the web service, if it's been a while
     if not last_cold_wallet_request_time or last_cold_wallet_request_time <= \
                 (datetime.datetime.now() - datetime.timedelta(minutes=ALLTHEBLOCKS_REQUEST_INTERVAL_MINS)):
         last_cold_wallet_request_time = datetime.datetime.now()
-        for cold_blockchain in addresses_per_blockchain.keys():
-            try:
-                alltheblocks_blockchain = globals.get_alltheblocks_name(cold_blockchain)
-                for address in addresses_per_blockchain[cold_blockchain]:
-                    address_balance = request_cold_wallet_balance(cold_blockchain, cold_wallet_cache, alltheblocks_blockchain, address)
-                    if address_balance is not None:
-                        total_balance += address_balance
-                    else:
-                        app.logger.error("No cold wallet details found for {0} {1}.".format(cold_blockchain, address))
-            except:
-                app.logger.error("Failed to request cold wallet balance for {0} due to {1}".format(cold_blockchain, str(ex)))
-        save_cold_wallet_cache(cold_wallet_cache)
-    # Now for that specific blockchain, check for a cold wallet balance in the cache
+        refresh_cold_wallets(addresses_per_blockchain)
+    # Now for that specific blockchain, sum the cold wallet balances stored
     total_balance = 0.0
     if blockchain in addresses_per_blockchain:
-        for address in addresses_per_blockchain[blockchain]:
-            if address in cold_wallet_cache:
-                try:
-                    if 'total_balance' in cold_wallet_cache[address]:
-                        app.logger.debug(cold_wallet_cache[address])
-                        cached_cold_balance = float(cold_wallet_cache[address]['total_balance'])
-                        total_balance += cached_cold_balance
-                except Exception as ex:
-                    app.logger.info("During cold balance lookup, deleting old cold wallet cache file with legacy format. {0}".format(str(ex)))
-                    os.remove(COLD_WALLET_CACHE_FILE)
+        for wallet in load_cold_wallets(blockchain, addresses_per_blockchain[blockchain]):
+            if wallet.total_balance:
+                total_balance += wallet.total_balance
         app.logger.info("Returning {0} cold wallet balance of {1}".format(blockchain, total_balance))
         return total_balance
     return 0.0 # No cold wallet addresses to check, so no errors obviously
 
-def load_cold_wallet_transactions(blockchain, address):
-    data = {}
-    cache_file =  COLD_WALLET_CACHE_DIR + '/' + blockchain + '/' + address + ".json"
-    if os.path.exists(cache_file):
-        try:
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-        except Exception as ex:
-            msg = "Unable to read cold wallet transactions from {0} because {1}".format(cache_file, str(ex))
-            app.logger.error(msg)
-    return data
-
 def cold_wallet_farmed_balance(blockchain):
     farmed_balance = 0
     addresses_per_blockchain = load_cold_wallet_addresses()
-    cold_wallet_cache = load_cold_wallet_cache()
     if blockchain in addresses_per_blockchain:
-        for address in addresses_per_blockchain[blockchain]:
-            if address in cold_wallet_cache:
-                try:
-                    if 'farmed_balance' in cold_wallet_cache[address]:
-                        farmed_balance += float(cold_wallet_cache[address]['farmed_balance'])
-                except Exception as ex:
-                    app.logger.info("During get, deleting old cold wallet cache file with legacy format. {0}".format(str(ex)))
-                    os.remove(COLD_WALLET_CACHE_FILE)
+        for wallet in load_cold_wallets(blockchain, addresses_per_blockchain[blockchain]):
+            if wallet.farmed_balance:
+                farmed_balance += wallet.farmed_balance
         return farmed_balance
     return 0.0 # No cold wallet addresses to check
 
@@ -231,31 +317,19 @@ def cold_wallet_farmed_most_recent_date(blockchain):
     most_recent_farmed_block_time = 0 # Seconds since epoch
     addresses_per_blockchain = load_cold_wallet_addresses()
     if blockchain in addresses_per_blockchain:
-        for address in addresses_per_blockchain[blockchain]:
-            transactions = load_cold_wallet_transactions(blockchain, address)
-            for transaction in transactions:
-                if transaction['coinType'] == 'FARMER_REWARD':
-                    if most_recent_farmed_block_time < transaction['timestamp']:
-                        most_recent_farmed_block_time = transaction['timestamp']
+        most_recent = db.session.query(sa.func.max(w.ColdWalletTransaction.timestamp)).filter(
+            w.ColdWalletTransaction.blockchain==blockchain, 
+            w.ColdWalletTransaction.address.in_(addresses_per_blockchain[blockchain]),
+            w.ColdWalletTransaction.coin_type=='FARMER_REWARD').scalar()
+        if most_recent:
+            most_recent_farmed_block_time = most_recent
     return most_recent_farmed_block_time
 
 def load_prices_cache():
-    data = {}
-    if os.path.exists(BLOCKCHAIN_PRICES_CACHE_FILE):
-        try:
-            with open(BLOCKCHAIN_PRICES_CACHE_FILE) as f:
-                data = json.load(f)
-        except Exception as ex:
-            msg = "Unable to read price cache from {0} because {1}".format(BLOCKCHAIN_PRICES_CACHE_FILE, str(ex))
-            app.logger.error(msg)
-    return data
+    return caches.prices_cache().load()
 
 def save_prices_cache(data):
-    try:
-        with open(BLOCKCHAIN_PRICES_CACHE_FILE, 'w') as f:
-            json.dump(data, f)
-    except Exception as ex:
-        app.logger.error("Failed to store prices cache in {0} because {1}".format(BLOCKCHAIN_PRICES_CACHE_FILE, str(ex)))
+    caches.prices_cache().save(data)
 
 def request_atb_prices(debug=False):
     prices = {}
@@ -264,7 +338,7 @@ def request_atb_prices(debug=False):
         app.logger.info("Requesting recent pricing for blockchains from {0}".format(url))
         if debug:
             http.client.HTTPConnection.debuglevel = 1
-        data = requests.get(url, timeout=30).text
+        data = web_client.get_text('alltheblocks_prices', url)
         http.client.HTTPConnection.debuglevel = 0
         soup = bs4.BeautifulSoup(data, 'html.parser')
         table = soup.find('table', class_="table b-table table-sm")
@@ -296,7 +370,7 @@ def request_posat_prices(debug=False):
         app.logger.info("Requesting recent pricing for blockchains from {0}".format(url))
         if debug:
             http.client.HTTPConnection.debuglevel = 1
-        data = json.loads(requests.get(url, timeout=30).content)
+        data = web_client.get_json('posat_prices', url)
         http.client.HTTPConnection.debuglevel = 0
         for blockchain in data.keys():
             machinaris_blockchain = blockchain.replace('stai', 'staicoin').lower()
@@ -319,7 +393,7 @@ def request_vayamos_prices(debug=False):
         if debug:
             http.client.HTTPConnection.debuglevel = 1
         payload = { "offset": 0 }
-        data = json.loads(requests.post(url, data = json.dumps(payload), timeout=30).content)
+        data = web_client.post_json('vayamos_prices', url, payload)
         http.client.HTTPConnection.debuglevel = 0
         if 'success' in data:
             markets = data['markets']
@@ -369,18 +443,23 @@ def get_prices():
     global last_price_request_time
     prices = load_prices_cache()
     if not last_price_request_time or last_price_request_time <= (datetime.datetime.now() - datetime.timedelta(minutes=ALLTHEBLOCKS_REQUEST_INTERVAL_MINS)):
-        try:
-            last_price_request_time = datetime.datetime.now()
-            store_exchange_prices(prices, 'alltheblocks', request_atb_prices(), last_price_request_time)
-            #store_exchange_prices(prices, 'posat', request_posat_prices(), last_price_request_time) # Dead as of Sept 2022
-            store_exchange_prices(prices, 'vayamos', request_vayamos_prices(), last_price_request_time)
-            save_prices_cache(prices)
-        except Exception as ex:
-            app.logger.info("Failed to save current blockchain prices because {0}".format(str(ex)))
-        try:
-            save_exchange_rates()
-        except Exception as ex:
-            app.logger.info("Failed to save current exchange rates because {0}".format(str(ex)))
+        last_price_request_time = datetime.datetime.now()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            atb_prices = executor.submit(request_atb_prices)
+            #posat_prices = executor.submit(request_posat_prices) # Dead as of Sept 2022
+            vayamos_prices = executor.submit(request_vayamos_prices)
+            exchange_rates = executor.submit(save_exchange_rates)
+            try:
+                store_exchange_prices(prices, 'alltheblocks', atb_prices.result(), last_price_request_time)
+                store_exchange_prices(prices, 'vayamos', vayamos_prices.result(), last_price_request_time)
+                save_prices_cache(prices)
+            except Exception as ex:
+                app.logger.info("Failed to save current blockchain prices because {0}".format(str(ex)))
+            try:
+                exchange_rates.result()
+            except Exception as ex:
+                app.logger.info("Failed to save current exchange rates because {0}".format(str(ex)))
+        web_client.save_metrics()
     return prices
 
 def store_exchange_prices(prices, exchange, exchange_prices, requested_time):
@@ -404,16 +483,11 @@ def save_exchange_rates(debug=False):
     try:
         if debug:
             http.client.HTTPConnection.debuglevel = 1
-        resp = requests.get(url, timeout=30)
+        data = web_client.get_json('coingecko_exchange_rates', url)
         http.client.HTTPConnection.debuglevel = 0
-        if resp.status_code == 200:
-            data = json.loads(resp.text)
-            with open(EXCHANGE_RATES_CACHE_FILE, 'w') as f:
-                json.dump(data['rates'], f)
-        else:
-            app.logger.error("Received {0} from {1}".format(resp.status_code, url))
+        caches.exchange_rates_cache().save(data['rates'])
     except Exception as ex:
-            app.logger.error("Failed to store exchange cache in {0} because {1}".format(EXCHANGE_RATES_CACHE_FILE, str(ex)))
+            app.logger.error("Failed to store exchange cache in {0} because {1}".format(caches.EXCHANGE_RATES_CACHE_FILE, str(ex)))
 
 last_chain_request_time = None
 def get_chain_statuses():
@@ -426,45 +500,36 @@ def get_chain_statuses():
             last_chain_request_time = datetime.datetime.now()
         except Exception as ex:
             app.logger.info("Failed to save current blockchain statuses from ATB because {0}".format(str(ex)))
+        web_client.save_metrics()
     return statuses
 
 def load_chain_statuses():
-    data = {}
-    if os.path.exists(BLOCKCHAIN_STATUSES_CACHE_FILE):
-        try:
-            with open(BLOCKCHAIN_STATUSES_CACHE_FILE) as f:
-                data = json.load(f)
-        except Exception as ex:
-            msg = "Unable to read blockchain status cache from {0} because {1}".format(BLOCKCHAIN_STATUSES_CACHE_FILE, str(ex))
-            app.logger.error(msg)
-    return data
+    return caches.chain_statuses_cache().load()
 
-def request_chain_statuses(statuses, debug=False):
-    # First get the health status from ATB per blockchain
+def request_chain_health(debug=False):
+    health = {}
     url = "https://api.alltheblocks.net/atb/health"
     app.logger.info("Requesting blockchain health from {0}".format(url))
     try:
         if debug:
             http.client.HTTPConnection.debuglevel = 1
-        resp = requests.get(url, timeout=30)
+        result = web_client.get_json('alltheblocks_health', url)
         http.client.HTTPConnection.debuglevel = 0
-        if resp.status_code == 200:
-            result = json.loads(resp.text)
-            for fork in result['forks']:
-                fork_name = fork['pathName'].replace('stai', 'staicoin')
-                peak_time = datetime.datetime.fromtimestamp(int(fork['peakTimestamp'])).strftime("%Y-%m-%d %H:%M:%S")
-                statuses[fork_name] = { 'peak_height': fork['peakHeight'], 'peak_time': peak_time, }
-        else:
-            app.logger.error("Received {0} from {1}".format(resp.status_code, url))
+        for fork in result['forks']:
+            fork_name = fork['pathName'].replace('stai', 'staicoin')
+            peak_time = datetime.datetime.fromtimestamp(int(fork['peakTimestamp'])).strftime("%Y-%m-%d %H:%M:%S")
+            health[fork_name] = { 'peak_height': fork['peakHeight'], 'peak_time': peak_time, }
     except Exception as ex:
             app.logger.error("Failed to read blockchain health because {0}".format(str(ex)))
+    return health
 
-    # Then get the sync status 
+def request_chain_sync_states(debug=False):
+    sync_states = {}
     url = "https://alltheblocks.net/tools/status"
     app.logger.info("Requesting blockchain sync state from {0}".format(url))
     if debug:
         http.client.HTTPConnection.debuglevel = 1
-    data = requests.get(url, timeout=30).text
+    data = web_client.get_text('alltheblocks_status', url)
     http.client.HTTPConnection.debuglevel = 0
     soup = bs4.BeautifulSoup(data, 'html.parser')
     table = soup.find('table')
@@ -482,18 +547,25 @@ def request_chain_statuses(statuses, debug=False):
                         chain_status = 'NO SYNC'
                 except:
                     pass
+            if blockchain:
+                sync_states[blockchain] = chain_status
+        except Exception as ex:
+            traceback.print_exc()
+    return sync_states
+
+def request_chain_statuses(statuses, debug=False):
+    # Health and sync status come from separate pages, so request both at once
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        health = executor.submit(request_chain_health, debug)
+        sync_states = executor.submit(request_chain_sync_states, debug)
+        statuses.update(health.result())
+        for blockchain, chain_status in sync_states.result().items():
             if blockchain in statuses:
                 details = statuses[blockchain]
                 details['sync_state'] = chain_status
             else:
                 app.logger.debug("Missing blockchain from health. {0} found sync state of {1}.".format(blockchain, chain_status))
-        except Exception as ex:
-            traceback.print_exc()
     return statuses
 
 def save_chain_statuses(data):
-    try:
-        with open(BLOCKCHAIN_STATUSES_CACHE_FILE, 'w') as f:
-            json.dump(data, f)
-    except Exception as ex:
-        app.logger.error("Failed to store blockchain status cache in {0} because {1}".format(BLOCKCHAIN_STATUSES_CACHE_FILE, str(ex)))
+    caches.chain_statuses_cache().save(data)
@@ -56,6 +56,9 @@ class DefaultConfig:
     WORKER_SCHEME = 'http'
     WORKER_PORT = os.environ['worker_api_port'] if 'worker_api_port' in os.environ else '8927'
 
+    # Allow a request with ?profile=1 to write a sampled profile of itself, see common/utils/instrumentation.py
+    PROFILING_ENABLED = 'profiling_enabled' in os.environ and os.environ['profiling_enabled'].lower() == 'true'
+
     STATUS_EVERY_X_MINUTES = 2  # Run status collection once every two minutes by default
     ALLOW_HARVESTER_CERT_LAN_DOWNLOAD = True
     SELECTED_WALLET_NUM = 1 # Default is read first wallet if multiple are prompted by `chia wallet show`
@@ -8,6 +8,7 @@ def on_starting(server):
     import time
 
     from datetime import datetime, timedelta
+    from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
     from apscheduler.schedulers.background import BackgroundScheduler
 
     from api import app, utils
@@ -17,13 +18,16 @@ def on_starting(server):
         status_plotnfts, status_pools, status_partials, status_drives, \
         stats_blocks, stats_balances, stats_disk, stats_farm, nft_recover, plots_check, \
         log_rotate, restart_stuck_farmer, geolocate_peers, plots_replot, \
-        stats_effort, status_warnings, status_archiving
+        stats_effort, status_warnings, status_archiving, stats_capacity
     from common.config import globals
+    from common.utils import instrumentation
     from common.models import pools, plottings
 
-    from api.commands import websvcs
+    from api.commands import websvcs, plot_logs, farm_metrics
 
     scheduler = BackgroundScheduler()
+    if utils.is_controller():  # Job durations are exported with the farm metrics
+        scheduler.add_listener(farm_metrics.scheduler_listener(scheduler), EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
 
     schedule_every_x_minutes = "?"
     try:
@@ -36,6 +40,9 @@ def on_starting(server):
         JOB_JITTER = 30 # 30 seconds
     app.logger.info("Scheduler frequency will be once every {0} seconds.".format(JOB_FREQUENCY))
 
+    # Timings of subprocesses, queries and requests made by scheduled jobs, for /metrics/instrumentation
+    scheduler.add_job(func=instrumentation.save_snapshot, args=['scheduler'], name="instrumentation_snapshot", trigger='interval', seconds=60)
+
     # Every single container should report as a worker
     scheduler.add_job(func=status_worker.update, name="status_workers", trigger='interval', seconds=JOB_FREQUENCY, jitter=JOB_JITTER) 
 
@@ -62,6 +69,7 @@ def on_starting(server):
     if globals.plotting_enabled():
         scheduler.add_job(func=status_plotting.update, name="status_plottings", trigger='interval', seconds=JOB_FREQUENCY, jitter=JOB_JITTER)
         scheduler.add_job(func=status_archiving.update, name="status_archiving", trigger='interval', seconds=JOB_FREQUENCY, jitter=JOB_JITTER)
+        scheduler.add_job(func=plot_logs.refresh_index, name="plot_logs_index", trigger='interval', seconds=JOB_FREQUENCY, jitter=JOB_JITTER)
           
     # Status for fullnodes, all different forks
     if utils.is_fullnode():
@@ -93,6 +101,7 @@ def on_starting(server):
         scheduler.add_job(func=geolocate_peers.execute, name="stats_geolocate_peers", trigger='interval', seconds=JOB_FREQUENCY, jitter=JOB_JITTER) 
         scheduler.add_job(func=stats_balances.collect, name="stats_balances", trigger='cron', minute=0)  # Hourly
         scheduler.add_job(func=plots_replot.execute, name="replot_check", trigger='interval', seconds=JOB_FREQUENCY, jitter=JOB_JITTER) 
+        scheduler.add_job(func=stats_capacity.collect, name="stats_capacity", trigger='cron', minute="*/15") # Every 15 minutes
         
     # Testing only
     #scheduler.add_job(func=plots_check.execute, name="plots_check", trigger='interval', seconds=60) # Test immediately
@@ -2,6 +2,7 @@ import locale
 import json
 import os
 import re
+import time
 import traceback
 
 from datetime import datetime
@@ -13,12 +14,42 @@ from common.models import wallets as w
 
 TOTAL_COINS_CACHE_FILE = '/root/.chia/machinaris/cache/wallet_total_coins.json'
 
+# Node types reported by the RPC get_connections, see chia/server/outbound_message.py
+NODE_TYPES = {
+    1: 'FULL_NODE',
+    2: 'HARVESTER',
+    3: 'FARMER',
+    4: 'TIMELORD',
+    5: 'INTRODUCER',
+    6: 'WALLET',
+    7: 'DATA_LAYER',
+}
+
+# Wallet types reported by the RPC get_wallets, see chia/wallet/util/wallet_types.py
+WALLET_TYPES = {
+    0: 'STANDARD_WALLET',
+    1: 'ATOMIC_SWAP',
+    2: 'AUTHORIZED_PAYEE',
+    3: 'MULTI_SIG',
+    4: 'CUSTODY',
+    5: 'CAT',
+    6: 'RECOVERABLE',
+    7: 'DECENTRALIZED_ID',
+    8: 'POOLING_WALLET',
+    9: 'NFT',
+    10: 'DATA_LAYER',
+    11: 'DATA_LAYER_OFFER',
+}
+
 class FarmSummary:
 
-    def __init__(self, cli_stdout, blockchain):
+    def __init__(self, cli_stdout, blockchain, rpc_summary=None):
             self.plot_count = 0
             self.plots_size = 0
             self.total_coins = None
+            if rpc_summary:
+                self.parse_rpc(rpc_summary, blockchain)
+                cli_stdout = []
             for line in cli_stdout:
                 if "Plot count for all" in line: 
                     self.plot_count = line.strip().split(':')[1].strip()
@@ -39,6 +70,29 @@ class FarmSummary:
             else: # Wallet not running, use the cached value
                 self.total_coins = self.load_cached_farmed_coins()
     
+    # Mirrors the status and expected time to win logic of `chia farm summary`
+    def parse_rpc(self, rpc_summary, blockchain):
+        state = rpc_summary['blockchain_state']
+        if state['sync_mode']:
+            self.calc_status("Syncing")
+        elif not state['synced']:
+            self.calc_status("Not synced or not connected to peers")
+        else:
+            self.calc_status("Farming")
+        self.plot_count = rpc_summary['plot_count']
+        self.plots_size = converters.format_bytes(rpc_summary['plots_size'])
+        if rpc_summary['farmed_amount'] is not None:
+            self.total_coins = str(rpc_summary['farmed_amount'])
+        if 'fee_amount' in rpc_summary:
+            self.transaction_fees = str(rpc_summary['fee_amount'])
+        self.calc_netspace_size(converters.format_bytes(state['space']))
+        if rpc_summary['plots_size'] > 0 and state['space'] > 0:
+            proportion = rpc_summary['plots_size'] / state['space']
+            block_minutes = 24 * 60 / globals.get_blocks_per_day(blockchain)
+            self.time_to_win = converters.format_minutes(int(block_minutes / proportion))
+        else:
+            self.time_to_win = "Never (no plots)"
+
     def save_cached_farmed_coins(self, total_coins):
         with open(TOTAL_COINS_CACHE_FILE, 'w') as writer:
             writer.write(json.dumps({'total_coins_cached': total_coins }))
@@ -81,8 +135,10 @@ class HarvesterSummary:
 
 class Wallet:
 
-    def __init__(self, cli_stdout):
+    def __init__(self, cli_stdout, blockchain=None, rpc_balances=None):
         self.text = ""
+        if rpc_balances:
+            cli_stdout = self.format_rpc(rpc_balances, blockchain)
         lines = cli_stdout.split('\n')
         for line in lines:
             #app.logger.info("WALLET LINE: {0}".format(line))
@@ -100,6 +156,34 @@ class Wallet:
                 return True
         return False
 
+    # Render RPC balances in the layout of `chia wallet show`, which the controller parses
+    def format_rpc(self, balances, blockchain):
+        symbol = globals.get_blockchain_symbol(blockchain).lower()
+        mojos_per_coin = globals.get_mojos_per_coin(blockchain)
+        if balances['synced']:
+            sync_status = "Synced"
+        elif balances['syncing']:
+            sync_status = "Syncing"
+        else:
+            sync_status = "Not synced"
+        lines = [
+            "Wallet height: {0}".format(balances['height']),
+            "Sync status: {0}".format(sync_status),
+            "Balances, fingerprint: {0}".format(balances['fingerprint']),
+        ]
+        for wallet in balances['wallets']:
+            wallet_type = WALLET_TYPES.get(wallet['type'], str(wallet['type']))
+            lines.append("")
+            lines.append("{0}:".format(wallet['name']))
+            if wallet_type == 'STANDARD_WALLET': # Only balances summed by the controller
+                for label, key in [('Total Balance:', 'confirmed_wallet_balance'), 
+                        ('Pending Total Balance:', 'unconfirmed_wallet_balance'), ('Spendable:', 'spendable_balance')]:
+                    lines.append("   -{0:<23}{1} {2} ({3} mojo)".format(label, 
+                        wallet[key] / mojos_per_coin, symbol, wallet[key]))
+            lines.append("   -{0:<23}{1}".format('Type:', wallet_type))
+            lines.append("   -{0:<23}{1}".format('Wallet ID:', wallet['id']))
+        return '\n'.join(lines)
+
 class Wallets:
 
     def __init__(self, wallets, cold_wallet_addresses={}):
@@ -187,22 +271,87 @@ class Wallets:
 
 class Keys:
 
-    def __init__(self, cli_stdout):
+    def __init__(self, cli_stdout, fingerprints=None):
         self.text = ""
+        self.fingerprints = fingerprints
         for line in cli_stdout:
             self.text += line + '\n'
 
 class Blockchain:
 
-    def __init__(self, cli_stdout):
+    def __init__(self, cli_stdout, rpc_state=None):
         self.text = ""
+        self.state = rpc_state
+        if rpc_state:
+            cli_stdout = self.format_rpc(rpc_state)
         for line in cli_stdout:
             self.text += line + '\n'
 
+    # Render the RPC state in the layout of `chia show --state`, which the controller parses
+    def format_rpc(self, state):
+        if state['synced']:
+            status = "Full Node Synced"
+        elif state['peak_height'] is not None and state['sync_mode']:
+            status = "Syncing {0}/{1} ({2} behind).".format(state['sync_progress_height'], 
+                state['sync_tip_height'], state['sync_tip_height'] - state['sync_progress_height'])
+        elif state['peak_height'] is not None:
+            status = "Not Synced. Peak height: {0}".format(state['peak_height'])
+        else:
+            return ["Searching for an initial chain", 
+                "You may be able to expedite with 'chia show -a host:port' using a known node."]
+        lines = [ "Current Blockchain Status: {0}".format(status), "" ]
+        if state['peak_hash']:
+            lines.append("Peak: Hash: {0}".format(state['peak_hash']))
+        if state['peak_time']:
+            peak_time = time.strftime("%a %b %d %Y %T %Z", time.localtime(state['peak_time']))
+            lines.append("      Time: {0}                 Height: {1:>10}".format(peak_time, state['peak_height']))
+        lines.append("")
+        lines.append("Estimated network space: {0}".format(converters.format_bytes(state['space'])))
+        lines.append("Current difficulty: {0}".format(state['difficulty']))
+        lines.append("Current VDF sub_slot_iters: {0}".format(state['sub_slot_iters']))
+        return lines
+
 class Connections:
 
-    def __init__(self, cli_stdout):
+    def __init__(self, cli_stdout, rpc_connections=None):
         self.text = ""
+        self.connections = rpc_connections
+        if rpc_connections is not None:
+            cli_stdout = self.format_rpc(rpc_connections)
         for line in cli_stdout:
             self.text += line + '\n'
 
+    # Render RPC peers in the layout of `chia show --connections`, which the controller parses
+    def format_rpc(self, connections):
+        lines = [ "Connections:",
+            "Type      IP                                     Ports       NodeID      Last Connect      MiB Up|Dwn" ]
+        for con in connections:
+            last_connect = time.strftime("%b %d %T", time.localtime(con['last_message_time']))
+            mb_down = con['bytes_read'] / (1024 * 1024)
+            mb_up = con['bytes_written'] / (1024 * 1024)
+            lines.append("{0:9} {1:38} {2:5}/{3:<5} {4}... {5}  {6:7.1f}|{7:<7.1f}".format(
+                NODE_TYPES.get(con['type'], str(con['type'])), con['peer_host'], con['peer_port'], 
+                con['peer_server_port'], con['node_id'][:8], last_connect, mb_up, mb_down))
+            if con['peak_height']:
+                lines.append("                                                 -Height: {0:8.0f}    -Hash: {1}...".format(
+                    con['peak_height'], str(con['peak_hash'])[2:10]))
+        return lines
+
+    # Structured peer records sent to the controller in place of the text details
+    def peers(self):
+        peers = []
+        for con in self.connections:
+            peers.append({
+                'node_id': con['node_id'],
+                'type': NODE_TYPES.get(con['type'], str(con['type'])),
+                'ip': con['peer_host'],
+                'peer_port': con['peer_port'],
+                'peer_server_port': con['peer_server_port'],
+                'height': con['peak_height'],
+                'hash': con['peak_hash'],
+                'bytes_up': con['bytes_written'],
+                'bytes_down': con['bytes_read'],
+                'last_message_at': datetime.fromtimestamp(int(con['last_message_time'])).isoformat()  # Whole seconds, as the CLI shows,
+            })
+        return peers
+
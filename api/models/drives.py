@@ -1,3 +1,4 @@
+import json
 import os
 import re
 import traceback
@@ -13,8 +14,37 @@ class DriveStatus:
         self.device = device
         self.type = device_type
         self.comment = device_comment
-        self.smart_info = info  # From smartctl -a
-        self.set_info_attributes(info.splitlines())
+        if info.lstrip().startswith('{'):  # From smartctl --json=o
+            self.set_json_attributes(json.loads(info))
+        else:  # From smartctl -a on versions before JSON output
+            self.smart_info = info
+            self.set_info_attributes(info.splitlines())
+
+    def set_json_attributes(self, data):
+        if 'output' in data.get('smartctl', {}):  # Original text output, for display on the Drives page
+            self.smart_info = '\n'.join(data['smartctl']['output'])
+        else:
+            self.smart_info = json.dumps(data, indent=4)
+        self.model_family = data.get('model_family', data.get('scsi_product', data.get('product', '')))
+        self.device_model = data.get('model_name', data.get('scsi_model_name', ''))
+        self.serial_number = data.get('serial_number', '')
+        self.size_gibs = None
+        self.capacity = ''
+        if 'user_capacity' in data:
+            size = data['user_capacity']['bytes']
+            self.size_gibs = round(float(size / 1024 / 1024 / 1024), 3)
+            self.capacity = "{0:.2f} TB".format(size / 1000 ** 4)
+        self.status = ''
+        if 'smart_status' in data:
+            self.status = 'PASSED' if data['smart_status'].get('passed') else 'FAILED'
+        self.power_on_hours = data.get('power_on_time', {}).get('hours')
+        self.temperature = data.get('temperature', {}).get('current')
+        self.reallocated_sectors = data.get('scsi_grown_defect_list')
+        for attribute in data.get('ata_smart_attributes', {}).get('table', []):
+            if attribute['id'] == 5:  # Reallocated_Sector_Ct
+                self.reallocated_sectors = attribute['raw']['value']
+        if not self.model_family and not self.device_model and 'smart_status' in data:
+            app.logger.info("Drive device {0} was missing Model information.".format(self.device))
 
     def set_info_attributes(self, data):
         self.model_family = ''
@@ -25,6 +55,7 @@ class DriveStatus:
         self.status = ''
         self.power_on_hours = None
         self.temperature = None
+        self.reallocated_sectors = None
         for line in data:
             if line.strip().startswith('Model Family'):  # Sometimes present
                 # Example: "Model Family:     Seagate BarraCuda 3.5"
@@ -63,6 +94,16 @@ class DriveStatus:
             elif not self.temperature and 'Current Drive Temperature:' in line:
                 # Example: "Current Drive Temperature:     34 C"
                 self.temperature = line.split(':')[1][:-1].strip()
+            elif 'Reallocated_Sector_Ct' in line:
+                # Example: "  5 Reallocated_Sector_Ct   0x0033   100   100   010    Pre-fail  Always       -       0"
+                self.reallocated_sectors = line.split()[9].strip()
+            elif not self.reallocated_sectors and line.strip().startswith('Elements in grown defect list:'):
+                # Example: "Elements in grown defect list: 0"
+                self.reallocated_sectors = line.split(':')[1].strip()
         # Now print warning if missing fields
         if not self.model_family and not self.device_model:
             app.logger.info("Drive device {0} was missing Model information.  Have you set 'device_type: scsi' in drives_overrides.json when you don't need to?  Remove that and allow Machinaris to just: smartctl -a {0}".format(self.device))
+
+    # Changes to any of these trigger a fresh read of the full smartctl output
+    def key_attributes(self):
+        return (self.temperature, self.reallocated_sectors, self.power_on_hours)
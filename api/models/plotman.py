@@ -6,10 +6,81 @@ from api import app
 
 PID_FILE = '/root/.chia/plotman/plotman.pid'
 
+def human_format(num, precision):
+    # Same short sizes as the `plotman status` table, like 12G or 3.2G
+    magnitude = 0
+    while abs(num) >= 1000 and magnitude < 5:
+        magnitude += 1
+        num /= 1000.0
+    return ('%.' + str(precision) + 'f%s') % (num, ['', 'K', 'M', 'G', 'T', 'P'][magnitude])
+
+def time_format(secs):
+    # Same h:mm times as the `plotman status` table
+    if secs is None:
+        return '--'
+    return '%d:%02d' % (secs // 3600, (secs % 3600) // 60)
+
+def to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+class PlottingJob:
+    """One job from `plotman status --json`, with times in seconds and sizes in bytes."""
+
+    def __init__(self, job, plotter):
+        self.plot_id = job['plot_id'][:8]
+        self.plotter = job.get('plotter') or plotter
+        self.k = to_int(job.get('k'))
+        self.tmp = job.get('tmp_dir') or '-'  # Bladebit jobs may not have a tmp directory
+        self.dst = job.get('dst_dir') or '-'
+        self.phase = str(job.get('progress'))
+        self.tmp_bytes = to_int(job.get('tmp_usage'))
+        self.pid = to_int(job.get('pid'))
+        self.stat = job.get('run_status')
+        self.mem_bytes = to_int(job.get('mem_usage'))
+        self.wall_secs = to_int(job.get('time_wall'))
+        self.user_secs = to_int(job.get('time_user'))
+        self.sys_secs = to_int(job.get('time_sys'))
+        self.io_secs = to_int(job.get('time_iowait'))
+
+    def row(self):
+        # Same columns as parsed from the status table, plus the numeric values
+        return {
+            'plot_id': self.plot_id,
+            'plotter': self.plotter,
+            'k': self.k,
+            'tmp': self.tmp,
+            'dst': self.dst,
+            'wall': time_format(self.wall_secs),
+            'phase': self.phase,
+            'size': human_format(self.tmp_bytes, 0) if self.tmp_bytes is not None else '-',
+            'pid': self.pid,
+            'stat': self.stat,
+            'mem': human_format(self.mem_bytes, 1) if self.mem_bytes is not None else '-',
+            'user': time_format(self.user_secs),
+            'sys': time_format(self.sys_secs),
+            'io': time_format(self.io_secs),
+            'wall_secs': self.wall_secs,
+            'tmp_bytes': self.tmp_bytes,
+            'mem_bytes': self.mem_bytes,
+            'io_secs': self.io_secs,
+        }
+
 class PlottingSummary:
 
+    @classmethod
+    def from_json(cls, status, plotter, plotman_pid):
+        summary = cls([], plotman_pid)
+        summary.jobs = [ PlottingJob(job, plotter) for job in status.get('jobs', []) ]
+        summary.rows = [ job.row() for job in summary.jobs ]
+        summary.calc_status()
+        return summary
+
     def __init__(self, cli_stdout, plotman_pid):
         self.rows = []
+        self.jobs = []
         for line in cli_stdout:
             if not line.strip() or line.startswith("Total jobs") or line.startswith("Updated at") or line.startswith("Jobs in"):
                 pass
@@ -49,7 +120,7 @@ class PlottingSummary:
 
 class Transfer:
 
-    def __init__(self, log_file, rsync_processes):
+    def __init__(self, log_file):
         self.log_file = log_file
         self.plot_id = ''
         self.k = 0  # k size like 31, 32, 34, etc
@@ -64,53 +135,110 @@ class Transfer:
         self.start_date = '' # Datetime the transfer started
         self.end_date = '' # Datetime the transfer ended (if successfully completed)
         self.duration = '' # H:M:S on transfer so far (or in total if completed)
-        running_transfers = self.extract_running_transfers(rsync_processes)
-        self.parse_transfer_log(log_file, running_transfers)
-
-    def parse_transfer_log(self, log_file, running_transfers):
-        if not os.path.exists(log_file):
-            app.logger.info("No such transfer log file at {0}".format(log_file))
-        with open(log_file) as f:
-            for line in f.readlines():
-                if line.startswith("Launching"):
-                    if 'remote' in line:
-                        self.type = 'Remote'
-                    else:
-                        self.type = 'Local'
-                    if ' at ' in line:
-                        self.start_date = line[line.index(' at ')+4:].strip()
-                    else: # Old Plotman logs didn't include time until I enhanced, ignore them
-                        self.log_file = None # indicates should be skipped
-                elif line.startswith("Completed"):
-                    self.end_date = line[line.index(' at ')+4:].strip()
-                elif line.startswith("+ rsync"):
-                    m = re.search("plot(?:-mmx)?-k(\d+)-(\d+)-(\d+)-(\d+)-(\d+)-(\d+)-(\w+).plot", line)
-                    if m:
-                        self.plot_id = m.group(7)[:16].strip()
-                        self.k = int(m.group(1).strip())
-                    self.source = line.split(' ')[-2].strip()
-                    self.dest = line.split(' ')[-1].strip()
-                    try:
-                        if os.path.exists(self.source):
-                            self.size = os.path.getsize(self.source)
-                    except Exception as ex:
-                        app.logger.error("Failed to get size of: {0}".format(self.source))
-                elif '/s ' in line:  # Rsync progress like "8.31G   7%   97.00MB/s    0:16:51"
-                    [self.size_complete, self.pct_complete, self.rate, self.duration] = [str.strip() for str in line.split()][:4]
-                    self.pct_complete = int(self.pct_complete[:-1]) # strip off the percent sign
-            if self.pct_complete == 100 and self.end_date:
-                self.status = "Complete"
-            elif self.source in running_transfers:
-                # Flag only this most recent transfer as running, any others earlier on same plot are failures
-                self.status = "Transferring"
-                running_transfers.remove(self.source)
-            else: 
-                self.status = "Failed"
-
-    def extract_running_transfers(self, rsync_processes):
-        running_transfers = []
-        for process in rsync_processes:
-            for piece in process.cmdline():
-                if piece.startswith('/') and piece.endswith('.plot'):
-                    running_transfers.append(piece)
-        return running_transfers
+        self.offset = 0 # Bytes of the log already parsed
+        self.partial = '' # Trailing text of the log not yet ended by a newline or carriage return
+
+    def read_appended(self):
+        # Rsync rewrites its progress line with carriage returns, so only the bytes appended since last read are parsed
+        try:
+            if os.path.getsize(self.log_file) <= self.offset:
+                return
+            with open(self.log_file, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            app.logger.info("No such transfer log file at {0}".format(self.log_file))
+            return
+        self.offset += len(data)
+        lines = re.split(r'[\r\n]', self.partial + data.decode('utf-8', errors='replace'))
+        self.partial = lines.pop()
+        for line in lines:
+            self.parse_line(line)
+
+    def parse_line(self, line):
+        if line.startswith("Launching"):
+            if 'remote' in line:
+                self.type = 'Remote'
+            else:
+                self.type = 'Local'
+            if ' at ' in line:
+                self.start_date = line[line.index(' at ')+4:].strip()
+            else: # Old Plotman logs didn't include time until I enhanced, ignore them
+                self.log_file = None # indicates should be skipped
+        elif line.startswith("Completed"):
+            self.end_date = line[line.index(' at ')+4:].strip()
+        elif line.startswith("+ rsync"):
+            m = re.search("plot(?:-mmx)?-k(\d+)-(\d+)-(\d+)-(\d+)-(\d+)-(\d+)-(\w+).plot", line)
+            if m:
+                self.plot_id = m.group(7)[:16].strip()
+                self.k = int(m.group(1).strip())
+            self.source = line.split(' ')[-2].strip()
+            self.dest = line.split(' ')[-1].strip()
+            try:
+                if os.path.exists(self.source):
+                    self.size = os.path.getsize(self.source)
+            except Exception as ex:
+                app.logger.error("Failed to get size of: {0}".format(self.source))
+        elif '/s ' in line:  # Rsync progress like "8.31G   7%   97.00MB/s    0:16:51"
+            try:
+                [size_complete, pct_complete, rate, duration] = [str.strip() for str in line.split()][:4]
+                self.pct_complete = int(pct_complete[:-1]) # strip off the percent sign
+                [self.size_complete, self.rate, self.duration] = [size_complete, rate, duration]
+            except ValueError:
+                pass  # Progress line was cut off mid-write
+
+    def is_complete(self):
+        return self.pct_complete == 100 and self.end_date
+
+    def update_status(self, running_transfers):
+        if self.is_complete():
+            self.status = "Complete"
+        elif self.source in running_transfers:
+            # Flag only this most recent transfer as running, any others earlier on same plot are failures
+            self.status = "Transferring"
+            running_transfers.remove(self.source)
+        else: 
+            self.status = "Failed"
+
+class TransferTracker:
+    """
+    Keeps parsed state of the most recent transfer logs between status cycles.  The archiving
+    folder is only re-listed when its mtime changes, and only appended bytes of each log are read.
+    """
+
+    def __init__(self, logs_dir, max_logs):
+        self.logs_dir = logs_dir
+        self.max_logs = max_logs
+        self.dir_mtime = None
+        self.transfers = {}  # Log file name to Transfer, most recently created first
+
+    def discover(self):
+        try:
+            dir_mtime = os.stat(self.logs_dir).st_mtime
+        except FileNotFoundError:
+            self.transfers = {}
+            return
+        if dir_mtime == self.dir_mtime:
+            return
+        with os.scandir(self.logs_dir) as entries:
+            logs = [ (entry.stat().st_ctime, entry.name, entry.path) for entry in entries \
+                if entry.name.endswith('.transfer.log') and entry.is_file() ]
+        transfers = {}
+        for ctime, name, path in sorted(logs, reverse=True)[:self.max_logs]:
+            transfers[name] = self.transfers.get(name) or Transfer(path)
+        self.transfers = transfers
+        self.dir_mtime = dir_mtime
+
+    def has_incomplete(self):
+        return any([ not transfer.is_complete() for transfer in self.transfers.values() ])
+
+    def load(self, running_transfers):
+        for transfer in self.transfers.values():
+            if transfer.log_file and not transfer.is_complete():
+                transfer.read_appended()
+        transfers = []
+        for transfer in self.transfers.values():
+            if transfer.log_file:
+                transfer.update_status(running_transfers)
+                transfers.append(transfer)
+        return transfers
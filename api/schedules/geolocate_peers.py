@@ -1,22 +1,28 @@
 #
 # Performs optional geolocation of peer connections by IP address for mapping
 # Only if Maxmind license file is found at /root/.chia/machinaris/config/maxmind_license.json 
+# or a GeoLite2 City database is found at /root/.chia/machinaris/config/GeoLite2-City.mmdb
 #
 
 import ast
 import datetime
+import functools
+import geoip2.database
+import geoip2.errors
 import geoip2.webservice
 import json
 import os
 import re
 import traceback
 
-from common.models import connections as co
+from common.models import connections as co, peers as pe
 from common.config import globals
+from common.utils import caches
 from api import app
 
 MAXMIND_LICENSE_FILE = '/root/.chia/machinaris/config/maxmind_license.json'
-GEOIP_CACHE_FILE = '/root/.chia/machinaris/cache/geoip_cache.json'
+GEOIP_DATABASE_FILE = '/root/.chia/machinaris/config/GeoLite2-City.mmdb'
+GEOIP_LOOKUP_CACHE_SIZE = 4096
 
 MISSING_LOCATION_RETRY_HOURS = 24
 last_missing_location_retry_time = None
@@ -33,67 +39,103 @@ def load_maxmind_license():
     return data
 
 def load_geoip_cache():
-    data = {}
-    if os.path.exists(GEOIP_CACHE_FILE):
-        try:
-            with open(GEOIP_CACHE_FILE) as f:
-                data = json.load(f)
-        except Exception as ex:
-            msg = "Unable to read geoip cache from {0} because {1}".format(GEOIP_CACHE_FILE, str(ex))
-            app.logger.error(msg)
-            return data
-    return data
+    return caches.geoip_cache().load()
 
 def save_geoip_cache(data):
+    caches.geoip_cache().save(data)
+
+def location_of(city):
+    location = {
+        'latitude': city.location.latitude, 
+        'longitude': city.location.longitude, 
+    }
     try:
-        with open(GEOIP_CACHE_FILE, 'w') as f:
-            json.dump(data, f)
-    except Exception as ex:
-        app.logger.error("Failed to store geoip cache in {0} because {1}".format(GEOIP_CACHE_FILE, str(ex)))
+        location['city'] = ast.literal_eval(str(city.city.names))
+    except:
+        pass
+    try:
+        location['country'] = ast.literal_eval(str(city.country.names))
+    except:
+        pass
+    return location
 
-def geolocate_ip_addresses(ip_addresses):
-    global last_missing_location_retry_time
-    license = load_maxmind_license()
-    if not license:
-        app.logger.info("Skipping geolocation of peer connections by IP address as no Maxmind license found.")
-        return
-    geoip_cache = load_geoip_cache()
-    missing_retry = False
-    if not last_missing_location_retry_time or last_missing_location_retry_time <= \
-        (datetime.datetime.now() - datetime.timedelta(hours=MISSING_LOCATION_RETRY_HOURS)):
-        missing_retry = True  # Since its been a while, retry all missing locations for ips
-        last_missing_location_retry_time = datetime.datetime.now()
+geoip_reader = None
+geoip_reader_mtime = None
+def open_geoip_database():
+    global geoip_reader, geoip_reader_mtime
+    if not os.path.exists(GEOIP_DATABASE_FILE):
+        return None
+    mtime = os.path.getmtime(GEOIP_DATABASE_FILE)
+    if geoip_reader and geoip_reader_mtime == mtime:
+        return geoip_reader
+    if geoip_reader:  # Database file was updated, so re-open it
+        geoip_reader.close()
+        lookup_offline.cache_clear()
+    geoip_reader = geoip2.database.Reader(GEOIP_DATABASE_FILE, mode=geoip2.database.MODE_MMAP)
+    geoip_reader_mtime = mtime
+    return geoip_reader
+
+@functools.lru_cache(maxsize=GEOIP_LOOKUP_CACHE_SIZE)
+def lookup_offline(ip_address):
+    try:
+        return location_of(geoip_reader.city(ip_address))
+    except geoip2.errors.AddressNotFoundError:
+        return None
+
+def geolocate_offline(ip_addresses, geoip_cache):
+    located = 0
+    for ip_address in ip_addresses:
+        try:
+            location = lookup_offline(ip_address)
+        except Exception as ex:
+            app.logger.info("Failed to lookup {0} in {1} because {2}.".format(ip_address, GEOIP_DATABASE_FILE, str(ex)))
+            location = None
+        if location:
+            located += 1
+        geoip_cache[ip_address] = location
+    app.logger.info("GEOLOCATE: Located {0} of {1} peers from {2}.".format(located, len(ip_addresses), GEOIP_DATABASE_FILE))
+
+def geolocate_online(license, ip_addresses, geoip_cache):
     with geoip2.webservice.Client(license["account"], license['license_key'], host="geolite.info") as client:
         for ip_address in ip_addresses:
-            if ip_address in geoip_cache:
-                #app.logger.info("GEOLOCATE: Have a cache entry for {0}".format(ip_address))
-                if geoip_cache[ip_address]:
-                    #app.logger.info("GEOLOCATE: Already have a valid location for {0} at {1}".format(ip_address, geoip_cache[ip_address]))
-                    continue
-                elif not missing_retry:
-                    app.logger.info("GEOLOCATE: No valid location, but not retrying yet. {0}".format(ip_address))
-                    continue  # Don't request location too often for IPs which weren't resolved earlier
-                else:
-                    app.logger.info("GEOLOCATE: Retrying {0}, as previously returned {1}.".format(ip_address, geoip_cache[ip_address]))
             try:
                 app.logger.info("GEOLOCATE: Querying maxmind for a valid location of {0}".format(ip_address))
                 response = client.city(ip_address)
                 app.logger.info("{0} located at {1}".format(ip_address, response.location))
-                geoip_cache[ip_address] = { 
-                    'latitude': response.location.latitude, 
-                    'longitude': response.location.longitude, 
-                }
-                try:
-                    geoip_cache[ip_address]['city'] = ast.literal_eval(str(response.city.names))
-                except:
-                    pass
-                try:
-                    geoip_cache[ip_address]['country'] = ast.literal_eval(str(response.country.names))
-                except:
-                    pass
+                geoip_cache[ip_address] = location_of(response)
             except Exception as ex:
                 geoip_cache[ip_address] = None
                 app.logger.info("Failed to query Maxmind city web service for {0} because {1}.".format(ip_address, str(ex)))
+
+def geolocate_ip_addresses(ip_addresses):
+    global last_missing_location_retry_time
+    reader = open_geoip_database()
+    license = None
+    if not reader:
+        license = load_maxmind_license()
+        if not license:
+            app.logger.info("Skipping geolocation of peer connections by IP address as no Maxmind license or GeoLite2 database found.")
+            return
+    geoip_cache = load_geoip_cache()
+    missing_retry = False
+    if not last_missing_location_retry_time or last_missing_location_retry_time <= \
+        (datetime.datetime.now() - datetime.timedelta(hours=MISSING_LOCATION_RETRY_HOURS)):
+        missing_retry = True  # Since its been a while, retry all missing locations for ips
+        last_missing_location_retry_time = datetime.datetime.now()
+    to_locate = []
+    for ip_address in dict.fromkeys(ip_addresses):  # Peers are often shared across blockchains
+        if ip_address in geoip_cache:
+            if geoip_cache[ip_address]:
+                continue
+            elif not missing_retry:
+                continue  # Don't request location too often for IPs which weren't resolved earlier
+        to_locate.append(ip_address)
+    if not to_locate:
+        return
+    if reader:
+        geolocate_offline(to_locate, geoip_cache)
+    else:
+        geolocate_online(license, to_locate, geoip_cache)
     save_geoip_cache(geoip_cache)
 
 def execute():
@@ -103,7 +145,10 @@ def execute():
         if not gc['is_controller']:
             return # Only controller should attempt geolocation
         ip_addresses = []
-        for connection in db.session.query(co.Connection).all():
+        for peer in db.session.query(pe.Peer.ip).distinct().all():
+            if re.match(r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$', peer.ip) and peer.ip != "127.0.0.1":
+                ip_addresses.append(peer.ip)
+        for connection in db.session.query(co.Connection).filter(co.Connection.details != '').all():
             for line in connection.details.split('\n'):
                 match = re.search(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', line.strip())
                 if match and match.group() != "127.0.0.1":
@@ -8,20 +8,47 @@ import json
 import pathlib
 import os
 import sqlite3
+import threading
 import time
 import traceback
 
+from concurrent.futures import ThreadPoolExecutor
+
 from flask import g
 from sqlalchemy import or_
 
 from common.models import plots as p, plottings as pl
 from common.models import workers as w
 from common.config import globals
+from common.extensions.database import db
+from common.utils import plot_analyzer
 from api import app, utils
 
 STATUS_FILE = '/root/.chia/plotman/status.json'
 ANALYZE_LOGS = '/root/.chia/plotman/analyze'
 CHECK_LOGS = '/root/.chia/plotman/checks'
+METRICS_FILE = '/root/.chia/plotman/checks_metrics.json'
+
+# Number of analyze/check requests in flight across all workers at once
+MAX_CONCURRENT_REQUESTS = 8
+
+# Number of analyze/check requests in flight against any one worker at once
+MAX_CONCURRENT_PER_WORKER = 2
+
+# Stop starting new requests after this long, the rest wait for next cycle
+MAX_CYCLE_SECONDS = 15 * 60
+
+# Give up on a single remote analyze/check after this long
+REQUEST_TIMEOUT_SECS = 120
+
+# Plots sent to a plotter in one analyze request
+ANALYZE_BATCH_SIZE = 500
+
+# Max plot ids per IN clause when looking up plot statuses
+STATUS_QUERY_BATCH_SIZE = 500
+
+# Running totals since launch, reported alongside each cycle's metrics
+totals = { 'analyzed': 0, 'checked': 0, 'failed': 0, 'cycles': 0 }
 
 def have_recent_plot_check_log(plot_check_log):
     try:
@@ -44,152 +71,337 @@ def open_status_json():
         app.logger.error("Failed to read JSON from {0} because {1}".format(STATUS_FILE, str(ex)))
     return status
 
-def write_status_json(status):
-    with open(STATUS_FILE, 'w+') as fp:
-        json.dump(status, fp)
+def load_plot_statuses(short_plot_ids):
+    statuses = {}
+    short_plot_ids = list(set(short_plot_ids))
+    for i in range(0, len(short_plot_ids), STATUS_QUERY_BATCH_SIZE):
+        batch = short_plot_ids[i:i+STATUS_QUERY_BATCH_SIZE]
+        for status in db.session.query(p.PlotStatus).filter(p.PlotStatus.plot_id.in_(batch)).all():
+            statuses[status.plot_id] = status
+    return statuses
 
-def set_analyze_status(workers, status, plot):
-    #app.logger.info("Checking for analyze of {0}".format(plot.plot_id))
-    analyze_log = ANALYZE_LOGS + '/' + plot.plot_id[:8] + '.log'
-    analysis_seconds = None
-    if not os.path.exists(analyze_log):
-        [hostname, displayname, result] = request_analyze(plot.file, workers)
-        if result:
-            with open(analyze_log, 'w+') as f:
-                f.write("Plotman analyze from {0} ({1}) found at {2}\n".format(displayname, 
-                    hostname, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-                f.write(result)
-        else:  
-            pathlib.Path(analyze_log).touch() # Leave an empty mark file for no result
-    with open(analyze_log, 'r+') as f:
-        for line in f.readlines():
-            #app.logger.info(line)
-            if line.startswith("Plotman"): # Header line with hostname
-                try:
-                    splits = line.split()
-                    hostname = splits[4][1:-1] # strip off brackets
-                    displayname = splits[3]
-                except Exception as ex:
-                    app.log.error("Failed to parse plotman analyze header because: {0}".format(str(ex)))
-                    app.log.error(line)
-            elif line.startswith("| x "):
-                try:
-                    analysis_seconds = line.split('|')[8].strip()
-                except Exception as ex:
-                    app.log.error("Failed to parse plotman analyze line because: {0}".format(str(ex)))
-                    app.log.error(line)
-    if plot.plot_id[:8] in status:
-        plot_state = status[plot.plot_id[:8]]
-    else:
-        plot_state = {}
-        status[plot.plot_id[:8]] = plot_state
-    if analysis_seconds:
-        #app.logger.info("For {0} found {1} seconds.".format(plot.plot_id, analysis_seconds))
-        plot_state['analyze'] = { 'host': hostname, 'seconds': analysis_seconds }
-    else:
-        plot_state['analyze'] = None
- 
-def request_analyze(plot_file, workers):
-    # Don't know which plotter might have the plot result so try them in-turn
-    for plotter in workers:
-        #app.logger.info("{0}:{1} - {2} - {3}".format(plotter.hostname, plotter.port, plotter.blockchain, plotter.mode))
-        if (plotter.mode == 'fullnode' and plotter.blockchain in pl.PLOTTABLE_BLOCKCHAINS) or 'plotter' in plotter.mode:
-            if plotter.latest_ping_result != "Responding":
-                app.logger.info("Skipping analyze call to {0} as last ping was: {1}".format( \
-                    plotter.hostname, plotter.latest_ping_result))
-                continue
+def parse_analyze_output(output):
+    for line in output.splitlines():
+        if line.startswith("Total: "):  # Written by the built-in analyzer
+            return line.split()[1].split('.')[0]
+        if line.startswith("| x "):
             try:
-                app.logger.debug("Trying {0}:{1} for analyze....".format(plotter.hostname, plotter.port))
-                payload = {"service":"plotting", "action":"analyze", "plot_file": plot_file }
-                response = utils.send_worker_post(plotter, "/analysis/", payload, debug=False)
-                if response.status_code == 200:
-                    return [plotter.hostname, plotter.displayname, response.content.decode('utf-8')]
-                elif response.status_code == 404:
-                    app.logger.debug("Plotter on {0}:{1} did not have plot log for {2}".format(
-                        plotter.hostname, plotter.port, plot_file))
-                else:
-                    app.logger.debug("Plotter on {0}:{1} returned an unexpected error: {2}".format(
-                        plotter.hostname, plotter.port, response.status_code))
+                return line.split('|')[8].strip()
             except Exception as ex:
-                app.logger.error(str(ex))
-    return [None, None, None]
+                app.logger.error("Failed to parse plotman analyze line because: {0}".format(str(ex)))
+                app.logger.error(line)
+    return None
 
-def set_check_status(workers, status, plot):
-    app.logger.debug("Checking for plot check of {0}".format(plot.plot_id))
-    check_log = CHECK_LOGS + '/' + plot.plot_id[:8] + '.log'
-    check_status = None
-    requested_status = False
-    if not os.path.exists(check_log):
-        requested_status = True
-        [hostname, displayname, result] = request_check(plot, workers)
-        if result:
-            with open(check_log, 'w+') as f:
-                f.write("Plots check from {0} ({1}) found at {2}\n".format(displayname, 
-                    hostname, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-                f.write(result)
-        else:  
-            pathlib.Path(check_log).touch() # Leave an empty mark file for no result
-    with open(check_log, 'r+') as f:
-        for line in f.readlines():
-            #app.logger.info(line)
-            if line.startswith("Plots check from "):
-                check_status = 'BAD'  # Assume an invalid plot unless get valid line below
-                try:
-                    splits = line.split()
-                    hostname = splits[4][1:-1] # strip off brackets
-                    displayname = splits[3]
-                except Exception as ex:
-                    app.log.error("Failed to parse plots check header because: {0}".format(str(ex)))
-                    app.log.error(line)
-            elif "Found 1 valid plots" in line:
-                check_status = 'GOOD'
-    if plot.plot_id[:8] in status:
-        plot_state = status[plot.plot_id[:8]]
-    else:
-        plot_state = {}
-        status[plot.plot_id[:8]] = plot_state
-    if check_status:
-        #app.logger.info("For {0} found {1} status.".format(plot.plot_id, check_status))
-        plot_state['check'] = { 'host': hostname, 'status': check_status }
+def analyze_seconds(record):
+    if isinstance(record, str):  # Formatted text from plotters that predate batch requests
+        return parse_analyze_output(record)
+    if record.get('total_seconds') is None:
+        return None
+    return str(int(round(record['total_seconds'])))
+
+def parse_check_output(output):
+    if not output:
+        return None
+    if "Found 1 valid plots" in output:
+        return 'GOOD'
+    return 'BAD'  # Assume an invalid plot unless get valid line
+
+def read_result_log(log_file):
+    hostname = None
+    with open(log_file, 'r') as f:
+        header = f.readline()
+        output = f.read()
+    if header.startswith("Plotman analyze from ") or header.startswith("Plots check from "):
+        try:
+            hostname = header.split()[4][1:-1] # strip off brackets
+        except Exception as ex:
+            app.logger.error("Failed to parse result log header because: {0}".format(str(ex)))
+            app.logger.error(header)
+    return [hostname, output]
+
+def import_status_json():
+    # One-time import of the old status.json file and analyze/check logs into the plot_statuses table
+    if not os.path.exists(STATUS_FILE):
+        return
+    time_start = time.time()
+    existing = set([ row[0] for row in db.session.query(p.PlotStatus.plot_id).all() ])
+    now = datetime.datetime.now()
+    rows = {}
+    for plot_id, plot_state in open_status_json().items():
+        row = rows.setdefault(plot_id[:8], p.PlotStatus(plot_id=plot_id[:8]))
+        if 'analyze' in plot_state:
+            row.analyzed_at = now
+            if plot_state['analyze']:
+                row.analyze_host = plot_state['analyze'].get('host')
+                row.analyze_seconds = plot_state['analyze'].get('seconds')
+        if 'check' in plot_state:
+            row.checked_at = now
+            if plot_state['check']:
+                row.check_host = plot_state['check'].get('host')
+                row.check_status = plot_state['check'].get('status')
+    for log_file in pathlib.Path(ANALYZE_LOGS).glob('*.log'):
+        row = rows.setdefault(log_file.stem, p.PlotStatus(plot_id=log_file.stem))
+        if not row.analyzed_at:
+            try:
+                row.analyze_host, output = read_result_log(log_file)
+                row.analyze_seconds = parse_analyze_output(output)
+                row.analyzed_at = datetime.datetime.fromtimestamp(log_file.stat().st_mtime)
+            except Exception as ex:
+                app.logger.error("Failed to import analyze log {0} because {1}".format(log_file, str(ex)))
+    for log_file in pathlib.Path(CHECK_LOGS).glob('*.log'):
+        row = rows.setdefault(log_file.stem, p.PlotStatus(plot_id=log_file.stem))
+        if not row.checked_at:
+            try:
+                row.check_host, output = read_result_log(log_file)
+                row.check_status = parse_check_output(output)
+                row.checked_at = datetime.datetime.fromtimestamp(log_file.stat().st_mtime)
+            except Exception as ex:
+                app.logger.error("Failed to import check log {0} because {1}".format(log_file, str(ex)))
+    try:
+        db.session.bulk_save_objects([ row for plot_id, row in rows.items() if plot_id not in existing ])
+        db.session.commit()
+        os.rename(STATUS_FILE, STATUS_FILE + '.imported')
+        app.logger.info("PLOTS CHECK: Imported {0} plot statuses from {1} in {2} seconds.".format(
+            len(rows), STATUS_FILE, round(time.time()-time_start, 2)))
+    except Exception as ex:
+        db.session.rollback()
+        app.logger.error("Failed to import plot statuses from {0} because {1}".format(STATUS_FILE, str(ex)))
+
+def write_result_log(log_file, title, worker, result):
+    if result:
+        with open(log_file, 'w+') as f:
+            f.write("{0} from {1} ({2}) found at {3}\n".format(title, worker.displayname, 
+                worker.hostname, datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            f.write(result)
+    else:  
+        pathlib.Path(log_file).touch() # Leave an empty mark file for no result
+
+def is_plotter(worker):
+    return (worker.mode == 'fullnode' and worker.blockchain in pl.PLOTTABLE_BLOCKCHAINS) or 'plotter' in worker.mode
+
+def is_harvester(worker):
+    return worker.mode == 'fullnode' or 'harvester' in worker.mode
+
+def index_plotters():
+    # Remember which plotter reported each running job, so analyze goes straight there once the plot is farmed
+    try:
+        plottings = db.session.query(pl.Plotting).all()
+        statuses = load_plot_statuses([ plotting.plot_id[:8] for plotting in plottings ])
+        for plotting in plottings:
+            status = statuses.get(plotting.plot_id[:8])
+            if not status:
+                status = p.PlotStatus(plot_id=plotting.plot_id[:8])
+                statuses[status.plot_id] = status
+                db.session.add(status)
+            status.plotter_host = plotting.hostname
+            status.plotter_blockchain = plotting.blockchain
+        db.session.commit()
+    except Exception as ex:
+        db.session.rollback()
+        app.logger.error("Failed to index plotting jobs by plotter because: {0}".format(str(ex)))
+
+def find_plotters(status, workers):
+    plotters = [ worker for worker in workers if is_plotter(worker) ]
+    if status and status.plotter_host:
+        owners = [ plotter for plotter in plotters if plotter.hostname == status.plotter_host and \
+            plotter.blockchain == status.plotter_blockchain ]
+        if owners:
+            return owners
+    # Don't know which plotter might have the plot log so try them in-turn
+    return plotters
+
+def find_harvester(plot, workers):
+    for worker in workers:
+        if is_harvester(worker) and worker.hostname == plot.hostname and worker.blockchain == plot.blockchain:
+            return worker
+    return None
+
+def post_analysis(worker, limits, payload):
+    with limits[worker.hostname]:
+        app.logger.debug("Sending {0} of {1} to {2}:{3}".format(payload['action'], 
+            payload.get('plot_file', "{0} plots".format(len(payload.get('plot_files', [])))), worker.hostname, worker.port))
+        return utils.send_worker_post(worker, "/analysis/", payload, timeout=REQUEST_TIMEOUT_SECS, debug=False)
+
+def send_analysis(worker, limits, payload):
+    response = post_analysis(worker, limits, payload)
+    if response.status_code == 200:
+        return response.content.decode('utf-8')
+    elif response.status_code == 404:
+        app.logger.debug("Worker on {0}:{1} had no {2} result for {3}".format(
+            worker.hostname, worker.port, payload['action'], payload.get('plot_file')))
     else:
-        plot_state['check'] = None
-    return requested_status
-
-def request_check(plot, workers):
-    # Don't know which harvester might have the plot result so try them in-turn
-    for harvester in workers:
-        app.logger.debug("{0}:{1} - {2} - {3}".format(harvester.hostname, harvester.port, harvester.blockchain, harvester.mode))
-        if harvester.mode == 'fullnode' or 'harvester' in harvester.mode:
-            if harvester.latest_ping_result != "Responding":
-                app.logger.debug("Skipping check call to {0} as last ping was: {1}".format( \
-                    harvester.hostname, harvester.latest_ping_result))
-                continue
-            if harvester.hostname != plot.hostname or harvester.blockchain != plot.blockchain:
-                app.logger.debug("Skipping check call to {0} ({1}) for plot on {2} ({3})".format( \
-                    harvester.hostname, harvester.blockchain, plot.hostname, plot.blockchain))
+        app.logger.info("Worker on {0}:{1} returned an unexpected error: {2}".format(
+            worker.hostname, worker.port, response.status_code))
+    return None
+
+def request_analyze_each(plotter, plot_files, first_response, deadline, limits):
+    # Plotters that predate batches answered for the first plot only, so ask for the rest one at a time
+    found = {}
+    if first_response.status_code == 200:
+        found[plot_files[0]] = first_response.content.decode('utf-8')
+    for plot_file in plot_files[1:]:
+        if time.time() > deadline:
+            return [found, False]
+        result = send_analysis(plotter, limits, {"service":"plotting", "action":"analyze", "plot_file": plot_file })
+        if result:
+            found[plot_file] = result
+    return [found, True]
+
+def request_analyze(plots, plotters, deadline, limits):
+    # Each plotter is sent the whole batch at once and returns only those plots whose job log it holds
+    if time.time() > deadline:
+        return [ [plot, 'deferred', None, None] for plot in plots ]
+    remaining = { plot.file: plot for plot in plots }
+    results = []
+    failed = False
+    for plotter in plotters:
+        if not remaining:
+            break
+        if plotter.latest_ping_result != "Responding":
+            app.logger.debug("Skipping analyze call to {0} as last ping was: {1}".format( \
+                plotter.hostname, plotter.latest_ping_result))
+            continue
+        plot_files = list(remaining.keys())
+        # Older plotters read only plot_file, answering for that one plot in plain text or with a 404
+        payload = {"service":"plotting", "action":"analyze", "plot_files": plot_files, "plot_file": plot_files[0] }
+        try:
+            response = post_analysis(plotter, limits, payload)
+            if response.status_code == 200 and response.headers.get('Content-Type', '').startswith('application/json'):
+                found = json.loads(response.content.decode('utf-8'))
+            elif response.status_code in [200, 404]:
+                [found, complete] = request_analyze_each(plotter, plot_files, response, deadline, limits)
+                failed = failed or not complete
+            else:
+                app.logger.info("Worker on {0}:{1} returned an unexpected error: {2}".format(
+                    plotter.hostname, plotter.port, response.status_code))
+                failed = True
                 continue
+            for plot_file, result in found.items():
+                plot = remaining.pop(plot_file, None)
+                if plot and result:
+                    write_result_log(ANALYZE_LOGS + '/' + plot.plot_id[:8] + '.log', "Plotman analyze", plotter, 
+                        result if isinstance(result, str) else plot_analyzer.format_text(result))
+                    results.append([plot, 'analyzed', plotter, result])
+        except Exception as ex:
+            app.logger.info("Failed to request analyze from {0}: {1}".format(plotter.hostname, str(ex)))
+            failed = True
+    for plot in remaining.values():
+        if failed:
+            results.append([plot, 'failed', None, None])  # Retry next cycle, a plotter may have the log
+        else:
+            write_result_log(ANALYZE_LOGS + '/' + plot.plot_id[:8] + '.log', "Plotman analyze", None, None)
+            results.append([plot, 'analyzed', None, None])
+    return results
+
+def request_check(plot, harvester, deadline, limits):
+    if time.time() > deadline:
+        return [[plot, 'deferred', None, None]]
+    if not harvester or harvester.latest_ping_result != "Responding":
+        app.logger.debug("Deferring check of {0} as its harvester {1} is not responding.".format(plot.file, plot.hostname))
+        return [[plot, 'deferred', None, None]]
+    check_log = CHECK_LOGS + '/' + plot.plot_id[:8] + '.log'
+    payload = {"service":"farming", "action":"check", "plot_file": plot.dir + '/' + plot.file }
+    try:
+        result = send_analysis(harvester, limits, payload)
+    except Exception as ex:
+        app.logger.info("Failed to request check from {0}: {1}".format(harvester.hostname, str(ex)))
+        return [[plot, 'failed', None, None]]
+    write_result_log(check_log, "Plots check", harvester, result)
+    return [[plot, 'checked', harvester, result]]
+
+def store_results(statuses, results):
+    now = datetime.datetime.now()
+    for plot, outcome, worker, result in results:
+        if not outcome in ['analyzed', 'checked']:
+            continue
+        status = statuses.get(plot.plot_id[:8])
+        if not status:
+            status = p.PlotStatus(plot_id=plot.plot_id[:8])
+            statuses[status.plot_id] = status
+            db.session.add(status)
+        if outcome == 'analyzed':
+            status.analyze_host = worker.hostname if result else None
+            status.analyze_seconds = analyze_seconds(result) if result else None
+            status.analyzed_at = now
+        else:
+            status.check_host = worker.hostname if result else None
+            status.check_status = parse_check_output(result)
+            status.checked_at = now
+
+def interleave_by_worker(tasks):
+    # Round-robin across target workers so one big harvester doesn't starve the rest of the pool
+    queues = {}
+    for target, task in tasks:
+        queues.setdefault(target, []).append(task)
+    ordered = []
+    while queues:
+        for target in list(queues.keys()):
+            ordered.append(queues[target].pop(0))
+            if not queues[target]:
+                del queues[target]
+    return ordered
+
+def run_requests(tasks, workers):
+    limits = {}
+    for worker in workers:
+        limits[worker.hostname] = threading.BoundedSemaphore(MAX_CONCURRENT_PER_WORKER)
+    results = []
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        futures = [ executor.submit(func, *args, limits) for func, args in tasks ]
+        for future in futures:
             try:
-                app.logger.debug("Trying {0}:{1} for plot check....".format(harvester.hostname, harvester.port))
-                payload = {"service":"farming", "action":"check", "plot_file": plot.dir + '/' + plot.file }
-                response = utils.send_worker_post(harvester, "/analysis/", payload, debug=True)
-                if response.status_code == 200:
-                    return [harvester.hostname, harvester.displayname, response.content.decode('utf-8')]
-                elif response.status_code == 404:
-                    app.logger.debug("Harvester on {0}:{1} did not have plot check for {2}".format(
-                        harvester.hostname, harvester.port, plot.file))
-                else:
-                    app.logger.info("Harvester on {0}:{1} returned an unexpected error: {2}".format(
-                        harvester.hostname, harvester.port, response.status_code))
+                results.extend(future.result())  # Each request returns results for one or more plots
             except Exception as ex:
-                app.logger.info(str(ex))
-    return [None, None, None]
+                app.logger.error("Plot analyze/check request failed: {0}".format(str(ex)))
+                results.append([None, 'failed', None, None])
+    return results
+
+def save_metrics(backlog_analyze, backlog_check, results, elapsed):
+    results = [ result[1] for result in results ]
+    completed = results.count('analyzed') + results.count('checked')
+    totals['analyzed'] += results.count('analyzed')
+    totals['checked'] += results.count('checked')
+    totals['failed'] += results.count('failed')
+    totals['cycles'] += 1
+    metrics = {
+        'updated_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'backlog_analyze': backlog_analyze - results.count('analyzed'),
+        'backlog_check': backlog_check - results.count('checked'),
+        'cycle_analyzed': results.count('analyzed'),
+        'cycle_checked': results.count('checked'),
+        'cycle_failed': results.count('failed'),
+        'cycle_deferred': results.count('deferred'),
+        'cycle_seconds': round(elapsed, 2),
+        'plots_per_minute': round(completed * 60 / elapsed, 2) if elapsed > 0 else 0,
+        'total_analyzed': totals['analyzed'],
+        'total_checked': totals['checked'],
+        'total_failed': totals['failed'],
+        'total_cycles': totals['cycles'],
+    }
+    app.logger.info("PLOTS CHECK: {0} analyzed and {1} checked in {2} seconds ({3} failed, {4} deferred). Backlog is {5} analyze and {6} check.".format(
+        metrics['cycle_analyzed'], metrics['cycle_checked'], metrics['cycle_seconds'], metrics['cycle_failed'],
+        metrics['cycle_deferred'], metrics['backlog_analyze'], metrics['backlog_check']))
+    try:
+        with open(METRICS_FILE, 'w+') as fp:
+            json.dump(metrics, fp)
+    except Exception as ex:
+        app.logger.error("Failed to write plots check metrics to {0} because {1}".format(METRICS_FILE, str(ex)))
+
+def open_metrics_json():
+    metrics = {}
+    try:
+        if os.path.exists(METRICS_FILE):
+            with open(METRICS_FILE, 'r') as fp:
+                metrics = json.load(fp)
+    except Exception as ex:
+        app.logger.error("Failed to read JSON from {0} because {1}".format(METRICS_FILE, str(ex)))
+    return metrics
 
 def execute():
     if 'plots_check_analyze_skip' in os.environ and os.environ['plots_check_analyze_skip'].lower() == 'true':
         app.logger.info("Skipping plots check and analyze as environment variable 'plots_check_analyze_skip' is present.")
         return
     with app.app_context():
-        from api import db
         gc = globals.load()
         if not gc['is_controller']:
             return # Only controller should initiate check/analyze against other fullnodes/harvesters
@@ -198,19 +410,45 @@ def execute():
             os.makedirs(CHECK_LOGS)
         except Exception as ex:
             app.logger.debug("Unable to create analyze and check folders in plotman. {0}".format(str(ex)))
-        workers = db.session.query(w.Worker)
+        time_start = time.time()
+        deadline = time_start + MAX_CYCLE_SECONDS
+        import_status_json()
+        index_plotters()  # Commits, so load everything used by request threads afterwards
+        workers = db.session.query(w.Worker).all()
         plots = db.session.query(p.Plot).filter(or_(p.Plot.plot_check.is_(None), 
             p.Plot.plot_analyze.is_(None))).order_by(p.Plot.created_at.desc()).all()
-        status = open_status_json()
-        requested_status_count = 0
-        #app.logger.info("Querying for plots...")
+        statuses = load_plot_statuses([ plot.plot_id[:8] for plot in plots ])
+        tasks = []
+        analyze_batches = {}
+        backlog_analyze = 0
+        backlog_check = 0
         for plot in plots:
-            #app.logger.info("Checking plot {0}".format(plot.plot_id))
-            set_analyze_status(workers, status, plot)
-            if os.environ['blockchains'][0] == 'mmx':
+            status = statuses.get(plot.plot_id[:8])
+            if not status or not status.analyzed_at:
+                plotters = find_plotters(status, workers)
+                batch_key = tuple([ (plotter.hostname, plotter.blockchain) for plotter in plotters ])
+                batch = analyze_batches.setdefault(batch_key, (plotters, []))[1]
+                batch.append(plot)
+                backlog_analyze += 1
+            if plot.blockchain == 'mmx':
                 continue # Skip over MMX plots as they can't be checked
-            if set_check_status(workers, status, plot):
-                requested_status_count += 1
-            if requested_status_count > 5:  # Only remote request `check plots` on at most 5 plots per cycle
-                break
-        write_status_json(status)
\ No newline at end of file
+            if not status or not status.checked_at:
+                tasks.append((plot.hostname, (request_check, (plot, find_harvester(plot, workers), deadline))))
+                backlog_check += 1
+        for batch_key, (plotters, batch) in analyze_batches.items():
+            target = plotters[0].hostname if len(plotters) == 1 else None
+            for i in range(0, len(batch), ANALYZE_BATCH_SIZE):
+                tasks.append((target, (request_analyze, (batch[i:i+ANALYZE_BATCH_SIZE], plotters, deadline))))
+        results = run_requests(interleave_by_worker(tasks), workers)
+        try:
+            store_results(statuses, results)
+            for plot in plots:  # Copy results onto the farmed plots in the same transaction
+                status = statuses.get(plot.plot_id[:8])
+                if status:
+                    plot.plot_analyze = status.plot_analyze()
+                    plot.plot_check = status.plot_check()
+            db.session.commit()
+        except Exception as ex:
+            db.session.rollback()
+            app.logger.error("Failed to store plot check and analyze results because {0}".format(str(ex)))
+        save_metrics(backlog_analyze, backlog_check, results, time.time() - time_start)
@@ -15,15 +15,18 @@ import time
 import traceback
 
 from flask import g
-from sqlalchemy import or_
+from sqlalchemy import func, or_
 
-from common.models import plots as p, plottings as pl
+from common.models import plots as p, plottings as pl, stats as st
 from common.models import workers as w
 from common.config import globals
 from api import app, utils
 
 REPLOTTING_CONFIG = '/root/.chia/machinaris/config/replotting.json'
 
+# Guard against deleting too much of the farm at once, more are freed next cycle
+MAX_DELETES_PER_CYCLE = 50
+
 def load_replotting_settings():
     settings = {}
     if os.path.exists(REPLOTTING_CONFIG):
@@ -32,52 +35,113 @@ def load_replotting_settings():
     return settings
 
 def gather_harvesters(db, blockchain):
-    workers = []
+    workers = {}
     query = db.session.query(p.Plot.hostname.distinct().label("hostname")).filter(p.Plot.blockchain == blockchain)
     for hostname in [row.hostname for row in query.all()]:
         worker = db.session.query(w.Worker).filter(w.Worker.blockchain == blockchain, w.Worker.hostname == hostname).first()
         if worker: 
-            workers.append(worker)
+            workers[hostname] = worker
         else:
             app.logger.error("Found no worker for {0} at {1}".format(blockchain, hostname))
     return workers
 
-def gather_oldest_solo_plots(db, harvester):
-    return db.session.query(p.Plot).filter(p.Plot.blockchain == harvester.blockchain, p.Plot.hostname == harvester.hostname,
-        p.Plot.type == 'solo').order_by(p.Plot.created_at.asc()).limit(20).all()
-
-def gather_plots_before(db, harvester, delete_before_date):
-    return db.session.query(p.Plot).filter(p.Plot.blockchain == harvester.blockchain, p.Plot.hostname == harvester.hostname,
-        p.Plot.created_at < "{0} 00:00".format(delete_before_date)).order_by(p.Plot.created_at.asc()).limit(20).all()
+def candidate_filters(settings):
+    filters = []
+    if settings.get('delete_solo'):
+        filters.append(p.Plot.type == 'solo')
+    if settings.get('delete_before'):
+        filters.append(p.Plot.created_at < "{0} 00:00".format(settings['delete_before_date']))
+    if settings.get('delete_by_ksize'):
+        ksizes = settings.get('delete_by_ksizes', [])
+        if len(ksizes) == 0:
+            app.logger.error("Invalid empty list of ksizes to select plots for deletion.")
+        elif [ ksize for ksize in ksizes if not ksize in p.KSIZES ]:
+            app.logger.error("Invalid target ksize for deletion provided: {0}".format(ksizes))
+        else:
+            filters.extend([p.Plot.file.like("%-k{0}-%".format(ksize)) for ksize in ksizes])
+    return filters
 
-def gather_plots_by_ksize(db, harvester, delete_by_ksizes):
-    if len(delete_by_ksizes) == 0:
-        app.logger.error("Invalid empty list of ksizes to select plots for deletion.")
+def gather_candidate_plots(db, blockchain, settings):
+    # All plots across the farm meeting any of the deletion criteria, oldest first
+    filters = candidate_filters(settings)
+    if not filters:
         return []
-    for ksize in delete_by_ksizes:
-        if not ksize in p.KSIZES:
-            app.logger.error("Invalid target ksize for deletion provided: {0}".format(ksize))
-            return []
-    return db.session.query(p.Plot).filter(p.Plot.blockchain == harvester.blockchain, p.Plot.hostname == harvester.hostname,
-        or_(*[p.Plot.file.like("-k{0}-".format(ksize)) for ksize in delete_by_ksizes])).order_by(p.Plot.created_at.asc()).limit(20).all()
+    return db.session.query(p.Plot.hostname, p.Plot.dir, p.Plot.file, p.Plot.size, p.Plot.created_at).filter(
+        p.Plot.blockchain == blockchain, or_(*filters)).order_by(p.Plot.created_at.asc()).all()
 
-def limit_deletes_to_accomodate_ksize(db, candidate_plots, free_ksize):
-    size_bytes_to_delete = 0
-    plots_to_delete = []
-    try:
-        required_free_space = p.FREE_GIBS_REQUIRED_FOR_KSIZE[free_ksize]
-        for plot in candidate_plots:
-            if size_bytes_to_delete >= (required_free_space * 1024 * 1024 * 1024):
-                return plots_to_delete
-            plots_to_delete.append(os.path.join(plot.dir, plot.file))
-            size_bytes_to_delete += plot.size
-    except Exception as ex:
-        app.logger.error("Error limiting candidate plots to minimum required for k{0} size replotting because {1}".format(free_ksize, str(ex)))
-    return plots_to_delete # Maybe empty if no candiate plots needed
+def gather_disks_free(db):
+    # Most recent free space, in GiB, reported for each plots disk by each worker
+    disks = {}
+    stat = st.StatPlotsDiskFree
+    latest = db.session.query(stat.hostname, stat.path, func.max(stat.created_at).label('created_at')) \
+        .group_by(stat.hostname, stat.path).subquery()
+    query = db.session.query(stat.hostname, stat.path, stat.value).join(latest, (stat.hostname == latest.c.hostname) &
+        (stat.path == latest.c.path) & (stat.created_at == latest.c.created_at))
+    for row in query.all():
+        disks.setdefault(row.hostname, {})[row.path] = row.value
+    return disks
+
+def find_disk(disks_free, hostname, dir):
+    # Longest reported disk path containing this directory, else the directory itself with unknown free space
+    best = None
+    for path in disks_free.get(hostname, {}).keys():
+        if (dir == path or dir.startswith(path.rstrip('/') + '/')) and (not best or len(path) > len(best)):
+            best = path
+    if best:
+        return [best, disks_free[hostname][best]]
+    return [dir, None]
+
+def gather_pending_jobs(db, blockchain, disks_free):
+    # Running plotting jobs by the disk their plot will land on, when that disk is also farmed
+    pending = {}
+    for plotting in db.session.query(pl.Plotting).filter(pl.Plotting.blockchain == blockchain).all():
+        disk, free_gibs = find_disk(disks_free, plotting.hostname, plotting.dst)
+        pending[(plotting.hostname, disk)] = pending.get((plotting.hostname, disk), 0) + 1
+    return pending
+
+def plan_deletions(db, blockchain, settings):
+    free_ksize = settings['free_ksize']
+    plot_gibs = p.FREE_GIBS_REQUIRED_FOR_KSIZE[free_ksize]
+    disks_free = gather_disks_free(db)
+    pending = gather_pending_jobs(db, blockchain, disks_free)
+    disks = {}
+    for plot in gather_candidate_plots(db, blockchain, settings):
+        disk, free_gibs = find_disk(disks_free, plot.hostname, plot.dir)
+        key = (plot.hostname, disk)
+        if not key in disks:
+            pending_jobs = pending.get(key, 0)
+            required_gibs = plot_gibs * max(1, pending_jobs)
+            disks[key] = {
+                'hostname': plot.hostname,
+                'disk': disk,
+                'free_gibs': free_gibs,
+                'pending_jobs': pending_jobs,
+                'required_gibs': required_gibs,
+                'deficit_gibs': required_gibs - free_gibs if free_gibs is not None else required_gibs,
+                'delete_gibs': 0,
+                'plots': [],
+            }
+        plan = disks[key]
+        if plan['delete_gibs'] < plan['deficit_gibs']:
+            plan['plots'].append({ 'path': os.path.join(plot.dir, plot.file), 'dir': plot.dir, 
+                'size': plot.size, 'created_at': plot.created_at })
+            plan['delete_gibs'] += plot.size / (1024 * 1024 * 1024)
+    # Feed disks with plotting jobs headed their way first, then those holding the oldest candidates
+    schedule = [ plan for plan in disks.values() if plan['plots'] ]
+    schedule.sort(key=lambda plan: (-plan['pending_jobs'], plan['plots'][0]['created_at']))
+    deletes = 0
+    for plan in schedule:
+        if deletes + len(plan['plots']) > MAX_DELETES_PER_CYCLE:
+            plan['plots'] = plan['plots'][:max(0, MAX_DELETES_PER_CYCLE - deletes)]
+            plan['delete_gibs'] = sum([ plot['size'] for plot in plan['plots'] ]) / (1024 * 1024 * 1024)
+        deletes += len(plan['plots'])
+        plan['delete_gibs'] = round(plan['delete_gibs'], 2)
+    return [ plan for plan in schedule if plan['plots'] ]
 
-def send_delete_request(harvester, blockchain, free_ksize, candidate_plots):
+def send_delete_request(harvester, blockchain, free_ksize, candidate_plots, free_gibs):
     app.logger.info("Requesting deletion of these plots on {0} ({1}) to allow replotting: {2}".format(harvester.displayname, harvester.hostname, candidate_plots))
-    payload = {"service": "farming", "blockchain": blockchain, "action": "delete_for_replotting", "free_ksize": free_ksize, "plot_files": candidate_plots }
+    payload = {"service": "farming", "blockchain": blockchain, "action": "delete_for_replotting", "free_ksize": free_ksize, 
+        "plot_files": candidate_plots, "free_gibs": free_gibs }
     try:
         utils.send_worker_post(harvester, "/actions/", payload=payload, debug=False)        
     except Exception as ex:
@@ -96,33 +160,31 @@ def execute():
             else:
                 try:
                     settings = replotting_settings[blockchain] # Work with settings for this blockchain in particular
-                    for harvester in gather_harvesters(db, blockchain):
-                        app.logger.debug("Checking {0} harvester {1} for candidate plot deletions. ({2})".format(blockchain, harvester.displayname, harvester.hostname))
-                        candidate_plots = []
-                        if settings['delete_solo']:
-                            candidate_plots.extend(gather_oldest_solo_plots(db, harvester))
-                        if settings['delete_before']:
-                            candidate_plots.extend(gather_plots_before(db, harvester, settings['delete_before_date']))
-                        if settings['delete_by_ksize']:
-                            candidate_plots.extend(gather_plots_by_ksize(db, harvester, settings['delete_by_ksizes']))
-                        if len(candidate_plots) > 0:
-                            candidate_plots = limit_deletes_to_accomodate_ksize(db, candidate_plots, settings['free_ksize'])
-                        if len(candidate_plots) > 0:
-                            try:
-                                thread = threading.Thread(target=send_delete_request, 
-                                    kwargs={
-                                        'harvester': harvester, 
-                                        'blockchain': blockchain, 
-                                        'free_ksize': settings['free_ksize'],
-                                        'candidate_plots': candidate_plots
-                                    }
-                                )
-                                thread.start()
-                            except Exception as ex:
-                                app.logger.info(traceback.format_exc())
-                            #send_delete_request(harvester, blockchain, settings['free_ksize'], candidate_plots)
-                        else:
-                            app.logger.info("Found no candidate plots for {0} replotting on {1} ({2})".format(blockchain, harvester.displayname, harvester.hostname))
+                    harvesters = gather_harvesters(db, blockchain)
+                    deletions = {}
+                    for plan in plan_deletions(db, blockchain, settings):
+                        plot_files, free_gibs = deletions.setdefault(plan['hostname'], ([], {}))
+                        for plot in plan['plots']:
+                            plot_files.append(plot['path'])
+                            free_gibs[plot['dir']] = plan['required_gibs']
+                    if not deletions:
+                        app.logger.info("Found no candidate plots for {0} replotting across the farm.".format(blockchain))
+                    for hostname, (plot_files, free_gibs) in deletions.items():
+                        if not hostname in harvesters:
+                            continue
+                        try:
+                            thread = threading.Thread(target=send_delete_request, 
+                                kwargs={
+                                    'harvester': harvesters[hostname], 
+                                    'blockchain': blockchain, 
+                                    'free_ksize': settings['free_ksize'],
+                                    'candidate_plots': plot_files,
+                                    'free_gibs': free_gibs,
+                                }
+                            )
+                            thread.start()
+                        except Exception as ex:
+                            app.logger.info(traceback.format_exc())
                 except Exception as ex:
                     app.logger.error("Failed to check for candidate {0} replotting deletions because {1}".format(blockchain, str(ex)))
-                    traceback.print_exc()
\ No newline at end of file
+                    traceback.print_exc()
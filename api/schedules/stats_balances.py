@@ -20,7 +20,8 @@ from common.models import stats, wallets as w
 from common.utils import converters, fiat
 from api.commands import chia_cli, websvcs
 from api.models import chia
-from api import app, utils, db
+from common.extensions.database import db
+from api import app, utils
 
 DELETE_OLD_STATS_AFTER_DAYS = 90
 
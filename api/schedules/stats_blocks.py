@@ -11,7 +11,8 @@ from flask import g
 from common.config import globals
 from common.models import stats
 from common.utils import converters
-from api import app, utils, db
+from common.extensions.database import db
+from api import app, utils
 from api.commands import log_parser
 
 def collect():
@@ -0,0 +1,185 @@
+#
+# Capacity planning: plots per day of each plotter, and projected fill dates of each plots disk.
+# Each run only reads the disk stats and analyze results recorded since the last run, and the
+# plots of the last few days not yet counted, folding them into the forecast kept in the cache folder.
+#
+
+import copy
+import datetime
+import traceback
+
+from sqlalchemy import or_, func
+
+from common.extensions.database import db
+from common.models import plots as p, plottings as pl, stats as st
+from common.utils import caches
+from api import app
+from api.schedules import plots_check, plots_replot
+
+# Daily plot counts kept per plotter, averaged into its plots per day
+PLOTTER_RATE_DAYS = 7
+
+# Half-life of the exponential average of each disk's fill rate
+FILL_RATE_HALF_LIFE_DAYS = 3
+
+# Disks not reported for this long are dropped from the forecast
+STALE_DISK_DAYS = 7
+
+# Size of a k32 plot, used until plot sizes are seen
+DEFAULT_PLOT_GIB = 101.4
+
+STAT_TIME_FORMAT = "%Y%m%d%H%M"
+PLOT_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+def empty_forecast():
+    return { 'watermarks': {}, 'counted': {}, 'disks': {}, 'plotters': {}, 'plot_gib': None, 'farm': {} }
+
+def update_disks(forecast, now):
+    watermark = forecast['watermarks'].get('plots_disk_free', '')
+    rows = db.session.query(st.StatPlotsDiskFree).filter(st.StatPlotsDiskFree.created_at > watermark) \
+        .order_by(st.StatPlotsDiskFree.created_at).all()
+    for row in rows:
+        key = "{0}:{1}".format(row.hostname, row.path)
+        disk = forecast['disks'].setdefault(key, { 'hostname': row.hostname, 'path': row.path,
+            'free_gib': None, 'at': None, 'ewma': 0, 'days': 0 })
+        if disk['at'] and disk['free_gib'] is not None:
+            days = (datetime.datetime.strptime(row.created_at, STAT_TIME_FORMAT) -
+                datetime.datetime.strptime(disk['at'], STAT_TIME_FORMAT)).total_seconds() / 86400
+            if days > 0:
+                # Space freed by replotting deletions is not counted as negative fill
+                rate = max(disk['free_gib'] - row.value, 0) / days
+                disk['ewma'] += (1 - 0.5 ** (days / FILL_RATE_HALF_LIFE_DAYS)) * (rate - disk['ewma'])
+                disk['days'] += days
+        disk['free_gib'] = row.value
+        disk['at'] = row.created_at
+        watermark = row.created_at
+    forecast['watermarks']['plots_disk_free'] = watermark
+    stale_at = (now - datetime.timedelta(days=STALE_DISK_DAYS)).strftime(STAT_TIME_FORMAT)
+    for key in [ key for key, disk in forecast['disks'].items() if disk['at'] < stale_at ]:
+        del forecast['disks'][key]
+    for disk in forecast['disks'].values():
+        disk['gib_per_day'] = None
+        disk['fill_date'] = None
+        if disk['days'] > 0:  # Correct the average's bias towards its starting value of zero
+            disk['gib_per_day'] = round(disk['ewma'] / (1 - 0.5 ** (disk['days'] / FILL_RATE_HALF_LIFE_DAYS)), 2)
+        if disk['gib_per_day']:
+            disk['fill_date'] = (now + datetime.timedelta(days=disk['free_gib'] / disk['gib_per_day'])).strftime(PLOT_TIME_FORMAT)
+    return len(rows)
+
+def plotter_of(status):
+    return (status.plotter_host or status.analyze_host) if status else None
+
+def update_plotters(forecast, now):
+    # Plot times come from filenames, when the job started, so a plot can arrive well after later ones.
+    # Rather than a watermark, keep the plots already counted over the rate window, by plot id.
+    first_day = (now - datetime.timedelta(days=PLOTTER_RATE_DAYS - 1)).strftime("%Y-%m-%d")
+    counted = forecast['counted']
+    plots = db.session.query(p.Plot.plot_id, p.Plot.size, p.Plot.created_at).filter(p.Plot.created_at >= first_day).all()
+    new_plots = {}
+    for plot in plots:  # Same plot may be reported by more than one harvester
+        if not plot.plot_id[:8] in counted:
+            new_plots[plot.plot_id[:8]] = plot
+    # Plots whose plotter was not yet known are looked up again, as jobs are indexed and analyze results arrive
+    unknown = [ plot_id for plot_id, (hostname, day) in counted.items() if hostname == 'unknown' ]
+    statuses = plots_check.load_plot_statuses(list(new_plots.keys()) + unknown)
+    for plot_id, plot in new_plots.items():
+        counted[plot_id] = [ plotter_of(statuses.get(plot_id)) or 'unknown', plot.created_at[:10] ]
+        plot_gib = plot.size / 2**30
+        forecast['plot_gib'] = plot_gib if not forecast['plot_gib'] else forecast['plot_gib'] + 0.01 * (plot_gib - forecast['plot_gib'])
+    for plot_id in unknown:
+        counted[plot_id][0] = plotter_of(statuses.get(plot_id)) or 'unknown'
+    for plot_id in [ plot_id for plot_id, (hostname, day) in counted.items() if day < first_day ]:
+        del counted[plot_id]
+    for plotter in forecast['plotters'].values():
+        plotter['days'] = {}
+    for hostname, day in counted.values():
+        plotter = forecast['plotters'].setdefault(hostname, { 'days': {}, 'analyze_secs': 0, 'analyzed': 0 })
+        plotter['days'][day] = plotter['days'].get(day, 0) + 1
+    for hostname in [ hostname for hostname, plotter in forecast['plotters'].items() if not plotter['days'] and not plotter['analyzed'] ]:
+        del forecast['plotters'][hostname]  # Like 'unknown', once its plots were attributed
+    # Analyze results arrive after the plot is farmed, so they are read by when they were analyzed
+    analyzed_watermark = datetime.datetime.min
+    if forecast['watermarks'].get('analyzed'):
+        analyzed_watermark = datetime.datetime.strptime(forecast['watermarks']['analyzed'], "%Y-%m-%d %H:%M:%S.%f")
+    analyzed = db.session.query(p.PlotStatus.analyze_host, p.PlotStatus.analyze_seconds, p.PlotStatus.analyzed_at) \
+        .filter(p.PlotStatus.analyzed_at > analyzed_watermark, p.PlotStatus.analyze_seconds.is_not(None)).all()
+    for status in analyzed:
+        if status.analyze_host:
+            plotter = forecast['plotters'].setdefault(status.analyze_host, { 'days': {}, 'analyze_secs': 0, 'analyzed': 0 })
+            try:
+                plotter['analyze_secs'] += float(status.analyze_seconds)
+                plotter['analyzed'] += 1
+            except ValueError:
+                pass
+        analyzed_watermark = max(analyzed_watermark, status.analyzed_at)
+    if analyzed_watermark > datetime.datetime.min:
+        forecast['watermarks']['analyzed'] = analyzed_watermark.strftime("%Y-%m-%d %H:%M:%S.%f")
+    running_jobs = dict(db.session.query(pl.Plotting.hostname, func.count(pl.Plotting.plot_id)).group_by(pl.Plotting.hostname).all())
+    for hostname, plotter in forecast['plotters'].items():
+        plotter['plots_per_day'] = None
+        if plotter['days']:
+            first_day = datetime.datetime.strptime(min(plotter['days'].keys()), "%Y-%m-%d")
+            span_days = min(max((now - first_day).total_seconds() / 86400, 1), PLOTTER_RATE_DAYS)
+            plotter['plots_per_day'] = round(sum(plotter['days'].values()) / span_days, 2)
+        # Expected rate from plot timings, if the currently running jobs keep going at the average plot time
+        plotter['running_jobs'] = running_jobs.get(hostname, 0)
+        plotter['timing_plots_per_day'] = None
+        if plotter['analyzed'] and plotter['running_jobs']:
+            plotter['timing_plots_per_day'] = round(plotter['running_jobs'] * 86400 /
+                (plotter['analyze_secs'] / plotter['analyzed']), 2)
+    return len(new_plots)
+
+def load_replot_candidates_gib():
+    candidates_gib = {}
+    for blockchain, settings in plots_replot.load_replotting_settings().items():
+        if not settings.get('enabled'):
+            continue
+        filters = plots_replot.candidate_filters(settings)
+        if filters:
+            size = db.session.query(func.sum(p.Plot.size)).filter(p.Plot.blockchain == blockchain, or_(*filters)).scalar()
+            candidates_gib[blockchain] = round((size or 0) / 2**30, 1)
+    return candidates_gib
+
+def update_farm(forecast, now):
+    farm = {}
+    farm['plot_gib'] = round(forecast['plot_gib'] or DEFAULT_PLOT_GIB, 2)
+    farm['plots_per_day'] = round(sum([ plotter['plots_per_day'] or plotter['timing_plots_per_day'] or 0 \
+        for plotter in forecast['plotters'].values() ]), 2)
+    farm['gib_per_day'] = round(farm['plots_per_day'] * farm['plot_gib'], 2)
+    farm['free_gib'] = round(sum([ disk['free_gib'] for disk in forecast['disks'].values() ]), 1)
+    farm['full_date'] = None
+    days_to_full = None
+    if farm['gib_per_day']:
+        days_to_full = farm['free_gib'] / farm['gib_per_day']
+        farm['full_date'] = (now + datetime.timedelta(days=days_to_full)).strftime(PLOT_TIME_FORMAT)
+    # Once full, replotting frees old plots for new ones, until no plots meet its deletion criteria
+    farm['replot'] = {}
+    for blockchain, candidates_gib in load_replot_candidates_gib().items():
+        farm['replot'][blockchain] = { 'candidates_gib': candidates_gib, 'end_date': None }
+        if days_to_full is not None:
+            farm['replot'][blockchain]['end_date'] = (now + datetime.timedelta(
+                days=days_to_full + candidates_gib / farm['gib_per_day'])).strftime(PLOT_TIME_FORMAT)
+    forecast['farm'] = farm
+
+def collect():
+    with app.app_context():
+        try:
+            time_start = datetime.datetime.now()
+            cache = caches.capacity_cache()
+            # Work on a copy, so a failed run leaves the shared cached forecast untouched
+            forecast = copy.deepcopy(cache.load()) or empty_forecast()
+            for key, value in empty_forecast().items():
+                forecast.setdefault(key, value)
+            forecast['watermarks'].pop('plots', None)  # Replaced by the plots counted
+            # Also when plot analyze is skipped, so new plots are attributed to the plotter running their job
+            plots_check.index_plotters()
+            disk_stats = update_disks(forecast, time_start)
+            plots = update_plotters(forecast, time_start)
+            update_farm(forecast, time_start)
+            forecast['updated_at'] = time_start.strftime("%Y-%m-%d %H:%M:%S")
+            cache.save(forecast)
+            app.logger.info("CAPACITY: Folded {0} disk stats and {1} new plots into forecast in {2} seconds.".format(
+                disk_stats, plots, round((datetime.datetime.now() - time_start).total_seconds(), 2)))
+        except Exception as ex:
+            app.logger.error("Failed to update capacity forecast because {0}".format(str(ex)))
+            app.logger.error(traceback.format_exc())
@@ -11,7 +11,8 @@ import traceback
 
 from common.config import globals
 from common.models import stats
-from api import app, utils, db
+from common.extensions.database import db
+from api import app, utils
 
 DELETE_OLD_STATS_AFTER_DAYS = 1
 
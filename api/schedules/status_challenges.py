@@ -15,12 +15,16 @@ from api import app
 from api.commands import log_parser
 from api import utils
 
+CHALLENGE_HISTOGRAM_RETENTION_DAYS = 30
+
 def delete_old_challenges(db):
     try:
         cutoff = datetime.datetime.now() - datetime.timedelta(hours=1)
         cutoff_str = "{0}".format(cutoff.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3])
         #app.logger.info("Purging old challenges earlier than {0}".format(cutoff_str))
         db.session.query(c.Challenge).filter(c.Challenge.created_at < cutoff_str).delete()
+        cutoff_day = (datetime.datetime.now() - datetime.timedelta(days=CHALLENGE_HISTOGRAM_RETENTION_DAYS)).strftime("%Y-%m-%d")
+        db.session.query(c.ChallengeHistogram).filter(c.ChallengeHistogram.day < cutoff_day).delete()
         db.session.commit()
     except:
         app.logger.info("Failed to delete old challenges.")
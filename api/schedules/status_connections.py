@@ -31,8 +31,12 @@ def update():
                 payload = {
                     "hostname": hostname,
                     "blockchain": blockchain,
-                    "details": connections.text.replace('\r', ''),
                 }
+                if getattr(connections, 'connections', None) is not None: # Gathered via RPC
+                    payload['details'] = ''
+                    payload['peers'] = connections.peers()
+                else: # Legacy blockchains and MMX still send CLI output
+                    payload['details'] = connections.text.replace('\r', '')
                 utils.send_post('/connections/', payload, debug=False)
         except Exception as ex:
             app.logger.info("Failed to load and send connection status because {0}".format(str(ex)))
@@ -11,6 +11,7 @@ import pytz
 import requests
 import socket
 import sqlite3
+import time
 import traceback
 
 from flask import g
@@ -18,7 +19,7 @@ from flask import g
 from common.config import globals
 from common.models import workers as w
 from common.extensions.database import db
-from api.commands import chia_cli, chiadog_cli, plotman_cli
+from api.commands import chia_cli, chiadog_cli, plotman_cli, farm_metrics
 from api import app
 from api import utils
 
@@ -35,16 +36,21 @@ def ping_workers(workers):
     for worker in workers:
         try:
             #app.logger.info("Pinging worker api endpoint: {0}".format(worker.hostname))
+            time_start = time.time()
             utils.send_get(worker, "/ping/", timeout=3, debug=False)
+            farm_metrics.record_ping(worker, time.time() - time_start)
             worker.latest_ping_result = "Responding"
             worker.updated_at = datetime.datetime.now()
             worker.ping_success_at = datetime.datetime.now()
         except requests.exceptions.ConnectTimeout as ex:
             app.logger.info('Received connection timeout from {0}'.format(worker.url + '/ping'))
             worker.latest_ping_result = "Connection Timeout"
+            farm_metrics.record_ping(worker, None)
         except requests.exceptions.ConnectionError as ex:
             app.logger.info('Received connection refused from {0}'.format(worker.url + '/ping'))
             worker.latest_ping_result = "Connection Refused"
+            farm_metrics.record_ping(worker, None)
         except Exception as ex:
             app.logger.info('Received general error from {0}'.format(worker.url + '/ping'))
             worker.latest_ping_result = "Connection Error"
+            farm_metrics.record_ping(worker, None)
@@ -19,30 +19,63 @@ from api.commands import smartctl
 from api import app
 from api import utils
 
+# Resend every drive in full at least this often, in case controller lost them
+FULL_SEND_INTERVAL_MINS = 60
+
+# Identify the drive in every record, changed or not
+DRIVE_KEYS = [ 'hostname', 'device', 'blockchain', 'serial_number' ]
+
+last_full_send_time = None
+last_sent = {}  # device -> record most recently sent to controller
+
+def changed_fields(record):
+    previous = last_sent.get(record['device'], {})
+    changes = { key: value for key, value in record.items() if key in DRIVE_KEYS or previous.get(key) != value }
+    if len(changes) == len(DRIVE_KEYS):
+        return None  # Nothing changed since last sent
+    return changes
+
 def update():
+    global last_full_send_time
     with app.app_context():
         try:
             hostname = utils.get_hostname()
+            # Drives are keyed by hostname and device, so one scan covers all blockchains in this container
+            blockchain = globals.enabled_blockchains()[0]
+            full_send = not last_full_send_time or last_full_send_time <= \
+                (datetime.datetime.now() - datetime.timedelta(minutes=FULL_SEND_INTERVAL_MINS))
+            records = []
             payload = []
-            for blockchain in globals.enabled_blockchains():
-                for drive in smartctl.load_drives_status():
-                    payload.append({
-                        "serial_number": drive.serial_number,
-                        "hostname": hostname,
-                        "blockchain": blockchain,
-                        "model_family": drive.model_family,
-                        "device_model": drive.device_model,
-                        "device": drive.device,
-                        "type": drive.type,
-                        "comment": drive.comment,
-                        "status": drive.status,
-                        "temperature": drive.temperature,
-                        "power_on_hours": drive.power_on_hours,
-                        "size_gibs": drive.size_gibs,
-                        "capacity": drive.capacity,
-                        "smart_info": drive.smart_info,
-                    })
-            utils.send_post('/drives/', payload, debug=False)
+            for drive in smartctl.load_drives_status():
+                record = {
+                    "serial_number": drive.serial_number,
+                    "hostname": hostname,
+                    "blockchain": blockchain,
+                    "model_family": drive.model_family,
+                    "device_model": drive.device_model,
+                    "device": drive.device,
+                    "type": drive.type,
+                    "comment": drive.comment,
+                    "status": drive.status,
+                    "temperature": drive.temperature,
+                    "power_on_hours": drive.power_on_hours,
+                    "reallocated_sectors": drive.reallocated_sectors,
+                    "size_gibs": drive.size_gibs,
+                    "capacity": drive.capacity,
+                    "smart_info": drive.smart_info,
+                }
+                records.append(record)
+                changes = record if full_send else changed_fields(record)
+                if changes:
+                    payload.append(changes)
+            if payload:
+                response = utils.send_post('/drives/', payload, debug=False)
+                if response.status_code >= 300:
+                    raise Exception("Controller responded with status {0}".format(response.status_code))
+            for record in records:
+                last_sent[record['device']] = record
+            if full_send:
+                last_full_send_time = datetime.datetime.now()
         except Exception as ex:
             app.logger.info("Failed to load and send drives status because {0}".format(str(ex)))
             traceback.print_exc()
@@ -15,16 +15,15 @@ from flask import g
 from common.config import globals
 from common.models import plots as p
 from common.models import workers as w
-from api import app, db
-from api.commands import mmx_cli, rpc
+from common.extensions.database import db
+from api import app
+from api.commands import farm_metrics, mmx_cli, rpc
 from api import utils
+from api.schedules import plots_check
 
 # Due to database load, only store full plots list every X minutes
 FULL_SEND_INTERVAL_MINS = 60
 
-# Holds the cached status of Plotman analyze and Chia plots check
-STATUS_FILE = '/root/.chia/plotman/status.json'
-
 last_full_send_time = None
 
 def get_plot_attrs(plot_id, filename):
@@ -38,16 +37,6 @@ def get_plot_attrs(plot_id, filename):
         created_at = "" 
     return [short_plot_id, dir,file,created_at]
 
-def open_status_json():
-    status = {}
-    try:
-        if os.path.exists(STATUS_FILE): 
-            with open(STATUS_FILE, 'r') as fp:
-                status = json.load(fp)
-    except Exception as ex:
-        app.logger.error("Failed to read JSON from {0} because {1}".format(STATUS_FILE, str(ex)))
-    return status
-
 def update():
     global last_full_send_time
     with app.app_context():
@@ -57,8 +46,7 @@ def update():
             since = None  # No since filter sends all plots, not just recent
             last_full_send_time = datetime.datetime.now()
         if 'chia' in globals.enabled_blockchains():
-            plots_status = open_status_json()
-            update_chia_plots(plots_status, since)
+            update_chia_plots(since)
         elif 'chives' in globals.enabled_blockchains():
             update_chives_plots(since)
         elif 'mmx' in globals.enabled_blockchains():
@@ -105,7 +93,7 @@ def save_duplicate_plots(duplicated_plots):
     except Exception as ex:
         app.logger.error('Failed to send duplicated plots warnings due to '+ str(ex))
 
-def update_chia_plots(plots_status, since):
+def update_chia_plots(since):
     time_start = time.time()
     memory_start = utils.current_memory_megabytes()
     memory_prestore = None
@@ -154,11 +142,15 @@ def update_chia_plots(plots_status, since):
                     "file": file,
                     "type": plot['type'],
                     "created_at": created_at,
-                    "plot_analyze": analyze_status(plots_status, short_plot_id[:8]),
-                    "plot_check": check_status(plots_status, short_plot_id[:8]),
                     "size": plot['file_size']
                 }))
         if items:
+            plots_check.import_status_json()
+            statuses = plots_check.load_plot_statuses([ item.plot_id[:8] for item in items ])
+            for item in items:
+                if item.plot_id[:8] in statuses:
+                    item.plot_analyze = statuses[item.plot_id[:8]].plot_analyze()
+                    item.plot_check = statuses[item.plot_id[:8]].plot_check()
             memory_prestore = utils.current_memory_megabytes()
             app.logger.info("PLOT STATUS: About to store {0} Chia plots.".format(len(items)))
             try:
@@ -168,6 +160,9 @@ def update_chia_plots(plots_status, since):
                 app.logger.error("PLOT STATUS: Failed to store Chia plots being farmed because {0}".format(str(ex)))
         if not since: # Save current duplicate plots
             save_duplicate_plots(duplicate_plots)
+        if items or not since: # Stored in bulk here, so not counted by the /plots handlers
+            farm_metrics.record_blockchain_plots('chia')
+            farm_metrics.save_scheduler_metrics(force=True)
     except Exception as ex:
         app.logger.error("PLOT STATUS: Failed to load Chia plots being farmed because {0}".format(str(ex)))
         traceback.print_exc()
@@ -267,24 +262,3 @@ def update_mmx_plots(since):
             utils.send_post('/plots/', payload, debug=False)
     except Exception as ex:
         app.logger.error("Failed to load and send MMX plots farming because {0}".format(str(ex)))
-
-def analyze_status(plots_status, short_plot_id):
-    if short_plot_id in plots_status:
-        if "analyze" in plots_status[short_plot_id]:
-            if plots_status[short_plot_id]['analyze'] and 'seconds' in plots_status[short_plot_id]['analyze']:
-                return '|'.join([
-                    plots_status[short_plot_id]['analyze']['host'], 
-                    plots_status[short_plot_id]['analyze']['seconds']
-                ])
-            else:
-                return "-"
-    return None
-
-def check_status(plots_status, short_plot_id):
-    if short_plot_id in plots_status:
-        if "check" in plots_status[short_plot_id]:
-            if plots_status[short_plot_id]['check'] and 'status' in plots_status[short_plot_id]['check']:
-                return plots_status[short_plot_id]['check']['status']
-            else:
-                return "-"
-    return None
@@ -40,6 +40,10 @@ def update():
                     "user": plot['user'],
                     "sys": plot['sys'],
                     "io": plot['io'],
+                    "wall_secs": plot.get('wall_secs'),
+                    "tmp_bytes": plot.get('tmp_bytes'),
+                    "mem_bytes": plot.get('mem_bytes'),
+                    "io_secs": plot.get('io_secs'),
                 })
             if len(payload) > 0:
                 utils.send_post('/plottings/{0}/{1}'.format(hostname, blockchain), payload, debug=False)
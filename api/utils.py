@@ -27,11 +27,11 @@ def send_post(path, payload, debug=False):
     http.client.HTTPConnection.debuglevel = 0
     return response
 
-def send_worker_post(worker, path, payload, debug=False):
+def send_worker_post(worker, path, payload, timeout=None, debug=False):
     headers = {'Content-type': 'application/json', 'Accept': 'application/json'}
     if debug:
         http.client.HTTPConnection.debuglevel = 1
-    response = requests.post(worker.url + path, headers = headers, data = json.dumps(payload))
+    response = requests.post(worker.url + path, headers = headers, data = json.dumps(payload), timeout=timeout)
     http.client.HTTPConnection.debuglevel = 0
     return response
 
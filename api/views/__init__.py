@@ -2,6 +2,7 @@ from . import actions
 from . import analysis
 from . import alerts
 from . import blockchains
+from . import capacity
 from . import certificates
 from . import challenges
 from . import configs
@@ -17,6 +18,7 @@ from . import plotnfts
 from . import plots
 from . import plottings
 from . import pools
+from . import replots
 from . import rewards
 from . import transactions
 from . import transfers
@@ -33,6 +35,7 @@ MODULES = (
     analysis,
     alerts,
     blockchains,
+    capacity,
     challenges,
     certificates,
     configs,
@@ -47,6 +50,7 @@ MODULES = (
     plots,
     plottings,
     pools,
+    replots,
     rewards,
     transactions,
     transfers,
@@ -31,7 +31,12 @@ class Analysis(MethodView):
             action = body['action']
         except:
             abort("Invalid analysis request without service.", 400)
-        if service == "plotting" and action == "analyze":
+        if service == "plotting" and action == "analyze" and 'plot_files' in body:
+            # Batch of plot files from the controller, only those with a job log on this plotter are returned
+            response = make_response(json.dumps(plotman_cli.analyze_batch(body['plot_files'])), 200)
+            response.mimetype = "application/json"
+            return response
+        elif service == "plotting" and action == "analyze":
             analysis = plotman_cli.analyze(body['plot_file'])
             if analysis:
                 response = make_response(analysis, 200)
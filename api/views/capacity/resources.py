@@ -0,0 +1,26 @@
+import json
+
+from flask import make_response, abort
+from flask.views import MethodView
+
+from api.extensions.api import Blueprint
+from common.utils import caches
+
+blp = Blueprint(
+    'Capacity',
+    __name__,
+    url_prefix='/capacity',
+    description="Forecast of plotter throughput and plots disk fill dates"
+)
+
+@blp.route('/')
+class Capacity(MethodView):
+
+    def get(self):
+        forecast = caches.capacity_cache().load()
+        if not forecast:
+            abort(404, "No capacity forecast has been collected yet.")
+        forecast = { key: value for key, value in forecast.items() if not key in ['watermarks', 'counted'] }
+        response = make_response(json.dumps(forecast), 200)
+        response.mimetype = "application/json"
+        return response
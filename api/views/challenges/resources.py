@@ -1,11 +1,15 @@
 import datetime as dt
+import json
 
+from flask import make_response, request
 from flask.views import MethodView
 
 from api import app
+from api.commands import farm_metrics
 from api.extensions.api import Blueprint, SQLCursorPage
 from common.extensions.database import db
-from common.models import Challenge
+from common.models import Challenge, ChallengeHistogram
+from common.models import challenges as c
 
 from .schemas import ChallengeSchema, ChallengeQueryArgsSchema, BatchOfChallengeSchema, BatchOfChallengeQueryArgsSchema
 
@@ -18,6 +22,70 @@ blp = Blueprint(
 )
 
 
+def time_taken_ms(time_taken):
+    # Like '0.31245 secs' from the farmer's log
+    try:
+        return int(round(float(time_taken.split()[0]) * 1000))
+    except Exception as ex:
+        app.logger.info("Unable to parse challenge time from '{0}' because {1}".format(time_taken, str(ex)))
+    return None
+
+def plots_eligible_and_total(plots_past_filter):
+    # Like '12/5000' from the farmer's log
+    try:
+        eligible, total = plots_past_filter.split('/')
+        return [int(eligible), int(total)]
+    except Exception as ex:
+        app.logger.info("Unable to parse plots past filter from '{0}' because {1}".format(plots_past_filter, str(ex)))
+    return [None, None]
+
+def store_challenges(new_items):
+    items = []
+    known_ids = set()
+    unique_ids = [ new_item['unique_id'] for new_item in new_items ]
+    for row in db.session.query(Challenge.unique_id).filter(Challenge.unique_id.in_(unique_ids)).all():
+        known_ids.add(row.unique_id)
+    histograms = {}
+    high_waters = {}  # Newest challenge counted before this request, per host, blockchain, and day
+    for new_item in new_items:
+        if new_item['unique_id'] in known_ids:  # Request contains previously received challenges, only add new
+            continue
+        key = (new_item['hostname'], new_item['blockchain'], new_item['created_at'][:10])
+        if not key in histograms:
+            histograms[key] = db.session.get(ChallengeHistogram, key)
+            high_waters[key] = histograms[key].last_created_at if histograms[key] else None
+        if high_waters[key] and new_item['created_at'] <= high_waters[key]:
+            continue  # Resent by a stalled farmer after the challenge was purged, so already counted
+        item = Challenge(**new_item)
+        item.time_ms = time_taken_ms(item.time_taken)
+        [item.eligible, item.total] = plots_eligible_and_total(item.plots_past_filter)
+        known_ids.add(item.unique_id)
+        items.append(item)
+        db.session.add(item)
+        if item.time_ms is not None and not histograms[key]:
+            histograms[key] = ChallengeHistogram(hostname=key[0], blockchain=key[1], day=key[2])
+            db.session.add(histograms[key])
+        if histograms[key]:
+            if item.time_ms is not None:
+                histograms[key].add(item.time_ms)
+            histograms[key].last_created_at = max(histograms[key].last_created_at or '', item.created_at)
+    db.session.commit()
+    farm_metrics.record_challenges(items)
+    return items
+
+def lookup_latency(histograms):
+    counts = c.merge_bucket_counts(histograms)
+    max_ms = max([ histogram.max_ms for histogram in histograms ])
+    return {
+        'count': sum([ histogram.count for histogram in histograms ]),
+        'slow_count': sum([ histogram.slow_count for histogram in histograms ]),
+        'mean_ms': round(sum([ histogram.sum_ms for histogram in histograms ]) / max(sum(counts), 1)),
+        'max_ms': max_ms,
+        'p50_ms': c.percentile_ms(counts, 50, max_ms),
+        'p95_ms': c.percentile_ms(counts, 95, max_ms),
+        'p99_ms': c.percentile_ms(counts, 99, max_ms),
+    }
+
 @blp.route('/')
 class Challenges(MethodView):
 
@@ -35,15 +103,27 @@ class Challenges(MethodView):
     def post(self, new_items):
         if len(new_items) == 0:
             return "No challenges provided.", 400
-        items = []
-        for new_item in new_items:
-            item = db.session.query(Challenge).get(new_item['unique_id'])
-            if not item:  # Request contains previously received challenges, only add new
-                item = Challenge(**new_item)
-                items.append(item)
-                db.session.add(item)
-        db.session.commit()
-        return items
+        return store_challenges(new_items)
+
+
+@blp.route('/latency/')
+class ChallengesLatency(MethodView):
+
+    def get(self):
+        day = request.args.get('day', dt.datetime.now().strftime('%Y-%m-%d'))
+        query = db.session.query(ChallengeHistogram).filter(ChallengeHistogram.day == day)
+        if request.args.get('blockchain'):
+            query = query.filter(ChallengeHistogram.blockchain == request.args.get('blockchain'))
+        histograms_by_blockchain = {}
+        for histogram in query.all():
+            histograms_by_blockchain.setdefault(histogram.blockchain, []).append(histogram)
+        latency = {}
+        for blockchain, histograms in histograms_by_blockchain.items():
+            latency[blockchain] = lookup_latency(histograms)
+            latency[blockchain]['hosts'] = { histogram.hostname: lookup_latency([histogram]) for histogram in histograms }
+        response = make_response(json.dumps({ 'day': day, 'slow_lookup_ms': c.SLOW_LOOKUP_MS, 'blockchains': latency }), 200)
+        response.mimetype = "application/json"
+        return response
 
 
 @blp.route('/<hostname>/<blockchain>')
@@ -58,15 +138,7 @@ class ChallengeByHostname(MethodView):
     @blp.arguments(BatchOfChallengeSchema)
     @blp.response(200, ChallengeSchema(many=True))
     def put(self, new_items, hostname, blockchain):
-        items = []
-        for new_item in new_items:
-            item = db.session.query(Challenge).get(new_item['unique_id'])
-            if not item:  # Request contains previously received challenges, only add new
-                item = Challenge(**new_item)
-                items.append(item)
-                db.session.add(item)
-        db.session.commit()
-        return items
+        return store_challenges(new_items)
 
     @blp.etag
     @blp.response(204)
@@ -5,7 +5,7 @@ from flask.views import MethodView
 from api import app
 from api.extensions.api import Blueprint, SQLCursorPage
 from common.extensions.database import db
-from common.models import Connection
+from common.models import Connection, Peer
 
 from .schemas import ConnectionSchema, ConnectionQueryArgsSchema
 
@@ -18,6 +18,15 @@ blp = Blueprint(
 )
 
 
+# Replace all peers of a worker's blockchain, within the caller's transaction
+def replace_peers(hostname, blockchain, peers):
+    db.session.query(Peer).filter(Peer.hostname==hostname, Peer.blockchain==blockchain).delete()
+    if not peers: # Older workers and legacy blockchains only send the text details
+        return
+    for peer in peers:
+        db.session.add(Peer(hostname=hostname, blockchain=blockchain, **peer))
+
+
 @blp.route('/')
 class Connections(MethodView):
 
@@ -32,6 +41,7 @@ class Connections(MethodView):
     @blp.arguments(ConnectionSchema)
     @blp.response(201, ConnectionSchema)
     def post(self, new_item):
+        peers = new_item.pop('peers', None)
         item = db.session.query(Connection).filter(Connection.hostname==new_item['hostname'], \
             Connection.blockchain==new_item['blockchain']).first()
         if item: # upsert
@@ -41,6 +51,7 @@ class Connections(MethodView):
         else: # insert
             item = Connection(**new_item)
         db.session.add(item)
+        replace_peers(new_item['hostname'], new_item['blockchain'], peers)
         db.session.commit()
         return item
 
@@ -58,6 +69,7 @@ class ConnectionsByHostnameBlockchain(MethodView):
     @blp.arguments(ConnectionSchema)
     @blp.response(200, ConnectionSchema)
     def put(self, new_item, hostname, blockchain):
+        peers = new_item.pop('peers', None)
         item = db.session.query(Connection).filter(Connection.hostname==hostname, \
             Connection.blockchain==blockchain).first()
         new_item['hostname'] = item.hostname
@@ -66,6 +78,7 @@ class ConnectionsByHostnameBlockchain(MethodView):
         blp.check_etag(item, ConnectionSchema)
         ConnectionSchema().update(item, new_item)
         db.session.add(item)
+        replace_peers(hostname, blockchain, peers)
         db.session.commit()
         return item
 
@@ -76,4 +89,5 @@ class ConnectionsByHostnameBlockchain(MethodView):
             Connection.blockchain==blockchain).first()
         blp.check_etag(item, ConnectionSchema)
         db.session.delete(item)
+        replace_peers(hostname, blockchain, None)
         db.session.commit()
\ No newline at end of file
@@ -3,10 +3,21 @@ from marshmallow_sqlalchemy import field_for
 
 from api.extensions.api import Schema, AutoSchema
 from common.models.connections import Connection
+from common.models.peers import Peer
+
+
+class PeerSchema(AutoSchema):
+    node_id = field_for(Peer, "node_id")
+
+    class Meta(AutoSchema.Meta):
+        table = Peer.__table__
 
 
 class ConnectionSchema(AutoSchema):
     hostname = field_for(Connection, "hostname")
+    # Structured peers sent by workers using RPC, stored in their own table
+    peers = ma.fields.Nested(PeerSchema, many=True, load_only=True, 
+        exclude=('hostname', 'blockchain', 'created_at'))
 
     class Meta(AutoSchema.Meta):
         table = Connection.__table__
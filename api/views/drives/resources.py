@@ -6,10 +6,11 @@ from api import app
 from api.commands.smartctl import notify_failing_device
 from api.extensions.api import Blueprint, SQLCursorPage
 from common.extensions.database import db
-from common.models import Drive
+from common.models import Drive, DriveAttribute
 from api.commands import smartctl
 
-from .schemas import DriveSchema, DriveQueryArgsSchema, BatchOfDriveSchema, BatchOfDriveQueryArgsSchema
+from .schemas import DriveSchema, DriveQueryArgsSchema, BatchOfDriveSchema, BatchOfDriveQueryArgsSchema, \
+    DriveAttributeSchema
 
 
 blp = Blueprint(
@@ -19,6 +20,28 @@ blp = Blueprint(
     description="Details on all drives recorded on the worker."
 )
 
+# Attributes charted over time for each drive
+TRACKED_ATTRIBUTES = [ 'temperature', 'reallocated_sectors', 'power_on_hours' ]
+
+# Drop attribute history older than this
+DRIVE_ATTRIBUTES_RETENTION_DAYS = 90
+
+def record_attributes(new_item):
+    # Workers only send changed attributes, so each row here is a change worth charting
+    if not new_item.get('serial_number') or not [ attr for attr in TRACKED_ATTRIBUTES if attr in new_item ]:
+        return
+    previous = db.session.query(DriveAttribute).filter(DriveAttribute.serial_number==new_item['serial_number']) \
+        .order_by(DriveAttribute.created_at.desc()).first()
+    values = {}
+    for attr in TRACKED_ATTRIBUTES:
+        if attr in new_item:
+            values[attr] = new_item[attr]
+        elif previous:
+            values[attr] = getattr(previous, attr)
+    if previous and [ attr for attr in TRACKED_ATTRIBUTES if getattr(previous, attr) != values.get(attr) ] == []:
+        return  # Full resend of an unchanged drive
+    db.session.add(DriveAttribute(serial_number=new_item['serial_number'], hostname=new_item['hostname'], **values))
+
 
 @blp.route('/')
 class Drives(MethodView):
@@ -42,12 +65,12 @@ class Drives(MethodView):
             item = db.session.query(Drive).filter(Drive.hostname==new_item['hostname'], Drive.device==new_item['device']).first()
             if item: # upsert
                 #app.logger.info("Upserting: {0} on {1}".format(new_item['device'], new_item['hostname']))
-                new_item['created_at'] = item.created_at
                 new_item['updated_at'] = dt.datetime.now()
                 # Check for a status transition from PASSED to FAILED -> send an alert via Chiadog
                 if item.status == 'PASSED' and 'status' in new_item and new_item['status'] != 'PASSED':
                     smartctl.notify_failing_device(new_item['hostname'], new_item['device'], new_item['status'])
-                DriveSchema().update(item, new_item)
+                for key, value in new_item.items():  # Workers send only the changed fields
+                    setattr(item, key, value)
             else: # insert
                 #app.logger.info("Inserting: {0} on {1}".format(new_item['device'], new_item['hostname']))
                 new_item['created_at'] = new_item['updated_at'] = dt.datetime.now()
@@ -55,6 +78,19 @@ class Drives(MethodView):
                 if 'status' in new_item and new_item['status'] != 'PASSED':
                     smartctl.notify_failing_device(new_item['hostname'], new_item['device'], new_item['status'])
                 item = Drive(**new_item)
+            record_attributes(new_item)
             db.session.add(item)
+        cutoff = dt.datetime.now() - dt.timedelta(days=DRIVE_ATTRIBUTES_RETENTION_DAYS)
+        db.session.query(DriveAttribute).filter(DriveAttribute.created_at < cutoff).delete()
         db.session.commit()
         return items
+
+
+@blp.route('/attributes/<serial_number>')
+class DriveAttributesBySerialNumber(MethodView):
+
+    @blp.etag
+    @blp.response(200, DriveAttributeSchema(many=True))
+    def get(self, serial_number):
+        return db.session.query(DriveAttribute).filter(DriveAttribute.serial_number==serial_number) \
+            .order_by(DriveAttribute.created_at.asc()).all()
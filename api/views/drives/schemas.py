@@ -3,7 +3,7 @@ from marshmallow_sqlalchemy import field_for
 from marshmallow_toplevel import TopLevelSchema
 
 from api.extensions.api import Schema, AutoSchema
-from common.models.drives import Drive
+from common.models.drives import Drive, DriveAttribute
 
 class DriveSchema(AutoSchema):
     serial_number = field_for(Drive, "serial_number")
@@ -12,6 +12,12 @@ class DriveSchema(AutoSchema):
         table = Drive.__table__
 
 
+class DriveAttributeSchema(AutoSchema):
+
+    class Meta(AutoSchema.Meta):
+        table = DriveAttribute.__table__
+
+
 class DriveQueryArgsSchema(Schema):
     serial_number = ma.fields.Str()
     hostname = ma.fields.Str()
@@ -6,10 +6,12 @@ from flask import request, make_response, abort
 from flask.views import MethodView
 
 from common.config import globals
+from common.utils import caches, instrumentation, metrics
 
-from api import app
+from api import app, utils
 from api.extensions.api import Blueprint
-from api.commands import plotman_cli
+from api.commands import farm_metrics, plotman_cli, websvcs
+from api.schedules import plots_check
 
 blp = Blueprint(
     'Metrics',
@@ -29,6 +31,16 @@ class Metrics(MethodView):
 class MetricsByType(MethodView):
 
     def get(self, type):
+      if type == 'plots_check':
+        return plots_check_metrics()
+      if type == 'caches':
+        return caches_metrics()
+      if type == 'web_sources':
+        return web_sources_metrics()
+      if type == 'openmetrics':
+        return openmetrics()
+      if type == 'instrumentation':
+        return instrumentation_metrics()
       if type != 'prometheus':
         return make_response("Invalid metrics type requested.  Please request /metrics/prometheus endpoint.", 400)
 
@@ -42,3 +54,52 @@ class MetricsByType(MethodView):
           return make_response("Failed to retrieve plotman metrics.", 500)
       else:
         return make_response("Plotting not enabled on this Machinaris worker.", 404)
+
+
+def plots_check_metrics():
+    metrics = plots_check.open_metrics_json()
+    if not metrics:
+      return make_response("No plots check metrics recorded yet.  Only available on the controller.", 404)
+    lines = []
+    for key, value in metrics.items():
+      if isinstance(value, (int, float)):
+        lines.append("machinaris_plots_check_{0} {1}".format(key, value))
+    response = make_response("\n".join(lines) + "\n", 200)
+    response.mimetype = "plain/text"
+    return response
+
+
+def caches_metrics():
+    lines = []
+    for name, stats in caches.stats().items():
+      cache_name = name.replace('.json', '')
+      for key, value in stats.items():
+        lines.append('machinaris_cache_{0}{{cache="{1}"}} {2}'.format(key, cache_name, value))
+    response = make_response("\n".join(lines) + "\n", 200)
+    response.mimetype = "plain/text"
+    return response
+
+def web_sources_metrics():
+    metrics = websvcs.load_web_sources_metrics()
+    if not metrics:
+      return make_response("No web source metrics recorded yet.  Only available on the controller.", 404)
+    lines = []
+    for source, stats in metrics.items():
+      for key, value in stats.items():
+        lines.append('machinaris_web_source_{0}{{source="{1}"}} {2}'.format(key, source, value))
+    response = make_response("\n".join(lines) + "\n", 200)
+    response.mimetype = "plain/text"
+    return response
+
+def openmetrics():
+    if not utils.is_controller():
+      return make_response("Farm metrics are only available on the controller.", 404)
+    response = make_response(farm_metrics.openmetrics(), 200)
+    response.headers['Content-Type'] = metrics.OPENMETRICS_CONTENT_TYPE
+    return response
+
+def instrumentation_metrics():
+    # Scheduled jobs run in the gunicorn master process, which saves its timings to the cache folder
+    response = make_response(instrumentation.openmetrics('api', ['scheduler']), 200)
+    response.headers['Content-Type'] = metrics.OPENMETRICS_CONTENT_TYPE
+    return response
@@ -3,6 +3,7 @@ import datetime as dt
 from flask.views import MethodView
 
 from api import app
+from api.commands import farm_metrics
 from api.extensions.api import Blueprint, SQLCursorPage
 from common.extensions.database import db
 from common.models import Partial
@@ -45,6 +46,7 @@ class Partials(MethodView):
             else:
                 app.logger.debug("Skipping insert of existing partial: {0}".format(new_item['unique_id']))
         db.session.commit()
+        farm_metrics.record_partials(items)
         return items
 
 
@@ -68,6 +70,7 @@ class PartialByHostname(MethodView):
                 items.append(item)
                 db.session.add(item)
         db.session.commit()
+        farm_metrics.record_partials(items)
         return items
 
     @blp.etag
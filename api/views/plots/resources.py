@@ -7,6 +7,8 @@ import traceback
 from flask.views import MethodView
 
 from api import app, utils
+from api.commands import farm_metrics
+from api.schedules import plots_check
 from api.extensions.api import Blueprint, SQLCursorPage
 from common.extensions.database import db
 from common.models import Plot
@@ -21,39 +23,13 @@ blp = Blueprint(
     description="Operations on all plots on farmer"
 )
 
-# Holds the cached status of Plotman analyze and Chia plots check
-STATUS_FILE = '/root/.chia/plotman/status.json'
+def load_plot_statuses(new_items):
+    return plots_check.load_plot_statuses([ new_item['plot_id'][:8] for new_item in new_items ])
 
-def open_status_json():
-    status = {}
-    try:
-        if os.path.exists(STATUS_FILE): 
-            with open(STATUS_FILE, 'r') as fp:
-                status = json.load(fp)
-    except Exception as ex:
-        app.logger.error("Failed to read JSON from {0} because {1}".format(STATUS_FILE, str(ex)))
-    return status
-
-def analyze_status(plots_status, short_plot_id):
-    if short_plot_id in plots_status:
-        if "analyze" in plots_status[short_plot_id]:
-            if plots_status[short_plot_id]['analyze'] and 'seconds' in plots_status[short_plot_id]['analyze']:
-                return '|'.join([
-                    plots_status[short_plot_id]['analyze']['host'], 
-                    plots_status[short_plot_id]['analyze']['seconds']
-                ])
-            else:
-                return "-"
-    return None
-
-def check_status(plots_status, short_plot_id):
-    if short_plot_id in plots_status:
-        if "check" in plots_status[short_plot_id]:
-            if plots_status[short_plot_id]['check'] and 'status' in plots_status[short_plot_id]['check']:
-                return plots_status[short_plot_id]['check']['status']
-            else:
-                return "-"
-    return None
+def set_plot_status(item, statuses):
+    if item.plot_id[:8] in statuses:
+        item.plot_analyze = statuses[item.plot_id[:8]].plot_analyze()
+        item.plot_check = statuses[item.plot_id[:8]].plot_check()
 
 def lookup_worker_displayname(displaynames, hostname):
     controller_hostname = utils.get_hostname()
@@ -91,18 +67,18 @@ class Plots(MethodView):
         # Re-enabled as MMX sends plots listing from its fullnode
         items = []
         displaynames = {}
-        plots_status = open_status_json()
+        statuses = load_plot_statuses(new_items)
         for new_item in new_items:
             # Skip any previously sent by existing plot_id
             if not db.session.query(Plot).filter(Plot.hostname==new_item['hostname'], Plot.plot_id==new_item['plot_id']).first():
-                short_plot_id = new_item['plot_id'][:8]
                 item = Plot(**new_item)
                 item.displayname = lookup_worker_displayname(displaynames, new_item['hostname'])
-                item.plot_analyze = analyze_status(plots_status, short_plot_id)
-                item.plot_check = check_status(plots_status, short_plot_id)
+                set_plot_status(item, statuses)
                 items.append(item)
                 db.session.add(item)
         db.session.commit()
+        for hostname, blockchain in set([ (item.hostname, item.blockchain) for item in items ]):
+            farm_metrics.record_plots(hostname, blockchain)
         return items
 
 @blp.route('/<hostname>/<blockchain>')
@@ -119,18 +95,17 @@ class PlotByHostname(MethodView):
     def put(self, new_items, hostname, blockchain):
         # Re-enabled as Chives must send plots from each container
         items = []
-        plots_status = open_status_json()
+        statuses = load_plot_statuses(new_items)
         for new_item in new_items:
             # Skip any previously sent by existing plot_id
             if not db.session.query(Plot).filter(Plot.hostname==new_item['hostname'], 
                 Plot.plot_id==new_item['plot_id']).first():
-                short_plot_id = new_item['plot_id']
                 item = Plot(**new_item)
-                item.plot_analyze = analyze_status(plots_status, short_plot_id[:8])
-                item.plot_check = check_status(plots_status, short_plot_id[:8])
+                set_plot_status(item, statuses)
                 items.append(item)
                 db.session.add(item)
         db.session.commit()
+        farm_metrics.record_plots(hostname, blockchain)
         return items
 
     @blp.etag
@@ -138,6 +113,7 @@ class PlotByHostname(MethodView):
     def delete(self, hostname, blockchain):
         db.session.query(Plot).filter(Plot.hostname==hostname, Plot.blockchain==blockchain).delete()
         db.session.commit()
+        farm_metrics.record_plots(hostname, blockchain)
 
 @blp.route('/<hostname>/<blockchain>/<plot_file>')
 class PlotByHostnameBlockchainFile(MethodView):
@@ -147,3 +123,4 @@ class PlotByHostnameBlockchainFile(MethodView):
     def delete(self, hostname, blockchain, plot_file):
         db.session.query(Plot).filter(Plot.hostname==hostname, Plot.blockchain==blockchain, Plot.file==plot_file).delete()
         db.session.commit()
+        farm_metrics.record_plots(hostname, blockchain)
@@ -0,0 +1 @@
+from .resources import blp  # noqa
@@ -0,0 +1,41 @@
+import json
+import traceback
+
+from flask import make_response, abort
+from flask.views import MethodView
+
+from api import app
+from api.extensions.api import Blueprint
+from common.extensions.database import db
+
+from api.schedules import plots_replot
+
+blp = Blueprint(
+    'Replot',
+    __name__,
+    url_prefix='/replots',
+    description="Dry-run of plot deletions planned for replotting"
+)
+
+@blp.route('/<blockchain>')
+class ReplotByBlockchain(MethodView):
+
+    def get(self, blockchain):
+        settings = plots_replot.load_replotting_settings()
+        if not blockchain in settings:
+            abort(404, "No replotting settings found for {0}.".format(blockchain))
+        try:
+            schedule = plots_replot.plan_deletions(db, blockchain, settings[blockchain])
+        except Exception as ex:
+            app.logger.error(traceback.format_exc())
+            abort(500, "Failed to plan {0} replotting deletions because {1}".format(blockchain, str(ex)))
+        plan = {
+            'blockchain': blockchain,
+            'enabled': settings[blockchain]['enabled'],
+            'free_ksize': settings[blockchain]['free_ksize'],
+            'plots_to_delete': sum([ len(disk['plots']) for disk in schedule ]),
+            'disks': schedule,
+        }
+        response = make_response(json.dumps(plan), 200)
+        response.mimetype = "application/json"
+        return response
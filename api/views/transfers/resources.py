@@ -5,7 +5,8 @@ from flask.views import MethodView
 from api import app
 from api.extensions.api import Blueprint, SQLCursorPage
 from common.extensions.database import db
-from common.models import Transfer
+from common.models import Transfer, TransferHistory, TransferSample
+from common.utils import converters
 
 from .schemas import TransferSchema, TransferQueryArgsSchema, BatchOfTransferSchema, BatchOfTransferQueryArgsSchema
 
@@ -18,6 +19,41 @@ blp = Blueprint(
 )
 
 
+# Throughput samples older than this are pruned, checked at most once an hour
+TRANSFER_SAMPLE_RETENTION_DAYS = 7
+
+last_pruned = { 'at': None }
+
+HISTORY_FIELDS = ['plot_id', 'k', 'size', 'source', 'type', 'dest', 'rate', 'start_date', 'end_date', 'duration']
+
+def archive_completed(hostname, blockchain, items):
+    # Plotters only report recent transfers, so keep completed ones once first reported
+    completed = [ item for item in items if item.status == 'Complete' ]
+    if not completed:
+        return
+    archived = set([ row[0] for row in db.session.query(TransferHistory.log_file).filter(
+        TransferHistory.hostname == hostname, TransferHistory.log_file.in_([ item.log_file for item in completed ])).all() ])
+    for item in completed:
+        if not item.log_file in archived:
+            db.session.add(TransferHistory(log_file=item.log_file, hostname=hostname, blockchain=blockchain,
+                **{ field: getattr(item, field) for field in HISTORY_FIELDS }))
+
+def record_samples(hostname, blockchain, items):
+    now = dt.datetime.now()
+    for item in items:
+        if item.status != 'Transferring':
+            continue
+        rate_mbps = converters.rate_to_mbps(item.rate)
+        if rate_mbps is None:
+            continue
+        dest_host, dest_path = converters.transfer_destination(item.dest)
+        db.session.add(TransferSample(hostname=hostname, blockchain=blockchain, log_file=item.log_file,
+            dest_host=dest_host or hostname, dest_path=dest_path, rate_mbps=rate_mbps, created_at=now))
+    if not last_pruned['at'] or last_pruned['at'] < now - dt.timedelta(hours=1):
+        db.session.query(TransferSample).filter(
+            TransferSample.created_at < now - dt.timedelta(days=TRANSFER_SAMPLE_RETENTION_DAYS)).delete()
+        last_pruned['at'] = now
+
 @blp.route('/')
 class Transfers(MethodView):
 
@@ -47,6 +83,8 @@ class TransferByHostname(MethodView):
             item = Transfer(**new_item)
             items.append(item)
             db.session.add(item)
+        archive_completed(hostname, blockchain, items)
+        record_samples(hostname, blockchain, items)
         db.session.commit()
         return items
 
@@ -0,0 +1,170 @@
+#
+# Benchmark cases driving the real ingestion endpoints, schedules, RPC clients, and WebUI loaders
+# against a seeded farm and the fake RPC servers.  The api and web packages are imported only
+# once benchmarks.farm.setup() has run.
+#
+
+from unittest import mock
+
+from benchmarks import generators
+from benchmarks.harness import Case
+
+# Challenges per POST, as each farmer sends the last few minutes of its log every status run
+CHALLENGES_PER_REQUEST = 24
+
+# Rows per page of the Farming table, as requested by Datatables.js
+PLOTS_PAGE_LENGTH = 25
+
+def with_fake_rpc(rpc_root, run):
+    # Points the RPC clients at the fake servers, with the wallet taken as running
+    from api.commands import rpc
+    def patched(state):
+        with mock.patch.object(rpc, 'DEFAULT_ROOT_PATH', rpc_root), \
+                mock.patch.object(rpc.globals, 'wallet_running', lambda: True):
+            return run(state)
+    return patched
+
+def api_cases(farm, iterations, log_file, rpc_root):
+    from api import app, db
+    from api.commands import log_parser
+    from api.schedules import status_plots
+    from common.models import challenges as c, plots as p
+
+    client = app.test_client()
+    payloads = generators.plot_payloads(generators.harvesters(farm))
+    hostname = farm.hostnames()[0]
+    challenges = generators.challenge_payloads(farm)
+
+    def delete_host_plots():
+        with app.app_context():
+            db.session.query(p.Plot).filter(p.Plot.hostname==hostname).delete()
+            db.session.commit()
+
+    def put_plots(state):
+        response = client.put('/plots/{0}/chia'.format(hostname), json=payloads[hostname])
+        if response.status_code != 200:
+            raise Exception("PUT /plots failed with {0}: {1}".format(response.status_code, response.data[:200]))
+        return len(payloads[hostname])
+
+    def delete_challenges():
+        with app.app_context():
+            db.session.query(c.Challenge).delete()
+            db.session.query(c.ChallengeHistogram).delete()
+            db.session.commit()
+
+    def post_challenges(state):
+        for i in range(0, len(challenges), CHALLENGES_PER_REQUEST):
+            response = client.post('/challenges/', json=challenges[i:i+CHALLENGES_PER_REQUEST])
+            if response.status_code != 201:
+                raise Exception("POST /challenges failed with {0}: {1}".format(response.status_code, response.data[:200]))
+        return len(challenges)
+
+    def update_chia_plots(state):
+        # Full re-sync, as after a restart, with the fake farmer answering for the synthetic harvesters
+        with app.app_context():
+            status_plots.update_chia_plots(None)
+            count = db.session.query(p.Plot).filter(p.Plot.blockchain=='chia').count()
+        if count != farm.plots:
+            raise Exception("Stored {0} of {1} plots, see log above.".format(count, farm.plots))
+        return count
+
+    def parse_log(parse):
+        def run(state):
+            with app.app_context(), mock.patch.object(log_parser, 'get_farming_log_file', lambda blockchain: log_file):
+                return len(parse('chia').rows)
+        return run
+
+    return [
+        Case('api_plots_put', put_plots, setup=delete_host_plots, iterations=iterations, unit='plots'),
+        Case('api_challenges_post', post_challenges, setup=delete_challenges, iterations=iterations, unit='challenges'),
+        Case('status_plots_update_chia_plots', with_fake_rpc(rpc_root, update_chia_plots),
+            iterations=iterations, unit='plots'),
+        Case('log_parser_recent_challenges', parse_log(log_parser.recent_challenges), iterations=iterations, unit='challenges'),
+        Case('log_parser_recent_partials', parse_log(log_parser.recent_partials), iterations=iterations, unit='partials'),
+    ]
+
+def rpc_cases(farm, iterations, rpc_root):
+    # The RPC layer alone, against the fake farmer, full node, and wallet
+    from api import app
+    from api.commands import rpc
+
+    def expect(count, expected, what):
+        # As RPC methods log and return nothing on errors
+        if count != expected:
+            raise Exception("Received {0} of {1} {2}, see log above.".format(count, expected, what))
+        return count
+
+    def get_all_plots(state):
+        return expect(len(rpc.RPC().get_all_plots()), farm.plots, 'plots')
+
+    def get_harvester_warnings(state):
+        warnings = rpc.RPC().get_harvester_warnings()
+        return expect(len(warnings), farm.workers, 'harvesters')
+
+    def get_transactions(state):
+        return expect(len(rpc.RPC().get_transactions(1, reverse=True)), farm.transactions, 'transactions')
+
+    def get_farm_summary(state):
+        summary = rpc.RPC().get_farm_summary('chia')
+        return expect(summary['plot_count'], farm.plots, 'plots')
+
+    def get_wallet_balances(state):
+        return len(rpc.RPC().get_wallet_balances()['wallets'])
+
+    def get_blockchain_state(state):
+        rpc.RPC().get_blockchain_state()
+        return 1
+
+    def get_connections(state):
+        return expect(len(rpc.RPC().get_connections()), farm.peers, 'connections')
+
+    def case(name, run, unit):
+        def in_app(state):
+            with app.app_context():
+                return run(state)
+        return Case(name, with_fake_rpc(rpc_root, in_app), iterations=iterations, unit=unit)
+
+    return [
+        case('rpc_get_all_plots', get_all_plots, 'plots'),
+        case('rpc_get_harvester_warnings', get_harvester_warnings, 'harvesters'),
+        case('rpc_get_transactions', get_transactions, 'transactions'),
+        case('rpc_get_farm_summary', get_farm_summary, 'plots'),
+        case('rpc_get_wallet_balances', get_wallet_balances, 'wallets'),
+        case('rpc_get_blockchain_state', get_blockchain_state, 'states'),
+        case('rpc_get_connections', get_connections, 'connections'),
+    ]
+
+def web_cases(farm, iterations):
+    from web import app
+    from web.actions import chia, stats
+
+    def farming_args(start=0, search=''):
+        return { 'draw': 1, 'start': start, 'length': PLOTS_PAGE_LENGTH, 'order[0][column]': 6,
+            'order[0][dir]': 'desc', 'search[value]': search }
+
+    def load_plots(args):
+        def run(state):
+            with app.test_request_context('/farming/data', query_string=args):
+                from flask import request
+                return len(chia.load_plots(request.args)[3])
+        return run
+
+    def load_summaries(state):
+        with app.test_request_context('/summary'):
+            summaries = chia.load_summaries()
+            if not summaries:
+                raise Exception("Failed to load summaries, see log above.")
+            return len(summaries.rows)
+
+    def load_recent_disk_usage(state):
+        with app.test_request_context('/plotting/workers'):
+            return sum([ len(summary['dates']) for summary in stats.load_recent_disk_usage('plots').values() ])
+
+    return [
+        Case('web_load_plots_first_page', load_plots(farming_args()), iterations=iterations, unit='rows'),
+        Case('web_load_plots_last_page', load_plots(farming_args(start=max(farm.plots - PLOTS_PAGE_LENGTH, 0))),
+            iterations=iterations, unit='rows'),
+        Case('web_load_plots_search', load_plots(farming_args(search='%plots1%')), iterations=iterations, unit='rows'),
+        Case('web_load_summaries', load_summaries, iterations=iterations, unit='blockchains'),
+        Case('web_load_recent_disk_usage', load_recent_disk_usage, iterations=iterations, unit='dates'),
+    ]
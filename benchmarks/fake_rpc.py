@@ -0,0 +1,284 @@
+#
+# Stand-in farmer, full node, and wallet RPC servers answering the endpoints used by
+# api/commands/rpc.py from a synthetic farm, so the RPC layer can be load tested without
+# a chia daemon.  Responses follow the JSON of chia's RPC APIs, with optional latency added
+# to each request.  Given a chia root, the servers use its private CA and daemon certificate
+# over TLS like the real services, and write_root() points the RPC clients at them.
+#
+
+import json
+import os
+import pathlib
+import random
+import ssl
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import yaml
+
+from benchmarks import generators
+
+# How often servers check for shutdown
+POLL_INTERVAL_SECS = 0.05
+
+class FarmerService:
+
+    ENDPOINTS = [ 'get_harvesters', 'get_harvesters_summary', 'get_harvester_plots_invalid', 'get_harvester_plots_keys_missing',
+        'get_harvester_plots_duplicates', 'get_pool_state' ]
+
+    def __init__(self, farm):
+        self.harvesters = generators.harvesters(farm)
+
+    def harvester(self, request):
+        node_id = request['node_id'].replace('0x', '')
+        for harvester in self.harvesters:
+            if harvester['connection']['node_id'].replace('0x', '') == node_id:
+                return harvester
+        raise Exception("No harvester with node_id {0}".format(request['node_id']))
+
+    def paginated(self, request, key):
+        # As the farmer pages the lists each harvester reports, see chia's PlotPathRequestData
+        plots = self.harvester(request)[key]
+        page, page_size = int(request.get('page', 0)), int(request.get('page_size', 1000))
+        return {
+            'node_id': request['node_id'],
+            'page': page,
+            'page_count': max((len(plots) + page_size - 1) // page_size, 1),
+            'total_count': len(plots),
+            'plots': plots[page * page_size:(page + 1) * page_size],
+        }
+
+    def get_harvesters(self, request):
+        return { 'harvesters': self.harvesters }
+
+    def get_harvesters_summary(self, request):
+        # Counts in place of the lists, as the farmer summarizes each harvester
+        return { 'harvesters': [ {
+            'connection': harvester['connection'],
+            'plots': len(harvester['plots']),
+            'failed_to_open_filenames': len(harvester['failed_to_open_filenames']),
+            'no_key_filenames': len(harvester['no_key_filenames']),
+            'duplicates': len(harvester['duplicates']),
+            'total_plot_size': sum([ plot['file_size'] for plot in harvester['plots'] ]),
+        } for harvester in self.harvesters ] }
+
+    def get_harvester_plots_invalid(self, request):
+        return self.paginated(request, 'failed_to_open_filenames')
+
+    def get_harvester_plots_keys_missing(self, request):
+        return self.paginated(request, 'no_key_filenames')
+
+    def get_harvester_plots_duplicates(self, request):
+        return self.paginated(request, 'duplicates')
+
+    def get_pool_state(self, request):
+        return { 'pool_state': [] }
+
+class FullNodeService:
+
+    ENDPOINTS = [ 'get_blockchain_state', 'get_block_record', 'get_connections' ]
+
+    def __init__(self, farm):
+        self.farm = farm
+        self.connections = generators.peer_connections(farm)
+
+    def get_blockchain_state(self, request):
+        # Peak is not a transaction block, so clients walk back one block for its timestamp
+        return { 'blockchain_state': {
+            'peak': generators.block_record(self.farm, generators.PEAK_HEIGHT, False),
+            'genesis_challenge_initialized': True,
+            'sync': { 'sync_mode': False, 'synced': True, 'sync_tip_height': 0, 'sync_progress_height': 0 },
+            'difficulty': 2048,
+            'sub_slot_iters': 147849216,
+            'space': int(25.1 * 1024 ** 6),
+            'mempool_size': 0,
+            'mempool_cost': 0,
+            'mempool_min_fees': { 'cost_5000000': 0 },
+            'mempool_max_total_cost': 550000000000,
+            'block_max_cost': 11000000000,
+            'node_id': "{0:064x}".format(self.farm.rng('node_id').getrandbits(256)),
+        }}
+
+    def get_block_record(self, request):
+        # Hashes are derived from height, so look back from the peak for the requested hash
+        for height in range(generators.PEAK_HEIGHT, generators.PEAK_HEIGHT - 10, -1):
+            record = generators.block_record(self.farm, height, height != generators.PEAK_HEIGHT)
+            if record['header_hash'].replace('0x', '') == request['header_hash'].replace('0x', ''):
+                return { 'block_record': record }
+        raise Exception("Block {0} not found".format(request['header_hash']))
+
+    def get_connections(self, request):
+        return { 'connections': self.connections }
+
+class WalletService:
+
+    ENDPOINTS = [ 'get_wallets', 'get_wallet_balance', 'get_transaction_count', 'get_transactions',
+        'get_logged_in_fingerprint', 'get_public_keys', 'get_height_info', 'get_sync_status', 'get_farmed_amount' ]
+
+    def __init__(self, farm):
+        self.transactions = generators.transactions(farm)
+        self.fingerprint = farm.rng('wallet').randint(10**9, 4 * 10**9)
+
+    def get_wallets(self, request):
+        return { 'wallets': [{ 'id': 1, 'name': 'Chia Wallet', 'type': 0, 'data': '' }] }
+
+    def get_wallet_balance(self, request):
+        balance = sum([ tx['amount'] for tx in self.transactions if not tx['sent'] ])
+        return { 'wallet_balance': {
+            'wallet_id': int(request['wallet_id']),
+            'confirmed_wallet_balance': balance,
+            'unconfirmed_wallet_balance': balance,
+            'spendable_balance': balance,
+            'pending_change': 0,
+            'max_send_amount': balance,
+            'unspent_coin_count': len(self.transactions),
+            'pending_coin_removal_count': 0,
+            'fingerprint': self.fingerprint,
+            'wallet_type': 0,
+        }}
+
+    def get_transaction_count(self, request):
+        return { 'wallet_id': int(request['wallet_id']), 'count': len(self.transactions) }
+
+    def get_transactions(self, request):
+        # Stored newest first, as asked for by reverse=True, otherwise oldest first
+        transactions = self.transactions if request.get('reverse') else list(reversed(self.transactions))
+        start, end = int(request.get('start', 0)), int(request.get('end', 50))
+        return { 'wallet_id': int(request['wallet_id']), 'transactions': transactions[start:end] }
+
+    def get_logged_in_fingerprint(self, request):
+        return { 'fingerprint': self.fingerprint }
+
+    def get_public_keys(self, request):
+        return { 'public_key_fingerprints': [ self.fingerprint ] }
+
+    def get_height_info(self, request):
+        return { 'height': generators.PEAK_HEIGHT }
+
+    def get_sync_status(self, request):
+        return { 'synced': True, 'syncing': False, 'genesis_initialized': True }
+
+    def get_farmed_amount(self, request):
+        rewards = [ tx for tx in self.transactions if tx['type'] == 2 ]
+        return {
+            'farmed_amount': sum([ tx['amount'] for tx in rewards ]),
+            'pool_reward_amount': sum([ tx['amount'] for tx in rewards ]) * 7 // 8,
+            'farmer_reward_amount': sum([ tx['amount'] for tx in rewards ]) // 8,
+            'fee_amount': 0,
+            'last_height_farmed': rewards[0]['confirmed_at_height'] if rewards else 0,
+        }
+
+class RpcRequestHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        endpoint = self.path.strip('/')
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if not endpoint in self.server.service.ENDPOINTS:
+                raise Exception("No such endpoint: {0}".format(endpoint))
+            self.server.delay()
+            response = getattr(self.server.service, endpoint)(request)
+            response['success'] = True
+        except Exception as ex:
+            response = { 'success': False, 'error': str(ex) }
+        with self.server.lock:
+            self.server.requests += 1
+        body = json.dumps(response).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Quiet, as requests number in the thousands
+
+class RpcServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, service, latency_secs=0, jitter_secs=0, ssl_context=None):
+        super().__init__(('localhost', 0), RpcRequestHandler)
+        self.service = service
+        self.latency_secs = latency_secs
+        self.jitter_secs = jitter_secs
+        self.requests = 0
+        self.lock = threading.Lock()
+        if ssl_context:
+            self.socket = ssl_context.wrap_socket(self.socket, server_side=True)
+
+    def delay(self):
+        if self.latency_secs or self.jitter_secs:
+            time.sleep(self.latency_secs + random.uniform(0, self.jitter_secs))
+
+def load_chia_config(chia_root):
+    with open(os.path.join(str(chia_root), 'config', 'config.yaml')) as f:
+        return yaml.safe_load(f)
+
+def server_ssl_context(chia_root):
+    # Same certificates as the chia daemon, so clients verify the servers against the private CA
+    config = load_chia_config(chia_root)
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH,
+        cafile=os.path.join(str(chia_root), config['private_ssl_ca']['crt']))
+    context.load_cert_chain(os.path.join(str(chia_root), config['daemon_ssl']['private_crt']),
+        os.path.join(str(chia_root), config['daemon_ssl']['private_key']))
+    context.verify_mode = ssl.CERT_REQUIRED
+    return context
+
+class FakeRpc:
+    """
+    Farmer, full node, and wallet servers for a synthetic farm.  Without a chia_root, they
+    serve plain HTTP, which is enough to test the responses but not for chia's RPC clients.
+    """
+
+    SERVICES = { 'farmer': FarmerService, 'full_node': FullNodeService, 'wallet': WalletService }
+
+    def __init__(self, farm, latency_secs=0, jitter_secs=0, chia_root=None):
+        self.farm = farm
+        self.latency_secs = latency_secs
+        self.jitter_secs = jitter_secs
+        self.chia_root = chia_root
+        self.servers = {}
+
+    def start(self):
+        ssl_context = server_ssl_context(self.chia_root) if self.chia_root else None
+        for name, service in self.SERVICES.items():
+            self.servers[name] = RpcServer(service(self.farm), self.latency_secs, self.jitter_secs, ssl_context)
+            threading.Thread(target=self.servers[name].serve_forever, args=(POLL_INTERVAL_SECS,), daemon=True).start()
+        return self
+
+    def stop(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+        self.servers = {}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def port(self, name):
+        return self.servers[name].server_address[1]
+
+    def url(self, name):
+        return "{0}://localhost:{1}".format('https' if self.chia_root else 'http', self.port(name))
+
+    def requests(self):
+        return { name: server.requests for name, server in self.servers.items() }
+
+    def write_root(self, work_dir):
+        """Writes a chia root under work_dir with the RPC ports of these servers, and returns its path."""
+        root = pathlib.Path(work_dir) / 'chia_root'
+        os.makedirs(os.path.join(root, 'config'), exist_ok=True)
+        config = load_chia_config(self.chia_root)
+        for name in self.SERVICES:
+            config[name]['rpc_port'] = self.port(name)
+        with open(os.path.join(root, 'config', 'config.yaml'), 'w') as f:
+            yaml.safe_dump(config, f)
+        if not os.path.exists(os.path.join(root, 'config', 'ssl')):
+            os.symlink(os.path.join(str(self.chia_root), 'config', 'ssl'), os.path.join(root, 'config', 'ssl'))
+        return root
@@ -0,0 +1,71 @@
+#
+# Sets up the API and WebUI apps against throwaway sqlite databases in a temporary directory,
+# seeded with a synthetic farm.  Must be called before anything imports the api or web packages,
+# as both read their settings file once at import.
+#
+
+import importlib.util
+import os
+import tempfile
+
+from benchmarks import generators
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Rows per insert when seeding, to keep memory flat on large farms
+SEED_BATCH_SIZE = 5000
+
+def default_binds():
+    # Loaded by path, as importing the api package would read the settings before they are overridden
+    spec = importlib.util.spec_from_file_location('api_default_settings', os.path.join(ROOT_DIR, 'api/default_settings.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return list(module.DefaultConfig.SQLALCHEMY_BINDS.keys())
+
+def write_settings(work_dir):
+    dbs_dir = os.path.join(work_dir, 'dbs')
+    os.makedirs(dbs_dir, exist_ok=True)
+    binds = { bind: 'sqlite:///{0}/{1}.db'.format(dbs_dir, bind) for bind in default_binds() }
+    settings = "\n".join([
+        "SQLALCHEMY_DATABASE_URI = 'sqlite:///{0}/default.db'".format(dbs_dir),
+        "SQLALCHEMY_BINDS = {0}".format(repr(binds)),
+        "SQLALCHEMY_ECHO = False",
+        "CONTROLLER_HOST = 'localhost'",
+        "CONTROLLER_PORT = '9'  # Discard port, so sends to a controller fail fast",
+        "PROFILING_ENABLED = False",
+    ]) + "\n"
+    settings_file = os.path.join(work_dir, 'settings.py')
+    with open(settings_file, 'w') as f:
+        f.write(settings)
+    return settings_file
+
+def insert(db, model, rows):
+    for i in range(0, len(rows), SEED_BATCH_SIZE):
+        db.session.execute(model.__table__.insert(), rows[i:i+SEED_BATCH_SIZE])
+    db.session.commit()
+
+def seed(farm):
+    from api import app, db
+    from common.models import blockchains as b, farms as f, plots as p, wallets as wa, workers as w
+    from common.models.stats import StatPlotsDiskFree, StatPlotsDiskUsed
+    with app.app_context():
+        db.create_all()
+        insert(db, w.Worker, generators.worker_rows(farm))
+        insert(db, b.Blockchain, generators.blockchain_rows(farm))
+        insert(db, f.Farm, generators.farm_rows(farm))
+        insert(db, wa.Wallet, generators.wallet_rows(farm))
+        insert(db, StatPlotsDiskUsed, generators.disk_stats(farm))
+        insert(db, StatPlotsDiskFree, generators.disk_stats(farm, free=True))
+        plots = []
+        for payloads in generators.plot_payloads(generators.harvesters(farm)).values():
+            plots.extend(payloads)
+        insert(db, p.Plot, plots)
+
+def setup(farm, work_dir=None):
+    """Points both apps at fresh databases under work_dir, seeded with the farm, and returns work_dir."""
+    work_dir = work_dir or tempfile.mkdtemp(prefix='machinaris-benchmarks-')
+    settings_file = write_settings(work_dir)
+    os.environ['API_SETTINGS_FILE'] = settings_file
+    os.environ['WEB_SETTINGS_FILE'] = settings_file
+    seed(farm)
+    return work_dir
@@ -0,0 +1,346 @@
+#
+# Synthetic farms for the benchmarks: workers, plots as harvesters report them, challenges,
+# disk stats over a number of days, and farmer debug.log files.  All are generated from a seed,
+# so the same arguments always give the same farm.
+#
+
+import datetime
+import json
+import random
+
+PLOT_SIZES = { 32: 108836033428, 33: 224000000000 }
+
+CHIA_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+# Height of the synthetic chain's peak
+PEAK_HEIGHT = 3012345
+
+class Farm:
+    """
+    Sizes of a synthetic farm.  Plots are spread evenly over workers, and each worker's plots
+    evenly over its plots_dirs.  Stats are generated every stats_interval_mins over days.
+    Transactions are those of the fullnode's wallet, and peers its connections.
+    """
+
+    def __init__(self, workers=10, plots=10000, days=7, challenges=5000, plots_dirs=4,
+            stats_interval_mins=10, transactions=1000, peers=50, seed=1, now=None):
+        self.workers = workers
+        self.plots = plots
+        self.days = days
+        self.challenges = challenges
+        self.transactions = transactions
+        self.peers = peers
+        self.plots_dirs = plots_dirs
+        self.stats_interval_mins = stats_interval_mins
+        self.seed = seed
+        self.now = now or datetime.datetime(2023, 2, 1, 12, 0)
+
+    def params(self):
+        return { 'workers': self.workers, 'plots': self.plots, 'days': self.days, 'challenges': self.challenges,
+            'plots_dirs': self.plots_dirs, 'stats_interval_mins': self.stats_interval_mins,
+            'transactions': self.transactions, 'peers': self.peers, 'seed': self.seed }
+
+    def rng(self, salt):
+        return random.Random("{0}-{1}".format(self.seed, salt))
+
+    def hostnames(self):
+        return [ "harvester{0:03d}".format(i) for i in range(self.workers) ]
+
+def worker_rows(farm):
+    """Worker records as stored by the controller, one per host for the chia blockchain."""
+    rows = []
+    for hostname in farm.hostnames():
+        rows.append({
+            'hostname': hostname,
+            'port': 8927,
+            'blockchain': 'chia',
+            'displayname': hostname,
+            'mode': 'harvester',
+            'services': json.dumps({ 'harvester_status': 'running' }),
+            'url': "http://{0}:8927".format(hostname),
+            'config': json.dumps({ 'machinaris_version': '0.8.7', 'enabled_blockchains': ['chia'] }),
+            'latest_ping_result': 'Responding',
+            'ping_success_at': farm.now,
+        })
+    return rows
+
+def blockchain_rows(farm):
+    """Status of the fullnode, the first worker, as in the output of `chia show -s`."""
+    details = """Network: mainnet    Port: 8444   RPC Port: 8555
+Node ID: {0:064x}
+Genesis Challenge: ccd5bb71183532bff220ba46c268991a3ff07eb358e8255a65c30a2dce0e5fbb
+Current Blockchain Status: Full Node Synced
+
+Peak: Hash: 0x{1:064x}
+      Time: {2}                  Height:    {3}
+
+Estimated network space: 25.100 EiB
+Current difficulty: 2048
+Current VDF sub_slot_iters: 147849216
+""".format(farm.rng('blockchain').getrandbits(256), farm.rng('peak').getrandbits(256), farm.now.strftime('%a %b %d %Y %H:%M:%S UTC'), PEAK_HEIGHT)
+    return [{ 'hostname': farm.hostnames()[0], 'blockchain': 'chia', 'details': details }]
+
+def farm_rows(farm):
+    """Farm summary of each worker, as reported by `chia farm summary`."""
+    rows = []
+    plots_per_host = farm.plots // max(farm.workers, 1)
+    for hostname in farm.hostnames():
+        rows.append({
+            'hostname': hostname,
+            'blockchain': 'chia',
+            'mode': 'harvester',
+            'status': 'Farming',
+            'plot_count': plots_per_host,
+            'plots_size': round(plots_per_host * PLOT_SIZES[32] / 1024 ** 3, 2),
+            'total_coins': 0,
+            'netspace_size': 25.1 * 1024 ** 6,
+            'expected_time_to_win': '2 months and 1 week',
+        })
+    return rows
+
+def wallet_rows(farm):
+    """Wallet of the fullnode, as in the output of `chia wallet show`."""
+    details = """Wallet height: {1}
+Sync status: Synced
+Balances, fingerprint: {0}
+
+Chia Wallet:
+   -Total Balance:         1.25 xch (1250000000000 mojo)
+   -Pending Total Balance: 1.25 xch (1250000000000 mojo)
+   -Spendable:             1.25 xch (1250000000000 mojo)
+   -Type:                  STANDARD_WALLET
+   -Wallet ID:             1
+""".format(farm.rng('wallet').randint(10**9, 4 * 10**9), PEAK_HEIGHT)
+    return [{ 'hostname': farm.hostnames()[0], 'blockchain': 'chia', 'details': details }]
+
+def harvesters(farm):
+    """Plots in the shape of the farmer's get_harvesters RPC response."""
+    rng = farm.rng('plots')
+    result = []
+    hostnames = farm.hostnames()
+    for index, hostname in enumerate(hostnames):
+        count = farm.plots // len(hostnames) + (1 if index < farm.plots % len(hostnames) else 0)
+        plots = []
+        for i in range(count):
+            plot_id = "{0:064x}".format(rng.getrandbits(256))
+            ksize = 33 if rng.random() < 0.05 else 32
+            created = farm.now - datetime.timedelta(minutes=rng.randint(0, farm.days * 24 * 60))
+            pooled = rng.random() < 0.8
+            plots.append({
+                'plot_id': '0x' + plot_id,
+                'filename': "/plots{0}/plot-k{1}-{2}-{3}.plot".format(i % farm.plots_dirs + 1, ksize,
+                    created.strftime("%Y-%m-%d-%H-%M"), plot_id),
+                'file_size': PLOT_SIZES[ksize],
+                'size': ksize,
+                'plot_public_key': "0x{0:096x}".format(rng.getrandbits(384)),
+                'pool_contract_puzzle_hash': "0x{0:064x}".format(rng.getrandbits(256)) if pooled else None,
+                'pool_public_key': None if pooled else "0x{0:096x}".format(rng.getrandbits(384)),
+                'time_modified': created.timestamp(),
+            })
+        # About one plot in 200 fails to open, and one in 500 is missing its keys
+        problems = [ "/plots{0}/plot-k32-{1}-{2:064x}.plot".format(i % farm.plots_dirs + 1,
+            farm.now.strftime("%Y-%m-%d-%H-%M"), rng.getrandbits(256)) for i in range(count // 200 + count // 500) ]
+        result.append({
+            'connection': { 'host': hostname, 'node_id': "0x{0:064x}".format(rng.getrandbits(256)), 'port': 8448 },
+            'plots': plots,
+            'failed_to_open_filenames': problems[:count // 200],
+            'no_key_filenames': problems[count // 200:],
+            'duplicates': [ plot['filename'].replace('/plots', '/backup') for plot in plots[:count // 1000] ],
+        })
+    return result
+
+def rpc_plots(harvesters):
+    """Plots as returned by the RPC client's _load_all_plots from a get_harvesters response."""
+    plots = []
+    for harvester in harvesters:
+        for plot in harvester['plots']:
+            plots.append({
+                "hostname": harvester['connection']['host'],
+                "type": "solo" if plot["pool_contract_puzzle_hash"] is None else "portable",
+                "plot_id": plot['plot_id'],
+                "file_size": plot['file_size'],
+                "filename": plot['filename'],
+                "plot_public_key": plot['plot_public_key'],
+                "pool_contract_puzzle_hash": plot['pool_contract_puzzle_hash'],
+                "pool_public_key": plot['pool_public_key'],
+            })
+    return plots
+
+def coin(rng, amount):
+    return { 'parent_coin_info': "0x{0:064x}".format(rng.getrandbits(256)),
+        'puzzle_hash': "0x{0:064x}".format(rng.getrandbits(256)), 'amount': amount }
+
+def transactions(farm):
+    """Farming rewards and sends of the wallet, newest first, in the shape of the wallet's get_transactions RPC."""
+    rng = farm.rng('transactions')
+    result = []
+    for i in range(farm.transactions):
+        created = farm.now - datetime.timedelta(minutes=i * 37)
+        reward = rng.random() < 0.7
+        amount = 250000000000 if reward else rng.randint(1, 10**12)
+        puzzle_hash = "0x{0:064x}".format(rng.getrandbits(256))
+        result.append({
+            'confirmed_at_height': PEAK_HEIGHT - i * 192,
+            'created_at_time': int(created.timestamp()),
+            'to_puzzle_hash': puzzle_hash,
+            'to_address': 'xch1' + "{0:058x}".format(rng.getrandbits(232)),
+            'amount': amount,
+            'fee_amount': 0 if reward else rng.randint(0, 10**6),
+            'confirmed': True,
+            'sent': 0 if reward else 1,
+            'spend_bundle': None,
+            'additions': [ coin(rng, amount) ],
+            'removals': [] if reward else [ coin(rng, amount + 10**6) ],
+            'wallet_id': 1,
+            'sent_to': [],
+            'trade_id': None,
+            'type': 2 if reward else 1,  # FEE_REWARD or OUTGOING_TX
+            'name': "0x{0:064x}".format(rng.getrandbits(256)),
+            'memos': {},
+        })
+    return result
+
+def peer_connections(farm):
+    """Full node peers, in the shape of the get_connections RPC."""
+    rng = farm.rng('peers')
+    connections = []
+    for i in range(farm.peers):
+        connections.append({
+            'type': 1,  # FULL_NODE
+            'local_port': 8444,
+            'peer_host': "10.{0}.{1}.{2}".format(rng.randint(0, 255), rng.randint(0, 255), rng.randint(1, 254)),
+            'peer_port': rng.randint(1024, 65535),
+            'peer_server_port': 8444,
+            'node_id': "0x{0:064x}".format(rng.getrandbits(256)),
+            'creation_time': farm.now.timestamp() - rng.randint(0, 86400),
+            'bytes_read': rng.randint(0, 10**9),
+            'bytes_written': rng.randint(0, 10**9),
+            'last_message_time': farm.now.timestamp() - rng.randint(0, 60),
+            'peak_height': PEAK_HEIGHT - rng.randint(0, 3),
+            'peak_weight': 10**12,
+            'peak_hash': "0x{0:064x}".format(rng.getrandbits(256)),
+        })
+    return connections
+
+def block_record(farm, height, transaction_block):
+    """A block record of the chain's peak, in the shape of the full node's get_block_record RPC."""
+    rng = farm.rng("block-{0}".format(height))
+    return {
+        'header_hash': "0x{0:064x}".format(rng.getrandbits(256)),
+        'prev_hash': "0x{0:064x}".format(farm.rng("block-{0}".format(height - 1)).getrandbits(256)),
+        'height': height,
+        'weight': height * 1000,
+        'total_iters': height * 10**9,
+        'signage_point_index': rng.randint(0, 63),
+        'challenge_vdf_output': { 'data': "0x{0:0200x}".format(rng.getrandbits(800)) },
+        'infused_challenge_vdf_output': None,
+        'reward_infusion_new_challenge': "0x{0:064x}".format(rng.getrandbits(256)),
+        'challenge_block_info_hash': "0x{0:064x}".format(rng.getrandbits(256)),
+        'sub_slot_iters': 147849216,
+        'pool_puzzle_hash': "0x{0:064x}".format(rng.getrandbits(256)),
+        'farmer_puzzle_hash': "0x{0:064x}".format(rng.getrandbits(256)),
+        'required_iters': rng.randint(10**5, 10**7),
+        'deficit': 0,
+        'overflow': False,
+        'prev_transaction_block_height': height - 1 if transaction_block else height - 2,
+        'timestamp': int(farm.now.timestamp()) - (PEAK_HEIGHT - height) * 18 if transaction_block else None,
+        'prev_transaction_block_hash': "0x{0:064x}".format(rng.getrandbits(256)) if transaction_block else None,
+        'fees': 0 if transaction_block else None,
+        'reward_claims_incorporated': [] if transaction_block else None,
+        'finished_challenge_slot_hashes': None,
+        'finished_infused_challenge_slot_hashes': None,
+        'finished_reward_slot_hashes': None,
+        'sub_epoch_summary_included': None,
+    }
+
+def plot_payloads(harvesters):
+    """Plots by hostname, as workers send them to the controller's /plots endpoint."""
+    payloads = {}
+    for harvester in harvesters:
+        hostname = harvester['connection']['host']
+        for plot in harvester['plots']:
+            dir, file = plot['filename'].rsplit('/', 1)
+            payloads.setdefault(hostname, []).append({
+                'plot_id': plot['plot_id'][2:18],
+                'blockchain': 'chia',
+                'hostname': hostname,
+                'displayname': hostname,
+                'dir': dir,
+                'file': file,
+                'type': "solo" if plot["pool_contract_puzzle_hash"] is None else "portable",
+                'created_at': datetime.datetime.fromtimestamp(plot['time_modified']).strftime("%Y-%m-%d %H:%M"),
+                'size': plot['file_size'],
+            })
+    return payloads
+
+def challenge_payloads(farm):
+    """Challenges as farmers send them to the controller's /challenges endpoint, oldest first."""
+    rng = farm.rng('challenges')
+    hostnames = farm.hostnames()
+    plots_per_host = max(farm.plots // max(len(hostnames), 1), 1)
+    start = farm.now - datetime.timedelta(seconds=farm.challenges * 9.375 / max(len(hostnames), 1))
+    challenges = []
+    for i in range(farm.challenges):
+        hostname = hostnames[i % len(hostnames)]
+        created = start + datetime.timedelta(seconds=(i // len(hostnames)) * 9.375)
+        challenge_id = "{0:064x}".format(rng.getrandbits(256))
+        challenges.append({
+            'unique_id': "{0}_{1}_{2}".format(hostname, challenge_id[:10], i),
+            'hostname': hostname,
+            'blockchain': 'chia',
+            'challenge_id': challenge_id[:10] + '...',
+            'plots_past_filter': "{0}/{1}".format(rng.randint(0, max(plots_per_host // 512, 1)), plots_per_host),
+            'proofs_found': 1 if rng.random() < 0.001 else 0,
+            'time_taken': "{0:.5f} secs".format(rng.lognormvariate(-1.5, 0.8)),
+            'created_at': created.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+        })
+    return challenges
+
+def disk_stats(farm, free=False):
+    """Used (or free) GB of each plots disk of each worker, every stats_interval_mins over the farm's days."""
+    rng = farm.rng('disk_free' if free else 'disk_used')
+    rows = []
+    intervals = farm.days * 24 * 60 // farm.stats_interval_mins
+    for hostname in farm.hostnames():
+        for d in range(farm.plots_dirs):
+            path = "/plots{0}".format(d + 1)
+            used = rng.uniform(1000, 10000)
+            for i in range(intervals):
+                used = min(used + rng.uniform(0, 2), 18000)
+                created = farm.now - datetime.timedelta(minutes=(intervals - i) * farm.stats_interval_mins)
+                rows.append({
+                    'hostname': hostname,
+                    'path': path,
+                    'value': round(18000 - used if free else used, 2),
+                    'created_at': created.strftime("%Y%m%d%H%M"),
+                })
+    return rows
+
+def write_debug_log(farm, path, megabytes):
+    """Writes a farmer debug.log of about the size given, mostly harvester eligibility lines with some partials."""
+    rng = farm.rng('debug_log')
+    target = megabytes * 1024 * 1024
+    written = 0
+    time = farm.now - datetime.timedelta(days=farm.days)
+    plots = max(farm.plots // max(farm.workers, 1), 1)
+    with open(path, 'w') as f:
+        while written < target:
+            time += datetime.timedelta(seconds=rng.uniform(0.5, 2))
+            stamp = time.strftime(CHIA_DATE_FORMAT)[:-3]
+            roll = rng.random()
+            if roll < 0.6:
+                line = "{0} harvester chia.harvester.harvester: INFO     {1} plots were eligible for farming {2}... " \
+                    "Found {3} proofs. Time: {4:.5f} s. Total {5} plots\n".format(stamp, rng.randint(0, plots // 512 + 1),
+                    "{0:010x}".format(rng.getrandbits(40)), 0, rng.lognormvariate(-1.5, 0.8), plots)
+            elif roll < 0.62:
+                line = "{0} farmer chia.farmer.farmer         : INFO     Submitting partial for {1} to https://pool.example.com\n".format(
+                    stamp, "{0:064x}".format(rng.getrandbits(256)))
+            else:
+                line = "{0} full_node chia.full_node.full_node: INFO     Added unfinished_block {1}, not farmed by us, " \
+                    "SP: {2} farmer response time: {3:.4f}, Pool pk xch1{4}, validation time: {5:.4f} seconds, " \
+                    "cost: {6}, percent full: {7}%\n".format(stamp, "{0:064x}".format(rng.getrandbits(256)), rng.randint(0, 63),
+                    rng.uniform(0, 1), "{0:058x}".format(rng.getrandbits(232)), rng.uniform(0, 1), rng.randint(0, 10**10),
+                    round(rng.uniform(0, 100), 3))
+            f.write(line)
+            written += len(line)
+    return written
@@ -0,0 +1,115 @@
+#
+# Runs benchmark cases, measuring latency, throughput and peak memory, and compares the
+# results against a saved baseline so regressions fail the run.
+#
+
+import datetime
+import gc
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+import psutil
+
+# Allowed change against the baseline before a result counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+class Case:
+    """
+    One benchmark.  setup() is called before every iteration and its result passed to run(),
+    which returns the number of items processed, like plots stored or challenges received.
+    """
+
+    def __init__(self, name, run, setup=None, iterations=3, unit='items'):
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda: None)
+        self.iterations = iterations
+        self.unit = unit
+
+def percentile(values, percent):
+    values = sorted(values)
+    if not values:
+        return None
+    index = min(int(round(percent / 100 * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+def measure(case):
+    process = psutil.Process(os.getpid())
+    latencies = []
+    items = 0
+    rss_start = process.memory_info().rss
+    for i in range(case.iterations):
+        state = case.setup()
+        gc.collect()
+        started = time.perf_counter()
+        items += case.run(state) or 0
+        latencies.append(time.perf_counter() - started)
+    # Allocations are traced in a separate run, as tracing slows down the timed ones
+    state = case.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run(state)
+        peak_alloc = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    total_secs = sum(latencies)
+    return {
+        'iterations': case.iterations,
+        'unit': case.unit,
+        'items': items,
+        'latency_secs': {
+            'mean': round(total_secs / len(latencies), 6),
+            'p50': round(percentile(latencies, 50), 6),
+            'p95': round(percentile(latencies, 95), 6),
+            'max': round(max(latencies), 6),
+        },
+        'throughput_per_sec': round(items / total_secs, 2) if total_secs and items else None,
+        'peak_alloc_mb': round(peak_alloc / 1024 ** 2, 2),
+        'rss_growth_mb': round((process.memory_info().rss - rss_start) / 1024 ** 2, 2),
+    }
+
+def run_cases(cases, only=None, log=print):
+    results = {}
+    for case in cases:
+        if only and not case.name in only:
+            continue
+        log("Running {0}...".format(case.name))
+        results[case.name] = measure(case)
+        log("  {0}".format(json.dumps(results[case.name])))
+    return results
+
+def report(params, results):
+    return {
+        'created_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'params': params,
+        'results': results,
+    }
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Returns a list of regressions of the current report against the baseline report, run with the same params."""
+    regressions = []
+    if current.get('params') != baseline.get('params'):
+        regressions.append("Params differ from baseline: {0} vs {1}".format(current.get('params'), baseline.get('params')))
+        return regressions
+    for name, result in current['results'].items():
+        if not name in baseline['results']:
+            continue
+        base = baseline['results'][name]
+        if result['latency_secs']['p50'] > base['latency_secs']['p50'] * (1 + tolerance):
+            regressions.append("{0}: p50 latency {1}s is slower than baseline {2}s".format(
+                name, result['latency_secs']['p50'], base['latency_secs']['p50']))
+        if base['throughput_per_sec'] and result['throughput_per_sec'] is not None and \
+                result['throughput_per_sec'] < base['throughput_per_sec'] * (1 - tolerance):
+            regressions.append("{0}: throughput {1}/s is below baseline {2}/s".format(
+                name, result['throughput_per_sec'], base['throughput_per_sec']))
+        if result['peak_alloc_mb'] > max(base['peak_alloc_mb'] * (1 + tolerance), base['peak_alloc_mb'] + 1):
+            regressions.append("{0}: peak allocations {1} MB exceed baseline {2} MB".format(
+                name, result['peak_alloc_mb'], base['peak_alloc_mb']))
+    return regressions
@@ -0,0 +1,88 @@
+#
+# Runs the benchmarks against a synthetic farm and writes the results as JSON.  With --baseline,
+# compares against a previous run of the same farm size and exits non-zero on any regression.
+#
+#   cd /machinaris && python -m benchmarks.run --plots 50000 --output /tmp/benchmarks.json
+#
+
+import argparse
+import json
+import os
+import shutil
+import sys
+
+from benchmarks import fake_rpc, farm as benchmark_farm, generators, harness
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark Machinaris ingestion, RPC clients, and WebUI loaders on a synthetic farm.")
+    parser.add_argument('--workers', type=int, default=10, help="Harvesters in the farm.")
+    parser.add_argument('--plots', type=int, default=10000, help="Plots across all harvesters.")
+    parser.add_argument('--days', type=int, default=7, help="Days of disk stats, and age of the oldest plot.")
+    parser.add_argument('--challenges', type=int, default=5000, help="Challenges posted by the farmers.")
+    parser.add_argument('--transactions', type=int, default=1000, help="Transactions in the wallet.")
+    parser.add_argument('--peers', type=int, default=50, help="Peer connections of the full node.")
+    parser.add_argument('--log-mb', type=int, default=50, help="Size of the generated farmer debug.log.")
+    parser.add_argument('--rpc-latency-ms', type=float, default=0, help="Latency added to each fake RPC request.")
+    parser.add_argument('--rpc-jitter-ms', type=float, default=0, help="Random latency of up to this added on top.")
+    parser.add_argument('--seed', type=int, default=1, help="Seed of the synthetic farm.")
+    parser.add_argument('--iterations', type=int, default=3, help="Timed runs of each benchmark.")
+    parser.add_argument('--only', nargs='*', help="Names of the benchmarks to run, all by default.")
+    parser.add_argument('--output', help="File to write the results to, stdout by default.")
+    parser.add_argument('--baseline', help="Results of an earlier run to compare against.")
+    parser.add_argument('--tolerance', type=float, default=harness.DEFAULT_TOLERANCE,
+        help="Allowed slowdown against the baseline, as a fraction.")
+    parser.add_argument('--keep', action='store_true', help="Keep the databases and log in the work directory.")
+    return parser.parse_args(argv)
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+def main(argv=None):
+    args = parse_args(argv)
+    farm = generators.Farm(workers=args.workers, plots=args.plots, days=args.days,
+        challenges=args.challenges, transactions=args.transactions, peers=args.peers, seed=args.seed)
+    params = farm.params()
+    params['log_mb'] = args.log_mb
+    params['rpc_latency_ms'] = args.rpc_latency_ms
+    params['rpc_jitter_ms'] = args.rpc_jitter_ms
+    log("Seeding synthetic farm: {0}".format(json.dumps(params)))
+    work_dir = benchmark_farm.setup(farm)
+    fake = None
+    try:
+        log_file = os.path.join(work_dir, 'debug.log')
+        generators.write_debug_log(farm, log_file, args.log_mb)
+        # Imported only now, as the apps read their settings on import
+        from benchmarks import cases
+        from api.commands import rpc
+        fake = fake_rpc.FakeRpc(farm, args.rpc_latency_ms / 1000, args.rpc_jitter_ms / 1000,
+            chia_root=rpc.DEFAULT_ROOT_PATH).start()
+        rpc_root = fake.write_root(work_dir)
+        all_cases = cases.api_cases(farm, args.iterations, log_file, rpc_root) + \
+            cases.rpc_cases(farm, args.iterations, rpc_root) + cases.web_cases(farm, args.iterations)
+        results = harness.report(params, harness.run_cases(all_cases, args.only, log))
+        log("Fake RPC requests served: {0}".format(json.dumps(fake.requests())))
+    finally:
+        if fake:
+            fake.stop()
+        if args.keep:
+            log("Kept work directory at {0}".format(work_dir))
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    output = json.dumps(results, indent=4)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = harness.compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            log("REGRESSION: {0}".format(regression))
+        if regressions:
+            return 1
+        log("No regressions against {0}".format(args.baseline))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
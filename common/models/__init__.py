@@ -1,19 +1,20 @@
 from .alerts import Alert 
 from .blockchains import Blockchain
-from .challenges import Challenge
+from .challenges import Challenge, ChallengeHistogram
 from .connections import Connection
-from .drives import Drive
+from .drives import Drive, DriveAttribute
 from .farms import Farm 
 from .keys import Key
 from .partials import Partial
-from .plots import Plot 
+from .peers import Peer
+from .plots import Plot, PlotStatus
 from .plotnfts import Plotnft
 from .plottings import Plotting 
 from .pools import Pool
 from .stats import StatPlotCount, StatPlotsSize, StatTotalCoins, StatNetspaceSize, StatTimeToWin, \
         StatPlotsTotalUsed, StatPlotsDiskUsed, StatPlotsDiskFree, StatPlottingTotalUsed, \
         StatPlottingDiskUsed, StatPlottingDiskFree, StatFarmedBlocks, StatWalletBalances, StatEffort
-from .transfers import Transfer
-from .wallets import Wallet
+from .transfers import Transfer, TransferHistory, TransferSample
+from .wallets import Wallet, ColdWallet, ColdWalletTransaction
 from .warnings import Warning
 from .workers import Worker 
\ No newline at end of file
@@ -1,6 +1,10 @@
+import bisect
 import datetime as dt
+import json
 import sqlalchemy as sa
 
+from sqlalchemy.sql import func
+
 from common.extensions.database import db
 
 class Challenge(db.Model):
@@ -14,5 +18,66 @@ class Challenge(db.Model):
     plots_past_filter = sa.Column(sa.String(length=32), nullable=False)
     proofs_found = sa.Column(sa.Integer, nullable=False)
     time_taken = sa.Column(sa.String(length=32), nullable=False)
+    time_ms = sa.Column(sa.Integer, nullable=True)  # Parsed from time_taken on receipt, for sorting and aggregates
+    eligible = sa.Column(sa.Integer, nullable=True)  # Parsed from plots_past_filter on receipt
+    total = sa.Column(sa.Integer, nullable=True)
     created_at = sa.Column(sa.String(length=64), nullable=False)
-    
\ No newline at end of file
+    
+# Fixed log-scale upper bounds of each lookup time bucket, with a last bucket for anything slower
+LOOKUP_BUCKETS_MS = [ 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 30000, 60000 ]
+# Farmers log a warning when lookups take longer than this
+SLOW_LOOKUP_MS = 5000
+
+class ChallengeHistogram(db.Model):
+    __bind_key__ = 'challenges'
+    __tablename__ = "challenge_histograms"
+
+    hostname = sa.Column(sa.String(length=255), primary_key=True)
+    blockchain = sa.Column(sa.String(length=64), primary_key=True)
+    day = sa.Column(sa.String(length=10), primary_key=True)  # Like 2023-01-29
+    buckets = sa.Column(sa.String(), nullable=False)  # JSON list of counts per LOOKUP_BUCKETS_MS, plus overflow
+    count = sa.Column(sa.Integer, nullable=False, default=0)
+    slow_count = sa.Column(sa.Integer, nullable=False, default=0)
+    sum_ms = sa.Column(sa.Integer, nullable=False, default=0)
+    max_ms = sa.Column(sa.Integer, nullable=False, default=0)
+    last_created_at = sa.Column(sa.String(length=64), nullable=True)  # Newest challenge counted, as farmers resend their last log lines
+    updated_at = sa.Column(sa.DateTime(), onupdate=func.now())
+
+    def bucket_counts(self):
+        if not self.buckets:
+            return [0] * (len(LOOKUP_BUCKETS_MS) + 1)
+        return json.loads(self.buckets)
+
+    def add(self, time_ms):
+        counts = self.bucket_counts()
+        counts[bisect.bisect_left(LOOKUP_BUCKETS_MS, time_ms)] += 1
+        self.buckets = json.dumps(counts)
+        self.count = (self.count or 0) + 1
+        self.sum_ms = (self.sum_ms or 0) + time_ms
+        self.max_ms = max(self.max_ms or 0, time_ms)
+        if time_ms > SLOW_LOOKUP_MS:
+            self.slow_count = (self.slow_count or 0) + 1
+
+def merge_bucket_counts(histograms):
+    merged = [0] * (len(LOOKUP_BUCKETS_MS) + 1)
+    for histogram in histograms:
+        for i, count in enumerate(histogram.bucket_counts()):
+            merged[i] += count
+    return merged
+
+def percentile_ms(counts, percentile, max_ms=None):
+    """Estimates the percentile by interpolating within the bucket it falls in."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = total * percentile / 100
+    seen = 0
+    for i, count in enumerate(counts):
+        if count and seen + count >= rank:
+            lower = LOOKUP_BUCKETS_MS[i-1] if i > 0 else 0
+            upper = LOOKUP_BUCKETS_MS[i] if i < len(LOOKUP_BUCKETS_MS) else (max_ms or LOOKUP_BUCKETS_MS[-1])
+            if max_ms is not None:
+                upper = min(upper, max_ms)
+            return round(lower + (upper - lower) * (rank - seen) / count)
+        seen += count
+    return max_ms
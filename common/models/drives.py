@@ -19,9 +19,22 @@ class Drive(db.Model):
     comment = sa.Column(sa.String(), nullable=True)
     temperature = sa.Column(sa.REAL, nullable=True)
     power_on_hours = sa.Column(sa.REAL, nullable=True)
+    reallocated_sectors = sa.Column(sa.Integer, nullable=True)
     size_gibs = sa.Column(sa.REAL, nullable=True)
     capacity = sa.Column(sa.String(), nullable=True)
     smart_info = sa.Column(sa.String(), nullable=True)
     created_at = sa.Column(sa.DateTime(), server_default=func.now())
     updated_at = sa.Column(sa.DateTime(), onupdate=func.now())
-    
\ No newline at end of file
+
+class DriveAttribute(db.Model):
+    __bind_key__ = 'drives'
+    __tablename__ = "drive_attributes"
+    __table_args__ = (sa.Index('ix_drive_attributes_serial_number_created_at', 'serial_number', 'created_at'),)
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    serial_number = sa.Column(sa.String(length=64), nullable=False)
+    hostname = sa.Column(sa.String(length=255), nullable=False)
+    temperature = sa.Column(sa.REAL, nullable=True)
+    reallocated_sectors = sa.Column(sa.Integer, nullable=True)
+    power_on_hours = sa.Column(sa.REAL, nullable=True)
+    created_at = sa.Column(sa.DateTime(), server_default=func.now())
@@ -0,0 +1,24 @@
+import datetime as dt
+import sqlalchemy as sa
+
+from sqlalchemy.sql import func
+
+from common.extensions.database import db
+
+class Peer(db.Model):
+    __bind_key__ = 'connections'
+    __tablename__ = "peers"
+
+    hostname = sa.Column(sa.String(length=255), primary_key=True)
+    blockchain = sa.Column(sa.String(length=64), primary_key=True)
+    node_id = sa.Column(sa.String(length=64), primary_key=True)
+    type = sa.Column(sa.String(length=32), nullable=False)
+    ip = sa.Column(sa.String(length=64), nullable=False)
+    peer_port = sa.Column(sa.Integer, nullable=True)
+    peer_server_port = sa.Column(sa.Integer, nullable=True)
+    height = sa.Column(sa.Integer, nullable=True)
+    hash = sa.Column(sa.String(length=66), nullable=True)
+    bytes_up = sa.Column(sa.BigInteger, nullable=True)
+    bytes_down = sa.Column(sa.BigInteger, nullable=True)
+    last_message_at = sa.Column(sa.DateTime(), nullable=True)
+    created_at = sa.Column(sa.DateTime(), server_default=func.now())
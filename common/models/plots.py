@@ -34,3 +34,39 @@ class Plot(db.Model):
     plot_analyze = sa.Column(sa.String(length=255), nullable=True)
     created_at = sa.Column(sa.String(length=64), nullable=False)
     updated_at = sa.Column(sa.DateTime(), onupdate=func.now())
+
+    __table_args__ = (sa.Index('ix_plots_created_at', 'created_at'),)
+
+class PlotStatus(db.Model):
+    __bind_key__ = 'plots'
+    __tablename__ = "plot_statuses"
+
+    plot_id = sa.Column(sa.String(length=8), primary_key=True)
+    plotter_host = sa.Column(sa.String(length=255), nullable=True)
+    plotter_blockchain = sa.Column(sa.String(length=64), nullable=True)
+    analyze_host = sa.Column(sa.String(length=255), nullable=True)
+    analyze_seconds = sa.Column(sa.String(length=32), nullable=True)
+    analyzed_at = sa.Column(sa.DateTime(), nullable=True)  # Null until analyze attempted
+    check_host = sa.Column(sa.String(length=255), nullable=True)
+    check_status = sa.Column(sa.String(length=8), nullable=True)
+    checked_at = sa.Column(sa.DateTime(), nullable=True)  # Null until check attempted
+    created_at = sa.Column(sa.DateTime(), server_default=func.now())
+    updated_at = sa.Column(sa.DateTime(), onupdate=func.now())
+
+    __table_args__ = (sa.Index('ix_plot_statuses_analyzed_at', 'analyzed_at'),)
+
+    # Value stored in Plot.plot_analyze: 'host|seconds', '-' if no result, None if not yet tried
+    def plot_analyze(self):
+        if not self.analyzed_at:
+            return None
+        if self.analyze_seconds:
+            return '|'.join([self.analyze_host or '', self.analyze_seconds])
+        return '-'
+
+    # Value stored in Plot.plot_check: GOOD or BAD, '-' if no result, None if not yet tried
+    def plot_check(self):
+        if not self.checked_at:
+            return None
+        if self.check_status:
+            return self.check_status
+        return '-'
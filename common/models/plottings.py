@@ -27,6 +27,10 @@ class Plotting(db.Model):
     user = sa.Column(sa.String(length=8), nullable=False)
     sys = sa.Column(sa.String(length=8), nullable=False)
     io = sa.Column(sa.String(length=8), nullable=False)
+    wall_secs = sa.Column(sa.Integer, nullable=True)
+    tmp_bytes = sa.Column(sa.BigInteger, nullable=True)
+    mem_bytes = sa.Column(sa.BigInteger, nullable=True)
+    io_secs = sa.Column(sa.Integer, nullable=True)
     created_at = sa.Column(sa.DateTime(), server_default=func.now())
     updated_at = sa.Column(sa.DateTime(), onupdate=func.now())
 
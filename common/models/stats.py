@@ -8,6 +8,7 @@ from common.extensions.database import db
 class StatPlotCount(db.Model):
     __bind_key__ = 'stat_plot_count'
     __tablename__ = "stat_plot_count"
+    __table_args__ = (sa.Index('ix_stat_plot_count_blockchain_created_at', 'blockchain', 'created_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     hostname = db.Column(db.String())
@@ -18,6 +19,7 @@ class StatPlotCount(db.Model):
 class StatPlotsSize(db.Model):
     __bind_key__ = 'stat_plots_size'
     __tablename__ = "stat_plots_size"
+    __table_args__ = (sa.Index('ix_stat_plots_size_blockchain_created_at', 'blockchain', 'created_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     hostname = db.Column(db.String())
@@ -28,6 +30,7 @@ class StatPlotsSize(db.Model):
 class StatTotalCoins(db.Model):
     __bind_key__ = 'stat_total_coins'
     __tablename__ = "stat_total_coins"
+    __table_args__ = (sa.Index('ix_stat_total_coins_blockchain_created_at', 'blockchain', 'created_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     hostname = db.Column(db.String())
@@ -38,6 +41,7 @@ class StatTotalCoins(db.Model):
 class StatNetspaceSize(db.Model):
     __bind_key__ = 'stat_netspace_size'
     __tablename__ = "stat_netspace_size"
+    __table_args__ = (sa.Index('ix_stat_netspace_size_blockchain_created_at', 'blockchain', 'created_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     hostname = db.Column(db.String())
@@ -58,6 +62,7 @@ class StatTimeToWin(db.Model):
 class StatEffort(db.Model):
     __bind_key__ = 'stat_effort'
     __tablename__ = "stat_effort"
+    __table_args__ = (sa.Index('ix_stat_effort_blockchain_created_at', 'blockchain', 'created_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     hostname = db.Column(db.String())
@@ -88,6 +93,7 @@ class StatPlotsDiskUsed(db.Model):
 class StatPlotsDiskFree(db.Model):
     __bind_key__ = 'stat_plots_disk_free'
     __tablename__ = "stat_plots_disk_free"
+    __table_args__ = (sa.Index('ix_stat_plots_disk_free_created_at', 'created_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     hostname = db.Column(db.String())
@@ -142,6 +148,7 @@ class StatFarmedBlocks(db.Model):
 class StatWalletBalances(db.Model):
     __bind_key__ = 'stat_wallet_balances'
     __tablename__ = "stat_wallet_balances"
+    __table_args__ = (sa.Index('ix_stat_wallet_balances_blockchain_created_at', 'blockchain', 'created_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     hostname = db.Column(db.String())
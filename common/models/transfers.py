@@ -27,4 +27,42 @@ class Transfer(db.Model):
     created_at = sa.Column(sa.DateTime(), server_default=func.now())
     updated_at = sa.Column(sa.DateTime(), onupdate=func.now())
 
-    
\ No newline at end of file
+class TransferHistory(db.Model):
+    # Completed transfers, kept after their log ages out of the plotter's most recent transfers
+    __bind_key__ = 'transfers'
+    __tablename__ = "transfer_history"
+    log_file = sa.Column(sa.String, primary_key=True)
+    hostname = sa.Column(sa.String(length=255), primary_key=True)
+    blockchain = sa.Column(sa.String(length=64), nullable=True)
+    plot_id = sa.Column(sa.String(length=16), nullable=True)
+    k = sa.Column(sa.Integer, nullable=True)
+    size = sa.Column(sa.Integer, nullable=True)
+    source = sa.Column(sa.String, nullable=True)
+    type = sa.Column(sa.String, nullable=True)
+    dest = sa.Column(sa.String, nullable=True)
+    rate = sa.Column(sa.String(length=16), nullable=True)
+    start_date = sa.Column(sa.String(length=24), nullable=True)
+    end_date = sa.Column(sa.String(length=24), nullable=True)
+    duration = sa.Column(sa.String, nullable=True)
+    created_at = sa.Column(sa.DateTime(), server_default=func.now())
+
+    __table_args__ = (
+        sa.Index('ix_transfer_history_hostname_end_date', 'hostname', 'end_date'),
+    )
+
+class TransferSample(db.Model):
+    # Throughput of each running transfer, recorded by the controller as plotters report archiving status
+    __bind_key__ = 'transfers'
+    __tablename__ = "transfer_samples"
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+    hostname = sa.Column(sa.String(length=255), nullable=False)
+    blockchain = sa.Column(sa.String(length=64), nullable=True)
+    log_file = sa.Column(sa.String, nullable=True)
+    dest_host = sa.Column(sa.String(length=255), nullable=False)
+    dest_path = sa.Column(sa.String, nullable=False)
+    rate_mbps = sa.Column(sa.Float, nullable=False)
+    created_at = sa.Column(sa.DateTime(), server_default=func.now())
+
+    __table_args__ = (
+        sa.Index('ix_transfer_samples_created_at', 'created_at'),
+    )
@@ -51,3 +51,28 @@ class Wallet(db.Model):
             if line.strip().startswith("-Spendable") and not "(0" in line:
                 return True
         return False
+
+class ColdWallet(db.Model):
+    __bind_key__ = 'wallets'
+    __tablename__ = "cold_wallets"
+
+    blockchain = sa.Column(sa.String(length=64), primary_key=True)
+    address = sa.Column(sa.String(length=128), primary_key=True)
+    total_balance = sa.Column(sa.REAL, nullable=True)
+    farmed_balance = sa.Column(sa.REAL, nullable=True)
+    last_coin_id = sa.Column(sa.String(length=128), nullable=True)  # Newest transaction already stored
+    created_at = sa.Column(sa.DateTime(), server_default=func.now())
+    updated_at = sa.Column(sa.DateTime(), onupdate=func.now())
+
+class ColdWalletTransaction(db.Model):
+    __bind_key__ = 'wallets'
+    __tablename__ = "cold_wallet_transactions"
+    __table_args__ = (sa.Index('ix_cold_wallet_transactions_address_timestamp', 'blockchain', 'address', 'timestamp'),)
+
+    blockchain = sa.Column(sa.String(length=64), primary_key=True)
+    address = sa.Column(sa.String(length=128), primary_key=True)
+    coin_id = sa.Column(sa.String(length=128), primary_key=True)
+    coin_type = sa.Column(sa.String(length=32), nullable=True)
+    amount = sa.Column(sa.BigInteger, nullable=True)  # In mojos
+    timestamp = sa.Column(sa.Integer, nullable=True)  # Seconds since epoch
+    created_at = sa.Column(sa.DateTime(), server_default=func.now())
@@ -0,0 +1,149 @@
+#
+# Shared in-process layer over the JSON cache files in /root/.chia/machinaris/cache
+# Each file is parsed once per process and only re-read when its mtime changes.
+#
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+CACHE_DIR = '/root/.chia/machinaris/cache'
+
+BLOCKCHAIN_PRICES_CACHE_FILE = CACHE_DIR + '/blockchain_prices_cache.json'
+BLOCKCHAIN_STATUSES_CACHE_FILE = CACHE_DIR + '/blockchain_statuses_cache.json'
+CAPACITY_FORECAST_FILE = CACHE_DIR + '/capacity_forecast.json'
+EXCHANGE_RATES_CACHE_FILE = CACHE_DIR + '/exchange_rates_cache.json'
+GEOIP_CACHE_FILE = CACHE_DIR + '/geoip_cache.json'
+
+class JsonFileCache:
+    """
+    Holds one parsed copy of a JSON cache file.  Callers share the returned dict, so
+    any changes must be persisted with save().  Keys are coerced with key_type, the
+    in-memory copy is re-read after ttl_secs even if the mtime is unchanged, and when
+    max_entries is set, the oldest inserted keys are evicted on save.
+    """
+
+    def __init__(self, path, key_type=str, ttl_secs=None, max_entries=None):
+        self.path = path
+        self.key_type = key_type
+        self.ttl_secs = ttl_secs
+        self.max_entries = max_entries
+        self.lock = threading.RLock()
+        self.data = None
+        self.mtime = None
+        self.loaded_at = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _expired(self):
+        return self.ttl_secs is not None and self.loaded_at is not None and \
+            time.monotonic() - self.loaded_at > self.ttl_secs
+
+    def load(self):
+        with self.lock:
+            mtime = self._file_mtime()
+            if self.data is not None and mtime == self.mtime and not self._expired():
+                self.hits += 1
+                return self.data
+            self.misses += 1
+            data = {}
+            if mtime is not None:
+                try:
+                    with open(self.path) as f:
+                        data = { self.key_type(k): v for k, v in json.load(f).items() }
+                except Exception as ex:
+                    self.errors += 1
+                    logging.error("Unable to read cache from {0} because {1}".format(self.path, str(ex)))
+            self.data = data
+            self.mtime = mtime
+            self.loaded_at = time.monotonic()
+            return self.data
+
+    def get(self, key, default=None):
+        return self.load().get(self.key_type(key), default)
+
+    def _evict(self, data):
+        if not self.max_entries or len(data) <= self.max_entries:
+            return data
+        overflow = len(data) - self.max_entries
+        self.evictions += overflow
+        return { k: data[k] for k in list(data.keys())[overflow:] }
+
+    def save(self, data):
+        with self.lock:
+            data = self._evict({ self.key_type(k): v for k, v in data.items() })
+            tmp_path = None
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix='.' + os.path.basename(self.path))
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+                tmp_path = None
+                self.writes += 1
+            except Exception as ex:
+                self.errors += 1
+                logging.error("Failed to store cache in {0} because {1}".format(self.path, str(ex)))
+            finally:
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            # Keep the in-memory copy even if the write failed, it is still the latest data
+            self.data = data
+            self.mtime = self._file_mtime()
+            self.loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self.lock:
+            self.data = None
+            self.mtime = None
+
+    def stats(self):
+        return {
+            'entries': len(self.data) if self.data is not None else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'errors': self.errors,
+        }
+
+caches = {}
+caches_lock = threading.Lock()
+
+def get_cache(path, key_type=str, ttl_secs=None, max_entries=None):
+    with caches_lock:
+        if not path in caches:
+            caches[path] = JsonFileCache(path, key_type=key_type, ttl_secs=ttl_secs, max_entries=max_entries)
+        return caches[path]
+
+def prices_cache():
+    return get_cache(BLOCKCHAIN_PRICES_CACHE_FILE)
+
+def chain_statuses_cache():
+    return get_cache(BLOCKCHAIN_STATUSES_CACHE_FILE)
+
+def exchange_rates_cache():
+    return get_cache(EXCHANGE_RATES_CACHE_FILE)
+
+def capacity_cache():
+    return get_cache(CAPACITY_FORECAST_FILE)
+
+def geoip_cache():
+    # Peers come and go, so bound the geolocation cache rather than let it grow forever
+    return get_cache(GEOIP_CACHE_FILE, max_entries=50000)
+
+def stats():
+    with caches_lock:
+        return { os.path.basename(path): cache.stats() for path, cache in caches.items() }
@@ -206,3 +206,36 @@ def format_minutes(minutes: int) -> str:
     if minutes > 0:
         return format_unit_string("minute", minutes)
     return "Unknown"
+
+# Convert a byte count into the human-readable size string printed by `chia farm summary`.
+# https://github.com/Chia-Network/chia-blockchain/blob/9e21716965f6f6250f6fe4b3449a66f20794d3d9/chia/cmds/units.py
+def format_bytes(bytes: int) -> str:
+    if not isinstance(bytes, int) or bytes < 0:
+        return "Invalid"
+    LABELS = ("MiB", "GiB", "TiB", "PiB", "EiB", "ZiB", "YiB")
+    BASE = 1024
+    value = bytes / BASE
+    for label in LABELS:
+        value /= BASE
+        if value < BASE:
+            return f"{value:.3f} {label}"
+    return f"{value:.3f} {LABELS[-1]}"
+
+# Convert an rsync progress rate like "97.00MB/s" or "1.05GB/s" into MB/s, None if unparseable.
+def rate_to_mbps(rate):
+    match = re.match(r'^([\d.]+)\s*([kMGT]?)B/s$', (rate or '').strip())
+    if not match:
+        return None
+    SCALES = { '': 0.000001, 'k': 0.001, 'M': 1, 'G': 1000, 'T': 1000000 }
+    return float(match.group(1)) * SCALES[match.group(2)]
+
+# Split an rsync destination into (host, path).  Host is None for a local destination.
+def transfer_destination(dest):
+    dest = (dest or '').strip()
+    match = re.match(r'^rsync://(?:[^@/]+@)?([^:/]+)(?::\d+)?(/.*)?$', dest)
+    if match:
+        return match.group(1), match.group(2) or '/'
+    match = re.match(r'^(?:[^@/:]+@)?([^:/]+)::?(.*)$', dest)
+    if match:
+        return match.group(1), match.group(2)
+    return None, dest
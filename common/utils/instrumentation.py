@@ -0,0 +1,248 @@
+#
+# Timings of requests, database queries, subprocesses and outbound HTTP calls for the API and WebUI,
+# held in a metrics registry per process.  With PROFILING_ENABLED set, a request with ?profile=1
+# is also sampled, writing its stacks in the folded format read by flamegraph.pl and speedscope.
+#
+
+import datetime
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+import requests
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from common.utils import caches, metrics
+
+PROFILES_DIR = '/root/.chia/machinaris/logs/profiles'
+
+# Seconds between stack samples of a profiled request, and the longest a profile runs
+PROFILE_INTERVAL_SECS = 0.005
+PROFILE_MAX_SECS = 60
+
+# Requests slower than this are logged with their query counts
+SLOW_REQUEST_SECS = 5
+
+QUERY_BUCKETS = [ 0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000 ]
+
+registry = metrics.Registry()
+
+request_seconds = registry.histogram('machinaris_http_request_seconds',
+    "Time to handle each request, by endpoint.", ('endpoint', 'method', 'status'))
+request_queries = registry.histogram('machinaris_http_request_db_queries',
+    "Database queries run by each request, by endpoint.", ('endpoint',), buckets=QUERY_BUCKETS)
+request_db_seconds = registry.histogram('machinaris_http_request_db_seconds',
+    "Time spent in database queries by each request, by endpoint.", ('endpoint',))
+query_seconds = registry.histogram('machinaris_db_query_seconds',
+    "Time taken by each database query, including those of scheduled jobs.", ())
+subprocess_seconds = registry.histogram('machinaris_subprocess_seconds',
+    "Time from spawning each subprocess until it was waited on, by command.", ('command',))
+http_client_seconds = registry.histogram('machinaris_http_client_seconds',
+    "Time taken by outbound HTTP requests, by host.", ('host', 'method', 'status'))
+
+SUBCOMMAND = re.compile(r'^[a-z][a-z_-]*$')
+
+installed = { 'hooks': False }
+
+def command_name(args):
+    # Executable and subcommand only, like 'chia farm', so paths and ids don't become labels
+    words = args.split() if isinstance(args, (str, bytes)) else [ str(arg) for arg in args ]
+    if not words:
+        return 'unknown'
+    words = [ word.decode() if isinstance(word, bytes) else word for word in words[:2] ]
+    name = os.path.basename(words[0])
+    if len(words) > 1 and SUBCOMMAND.match(words[1]):
+        name += ' ' + words[1]
+    return name
+
+original_popen = subprocess.Popen
+
+class TimedPopen(subprocess.Popen):
+    """Popen which records how long each subprocess ran, once something waits on it."""
+
+    def __init__(self, args, *popen_args, **kwargs):
+        self._started_at = time.perf_counter()
+        self._command = command_name(args)
+        self._recorded = False
+        super().__init__(args, *popen_args, **kwargs)
+
+    def wait(self, timeout=None):
+        returncode = super().wait(timeout=timeout)
+        if not self._recorded:
+            self._recorded = True
+            subprocess_seconds.observe(self._command, value=time.perf_counter() - self._started_at)
+        return returncode
+
+original_send = requests.Session.send
+
+def timed_send(session, prepared, **kwargs):
+    started_at = time.perf_counter()
+    status = 'error'
+    try:
+        response = original_send(session, prepared, **kwargs)
+        status = str(response.status_code)
+        return response
+    finally:
+        host = urllib.parse.urlsplit(prepared.url).netloc
+        http_client_seconds.observe(host, prepared.method, status, value=time.perf_counter() - started_at)
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('instrumentation_started', []).append(time.perf_counter())
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('instrumentation_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    query_seconds.observe(value=elapsed)
+    if has_request_context() and 'instrumentation' in g:
+        g.instrumentation['queries'] += 1
+        g.instrumentation['db_secs'] += elapsed
+
+def handle_error(context):
+    # A failed query never reaches after_cursor_execute, so drop its start time here
+    started = context.connection.info.get('instrumentation_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+def install_hooks():
+    """Times every subprocess, outbound HTTP request and database query of this process.  Call before importing modules that use Popen."""
+    if installed['hooks']:
+        return
+    installed['hooks'] = True
+    subprocess.Popen = TimedPopen
+    requests.Session.send = timed_send
+    event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(Engine, 'handle_error', handle_error)
+
+def uninstall_hooks():
+    """Restores what install_hooks replaced, for tests."""
+    if not installed['hooks']:
+        return
+    installed['hooks'] = False
+    subprocess.Popen = original_popen
+    requests.Session.send = original_send
+    event.remove(Engine, 'before_cursor_execute', before_cursor_execute)
+    event.remove(Engine, 'after_cursor_execute', after_cursor_execute)
+    event.remove(Engine, 'handle_error', handle_error)
+
+class StackSampler(threading.Thread):
+    """Samples the stack of one thread, counting each distinct stack as a line of folded output."""
+
+    def __init__(self, thread_id, interval_secs=PROFILE_INTERVAL_SECS, max_secs=PROFILE_MAX_SECS):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval_secs = interval_secs
+        self.max_secs = max_secs
+        self.stacks = {}
+        self.stopped = threading.Event()
+
+    def run(self):
+        stop_at = time.monotonic() + self.max_secs
+        while not self.stopped.wait(self.interval_secs) and time.monotonic() < stop_at:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame:
+                stack.append("{0} ({1}:{2})".format(frame.f_code.co_name,
+                    os.path.basename(frame.f_code.co_filename), frame.f_code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                folded = ';'.join(reversed(stack))
+                self.stacks[folded] = self.stacks.get(folded, 0) + 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def folded(self):
+        return ''.join([ "{0} {1}\n".format(stack, count) for stack, count in sorted(self.stacks.items()) ])
+
+def endpoint_name():
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+def start_request(profiling):
+    g.instrumentation = { 'started_at': time.perf_counter(), 'queries': 0, 'db_secs': 0, 'sampler': None }
+    if profiling and request.args.get('profile') == '1':
+        g.instrumentation['sampler'] = StackSampler(threading.get_ident())
+        g.instrumentation['sampler'].start()
+
+def write_profile(app_name, sampler):
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    filename = "{0}-{1}-{2}.folded".format(app_name, datetime.datetime.now().strftime("%Y%m%d-%H%M%S"),
+        re.sub(r'[^\w]+', '_', endpoint_name()).strip('_') or 'root')
+    with open(os.path.join(PROFILES_DIR, filename), 'w') as f:
+        f.write(sampler.folded())
+    return filename
+
+def record_response(app, app_name, response):
+    if not 'instrumentation' in g:
+        return response
+    state = g.instrumentation
+    state['status'] = response.status_code
+    if state['sampler']:
+        state['sampler'].stop()
+        try:
+            response.headers['X-Profile-File'] = write_profile(app_name, state['sampler'])
+        except Exception as ex:
+            app.logger.error("Failed to write request profile because {0}".format(str(ex)))
+        state['sampler'] = None
+    return response
+
+def finish_request(app, app_name, exception=None):
+    # At teardown, so requests failing with an unhandled exception are recorded too
+    if not 'instrumentation' in g:
+        return
+    state = g.pop('instrumentation')
+    elapsed = time.perf_counter() - state['started_at']
+    endpoint = endpoint_name()
+    status = 500 if exception is not None else state.get('status', 500)
+    request_seconds.observe(endpoint, request.method, status, value=elapsed)
+    request_queries.observe(endpoint, value=state['queries'])
+    request_db_seconds.observe(endpoint, value=state['db_secs'])
+    if elapsed > SLOW_REQUEST_SECS:
+        app.logger.info("Slow request: {0} {1} took {2} seconds, with {3} queries taking {4} seconds.".format(
+            request.method, request.full_path, round(elapsed, 2), state['queries'], round(state['db_secs'], 2)))
+    if state['sampler']:  # No response to name the profile in, so only logged
+        state['sampler'].stop()
+        try:
+            app.logger.info("Wrote profile of failed request to {0}".format(write_profile(app_name, state['sampler'])))
+        except Exception as ex:
+            app.logger.error("Failed to write request profile because {0}".format(str(ex)))
+
+def instrument(app, app_name):
+    """Records the timings of each request to a Flask app, and profiles those asking for it if the app config allows."""
+    install_hooks()
+    @app.before_request
+    def before_request():
+        start_request(app.config.get('PROFILING_ENABLED', False))
+    @app.after_request
+    def after_request(response):
+        return record_response(app, app_name, response)
+    @app.teardown_request
+    def teardown_request(exception):
+        finish_request(app, app_name, exception)
+
+def snapshot_file(process):
+    return caches.CACHE_DIR + '/instrumentation_{0}.json'.format(process)
+
+def save_snapshot(process):
+    """For processes without an endpoint of their own, like the API's scheduler."""
+    caches.get_cache(snapshot_file(process)).save(registry.snapshot())
+
+def openmetrics(process, other_processes=()):
+    snapshots = [ metrics.with_label(registry.snapshot(), 'process', process) ]
+    for other in other_processes:
+        try:
+            snapshots.append(metrics.with_label(caches.get_cache(snapshot_file(other)).load(), 'process', other))
+        except Exception as ex:
+            logging.error("Failed to load {0} instrumentation because {1}".format(other, str(ex)))
+    return metrics.render(metrics.merge(*snapshots))
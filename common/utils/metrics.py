@@ -0,0 +1,198 @@
+#
+# In-memory registry of counters, gauges and histograms, rendered in the OpenMetrics text format.
+# Values are updated where data is received, so a scrape only formats what is already held.
+#
+
+import bisect
+import math
+import threading
+
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Seconds, suitable for most request and job timings
+DEFAULT_BUCKETS = [ 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300 ]
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(names, values, extra=None):
+    pairs = [ '{0}="{1}"'.format(name, escape_label(value)) for name, value in zip(names, values) ]
+    if extra:
+        pairs.append('{0}="{1}"'.format(extra[0], escape_label(extra[1])))
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+class Metric:
+    """
+    One metric family, holding a value per set of label values.  Label values are
+    passed positionally in the order of label_names given when it was registered.
+    """
+    type = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.label_names):
+            raise ValueError("Metric {0} expects labels {1}, got {2}".format(self.name, self.label_names, labels))
+        return tuple(str(label) for label in labels)
+
+    def remove(self, *labels):
+        with self.lock:
+            self.values.pop(self._key(labels), None)
+
+    def clear(self):
+        with self.lock:
+            self.values = {}
+
+    def snapshot(self):
+        with self.lock:
+            return { 'type': self.type, 'help': self.documentation, 'labels': list(self.label_names),
+                'values': [ [list(key), value] for key, value in self.values.items() ] }
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        if amount < 0:
+            raise ValueError("Counter {0} can only increase.".format(self.name))
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def set(self, *labels, value):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def replace(self, values, prefix=()):
+        # Swap in a complete set of label values to value, dropping any others which start with prefix
+        values = { self._key(labels): value for labels, value in values.items() }
+        prefix = tuple(str(label) for label in prefix)
+        with self.lock:
+            kept = { key: value for key, value in self.values.items() if key[:len(prefix)] != prefix }
+            kept.update(values)
+            self.values = kept
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = sorted(buckets)
+
+    def observe(self, *labels, value):
+        key = self._key(labels)
+        with self.lock:
+            if not key in self.values:
+                self.values[key] = { 'counts': [0] * (len(self.buckets) + 1), 'sum': 0, 'count': 0 }
+            state = self.values[key]
+            state['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            values = [ [list(key), dict(state, counts=list(state['counts']))] for key, state in self.values.items() ]
+        return { 'type': self.type, 'help': self.documentation, 'labels': list(self.label_names),
+            'buckets': self.buckets, 'values': values }
+
+class Registry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self.lock:
+            if not name in self.metrics:
+                self.metrics[name] = cls(name, *args, **kwargs)
+            return self.metrics[name]
+
+    def counter(self, name, documentation, label_names=()):
+        return self._register(Counter, name, documentation, label_names)
+
+    def gauge(self, name, documentation, label_names=()):
+        return self._register(Gauge, name, documentation, label_names)
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, label_names, buckets=buckets)
+
+    def snapshot(self):
+        """Returns all metric families as JSON-serializable dicts, to be rendered by another process."""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return { metric.name: metric.snapshot() for metric in metrics }
+
+def with_label(snapshot, name, value):
+    """Returns a copy of the snapshot with one more label on every series, like the process it came from."""
+    labelled = {}
+    for family_name, family in (snapshot or {}).items():
+        labelled[family_name] = dict(family, labels=family['labels'] + [name],
+            values=[ [labels + [value], series] for labels, series in family['values'] ])
+    return labelled
+
+def merge(*snapshots):
+    """Combines snapshots whose series are distinct, such as after with_label, into one."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, family in (snapshot or {}).items():
+            if name in merged:
+                merged[name] = dict(merged[name], values=merged[name]['values'] + family['values'])
+            else:
+                merged[name] = family
+    return merged
+
+def render_family(name, family):
+    lines = [
+        "# TYPE {0} {1}".format(name, family['type']),
+        "# HELP {0} {1}".format(name, family['help']),
+    ]
+    for labels, value in sorted(family['values'], key=lambda item: item[0]):
+        if family['type'] == 'counter':
+            lines.append("{0}_total{1} {2}".format(name, format_labels(family['labels'], labels), format_value(value)))
+        elif family['type'] == 'gauge':
+            lines.append("{0}{1} {2}".format(name, format_labels(family['labels'], labels), format_value(value)))
+        elif family['type'] == 'histogram':
+            cumulative = 0
+            for upper, count in zip(family['buckets'] + [math.inf], value['counts']):
+                cumulative += count
+                lines.append("{0}_bucket{1} {2}".format(name,
+                    format_labels(family['labels'], labels, ('le', format_value(float(upper)))), cumulative))
+            lines.append("{0}_count{1} {2}".format(name, format_labels(family['labels'], labels), value['count']))
+            lines.append("{0}_sum{1} {2}".format(name, format_labels(family['labels'], labels), format_value(value['sum'])))
+    return lines
+
+def render(*snapshots):
+    """
+    Renders registry snapshots as OpenMetrics text.  A family present in more than one snapshot,
+    like plots recorded by both the API worker and the scheduler, is rendered with the series of
+    all of them.  Where the same series is in more than one, the first snapshot's value is used.
+    """
+    families = {}
+    for snapshot in snapshots:
+        for name, family in (snapshot or {}).items():
+            if not name in families:
+                families[name] = dict(family, values=list(family['values']))
+                continue
+            known = set([ tuple(labels) for labels, value in families[name]['values'] ])
+            families[name]['values'].extend([ [labels, value] for labels, value in family['values']
+                if not tuple(labels) in known ])
+    lines = []
+    for name in sorted(families.keys()):
+        lines.extend(render_family(name, families[name]))
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
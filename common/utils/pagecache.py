@@ -0,0 +1,171 @@
+#
+# Cache of computed page view-models for the WebUI dashboards.
+# The API touches a stamp file per page when tables shown on that page are committed,
+# and the WebUI serves the last view-model while rebuilding it in the background.
+#
+
+import logging
+import os
+import pathlib
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from common.utils import caches
+
+PAGE_STAMPS_DIR = caches.CACHE_DIR + '/pages'
+
+FARM_STAT_TABLES = [
+    'stat_plot_count', 'stat_plots_size', 'stat_total_coins', 'stat_netspace_size', 'stat_time_to_win',
+    'stat_effort', 'stat_farmed_blocks', 'stat_wallet_balances', 'stat_total_balance',
+]
+
+PAGE_TABLES = {
+    'index': set(['farms', 'workers', 'plottings', 'challenges', 'partials', 'wallets', 'cold_wallets',
+        'cold_wallet_transactions', 'pools', 'blockchains'] + FARM_STAT_TABLES),
+    'summary': set(['farms', 'workers', 'wallets', 'cold_wallets', 'cold_wallet_transactions', 'blockchains',
+        'pools', 'plots', 'challenges'] + FARM_STAT_TABLES),
+}
+
+def stamp_file(page):
+    return os.path.join(PAGE_STAMPS_DIR, page + '.stamp')
+
+def mark_tables_changed(tables):
+    for page, page_tables in PAGE_TABLES.items():
+        if page_tables.isdisjoint(tables):
+            continue
+        try:
+            os.makedirs(PAGE_STAMPS_DIR, exist_ok=True)
+            pathlib.Path(stamp_file(page)).touch()
+        except Exception as ex:
+            logging.error("Failed to mark {0} page as changed because {1}".format(page, str(ex)))
+
+def page_changed_at(page):
+    try:
+        return os.stat(stamp_file(page)).st_mtime
+    except FileNotFoundError:
+        return 0
+
+def _changed_tables(session):
+    return session.info.setdefault('pagecache_changed_tables', set())
+
+def _after_flush(session, flush_context):
+    tables = _changed_tables(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, '__tablename__', None)
+        if table:
+            tables.add(table)
+
+def _do_orm_execute(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        tables = _changed_tables(orm_execute_state.session)
+        for mapper in orm_execute_state.all_mappers:
+            tables.add(mapper.local_table.name)
+
+def _after_commit(session):
+    tables = session.info.pop('pagecache_changed_tables', None)
+    if tables:
+        mark_tables_changed(tables)
+
+def _after_rollback(session):
+    session.info.pop('pagecache_changed_tables', None)
+
+def track_table_changes():
+    """Called once by the API, so commits to any session mark the affected pages as changed."""
+    event.listen(Session, 'after_flush', _after_flush)
+    event.listen(Session, 'do_orm_execute', _do_orm_execute)
+    event.listen(Session, 'after_commit', _after_commit)
+    event.listen(Session, 'after_rollback', _after_rollback)
+
+class PageCache:
+    """
+    Holds view-models keyed by (page, lang, blockchain).  A view-model is stale once its
+    page stamp is newer than when it was built, or after max_age_secs.  As farmers and harvesters
+    commit challenges and workers every status cycle, a stamp only counts once the view-model is
+    min_rebuild_secs old.  Stale entries are still returned, while one background thread per key
+    rebuilds them.
+    """
+
+    def __init__(self, max_age_secs, min_rebuild_secs=30, max_entries=64):
+        self.max_age_secs = max_age_secs
+        self.min_rebuild_secs = min_rebuild_secs
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.key_locks = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self.errors = 0
+
+    def _key_lock(self, key):
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    def _build(self, key, build):
+        started_at = time.time()
+        model = build()
+        if model is None:  # Page failed to load, so try again on next request
+            return model
+        with self.lock:
+            self.entries[key] = { 'model': model, 'built_at': started_at, 'refreshing': False }
+            while len(self.entries) > self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+        return model
+
+    def _refresh(self, key, build):
+        try:
+            with self._key_lock(key):
+                self._build(key, build)
+            self.rebuilds += 1
+        except Exception as ex:
+            self.errors += 1
+            logging.error("Failed to rebuild {0} page because {1}".format(key, str(ex)))
+        finally:  # Allow another refresh if this one didn't replace the entry
+            with self.lock:
+                if key in self.entries:
+                    self.entries[key]['refreshing'] = False
+
+    def _is_stale(self, page, entry):
+        age_secs = time.time() - entry['built_at']
+        if age_secs > self.max_age_secs:
+            return True
+        return age_secs > self.min_rebuild_secs and entry['built_at'] < page_changed_at(page)
+
+    def get(self, page, key, build):
+        key = (page,) + tuple(key)
+        entry = self.entries.get(key)
+        if entry is None:
+            with self._key_lock(key):  # Only one request builds a missing entry, others wait for it
+                entry = self.entries.get(key)
+                if entry is None:
+                    self.misses += 1
+                    return self._build(key, build)
+        if not self._is_stale(page, entry):
+            self.hits += 1
+            return entry['model']
+        self.stale_hits += 1
+        with self.lock:
+            start_refresh = not entry['refreshing']
+            entry['refreshing'] = True
+        if start_refresh:
+            threading.Thread(target=self._refresh, args=(key, build), daemon=True).start()
+        return entry['model']
+
+    def invalidate(self, page):
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == page]:
+                del self.entries[key]
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'rebuilds': self.rebuilds,
+            'errors': self.errors,
+        }
@@ -0,0 +1,140 @@
+#
+# Parses plotting job logs of the chia, madmax, and bladebit plotters in-process,
+# rather than spawning `plotman analyze` for each plot.
+#
+
+import logging
+import os
+import re
+
+PLOT_ID = re.compile(r'\b([0-9a-f]{64})\b')
+PLOT_K = re.compile(r'plot-k(\d+)-')
+
+CHIA = {
+    'k': re.compile(r'^Plot size is: (\d+)'),
+    'tmp_dirs': re.compile(r'^Starting plotting progress into temporary dirs: (\S+) and (\S+)'),
+    'dst_dir': re.compile(r'^Renamed final file from ".+" to "(.+)/[^/]+"'),
+    'phase': re.compile(r'^Time for phase (\d) = ([\d.]+) seconds'),
+    'total': re.compile(r'^Total time = ([\d.]+) seconds'),
+    'copy': re.compile(r'^Copy time = ([\d.]+) seconds'),
+}
+
+MADMAX = {
+    'k': re.compile(r'^Multi-threaded pipelined Chia k(\d+) plotter'),
+    'tmp_dirs': re.compile(r'^Working Directory(?: 2)?:\s+(\S+)'),
+    'dst_dir': re.compile(r'^Final Directory:\s+(\S+)'),
+    'phase': re.compile(r'^Phase (\d) took ([\d.]+) sec'),
+    'total': re.compile(r'^Total plot creation time was ([\d.]+) sec'),
+    'copy': re.compile(r'^Copy to .+ finished, took ([\d.]+) sec'),
+}
+
+BLADEBIT = {
+    'k': re.compile(r'^\s*K\s*:\s*(\d+)'),
+    'tmp_dirs': re.compile(r'^\s*Temp[12] path\s*:\s*(\S+)'),
+    'dst_dir': re.compile(r'^\s*Output path\s*:\s*(\S+)'),
+    'phase': re.compile(r'^Finished Phase (\d) in ([\d.]+) seconds'),
+    'total': re.compile(r'^Finished plotting in ([\d.]+) seconds'),
+    'copy': re.compile(r'^Finished copying plot in ([\d.]+) seconds'),
+}
+
+# First line that identifies the plotter which wrote the log
+PLOTTER_MARKERS = [
+    ('madmax', re.compile(r'^Multi-threaded pipelined Chia')),
+    ('bladebit', re.compile(r'^Bladebit', re.IGNORECASE)),
+    ('chia', re.compile(r'^Starting plotting progress into temporary dirs')),
+    ('madmax', MADMAX['phase']),
+    ('bladebit', BLADEBIT['phase']),
+    ('chia', CHIA['phase']),
+]
+
+PATTERNS = { 'chia': CHIA, 'madmax': MADMAX, 'bladebit': BLADEBIT }
+
+def detect_plotter(lines):
+    for line in lines:
+        for plotter, marker in PLOTTER_MARKERS:
+            if marker.match(line):
+                return plotter
+    return None
+
+def parse(lines, plotter=None):
+    """
+    Returns a dict of the plot id, plotter, k size, temporary and destination directories,
+    seconds per phase, total seconds and copy seconds found in the lines of one job log.
+    Values not found in the log are left as None.
+    """
+    lines = list(lines)
+    plotter = plotter or detect_plotter(lines)
+    record = {
+        'plot_id': None,
+        'plotter': plotter,
+        'k': None,
+        'tmp_dirs': [],
+        'dst_dir': None,
+        'phase_seconds': {},
+        'total_seconds': None,
+        'copy_seconds': None,
+    }
+    patterns = PATTERNS.get(plotter)
+    for line in lines:
+        if not record['plot_id']:
+            match = PLOT_ID.search(line)
+            if match:
+                record['plot_id'] = match.group(1)
+        if not record['k']:
+            match = PLOT_K.search(line)
+            if match:
+                record['k'] = int(match.group(1))
+        if not patterns:
+            continue
+        match = patterns['phase'].match(line)
+        if match:
+            record['phase_seconds'][match.group(1)] = float(match.group(2))
+            continue
+        match = patterns['total'].match(line)
+        if match:
+            record['total_seconds'] = float(match.group(1))
+            continue
+        match = patterns['copy'].match(line)
+        if match:
+            record['copy_seconds'] = float(match.group(1))
+            continue
+        match = patterns['tmp_dirs'].match(line)
+        if match:
+            record['tmp_dirs'].extend([ tmp_dir for tmp_dir in match.groups() if not tmp_dir in record['tmp_dirs'] ])
+            continue
+        match = patterns['dst_dir'].match(line)
+        if match:
+            record['dst_dir'] = match.group(1)
+            continue
+        match = patterns['k'].match(line)
+        if match:
+            record['k'] = int(match.group(1))
+    if record['total_seconds'] is None and len(record['phase_seconds']) == 4:
+        record['total_seconds'] = round(sum(record['phase_seconds'].values()), 3)
+    return record
+
+def analyze_file(log_path):
+    try:
+        with open(log_path, errors='replace') as f:
+            record = parse(line.rstrip('\n') for line in f)
+        record['log_file'] = os.path.basename(log_path)
+        return record
+    except Exception as ex:
+        logging.error("Failed to analyze plotting job log {0} because {1}".format(log_path, str(ex)))
+    return None
+
+def format_text(record):
+    # Human readable summary, as stored in the analyze logs shown on the Plotting page
+    lines = [
+        "Plot ID: {0}".format(record['plot_id']),
+        "Plotter: {0} (k{1})".format(record['plotter'], record['k']),
+        "Temporary: {0}".format(', '.join(record['tmp_dirs'])),
+        "Destination: {0}".format(record['dst_dir']),
+    ]
+    for phase, seconds in sorted(record['phase_seconds'].items()):
+        lines.append("Phase {0}: {1} seconds".format(phase, seconds))
+    if record['total_seconds'] is not None:
+        lines.append("Total: {0} seconds ({1} minutes)".format(record['total_seconds'], round(record['total_seconds'] / 60, 1)))
+    if record['copy_seconds'] is not None:
+        lines.append("Copy: {0} seconds".format(record['copy_seconds']))
+    return '\n'.join(lines) + '\n'
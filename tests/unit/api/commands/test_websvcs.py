@@ -0,0 +1,112 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(1, os.path.join(sys.path[0], '../../../..'))
+from benchmarks import farm as benchmark_farm
+
+ADDRESS = 'xch1testcoldwallet'
+PAGE_SIZE = 2
+
+class FakeResponse:
+
+    def __init__(self, data):
+        self.content = json.dumps(data).encode('utf-8')
+
+class FakeAllTheBlocksSession:
+    """Answers the balance and paged coin requests of AllTheBlocks for one address, newest coin first."""
+
+    def __init__(self, coins):
+        self.coins = coins
+        self.pages_requested = 0
+
+    def get(self, url, params=None, timeout=None):
+        params = params or {}
+        if url.endswith("/address/{0}".format(ADDRESS)) and not '/coin/' in url:
+            return FakeResponse({ 'balance': sum([ coin['amount'] for coin in self.coins ]) })
+        self.pages_requested += 1
+        number, size = params.get('pageNumber', 1), params.get('pageSize', PAGE_SIZE)
+        return FakeResponse({
+            'number': number,
+            'size': size,
+            'totalPages': max((len(self.coins) + size - 1) // size, 1),
+            'content': self.coins[(number - 1) * size:number * size],
+        })
+
+def coin(i):
+    return { 'name': "0x{0:064x}".format(i), 'coinType': 'FARMER_REWARD', 'amount': 250000000000, 'timestamp': 1675000000 + i }
+
+class TestRefreshColdWallets(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.work_dir = tempfile.mkdtemp(prefix='machinaris-tests-')
+        os.environ['API_SETTINGS_FILE'] = benchmark_farm.write_settings(cls.work_dir)
+        try:
+            from api import app, db
+            from api.commands import websvcs
+        except Exception as ex:  # Only in the container image, with the blockchain configs and chia installed
+            shutil.rmtree(cls.work_dir, ignore_errors=True)
+            raise unittest.SkipTest("API app unavailable: {0}".format(str(ex)))
+        cls.app, cls.db, cls.websvcs = app, db, websvcs
+        with app.app_context():
+            db.create_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.work_dir, ignore_errors=True)
+
+    def setUp(self):
+        from common.models import wallets as w
+        self.w = w
+        self.atb_client = self.websvcs.atb_client
+        self.session = FakeAllTheBlocksSession([ coin(i) for i in range(5, 0, -1) ])
+        self.websvcs.atb_client = self.websvcs.AllTheBlocksClient('http://atb.test', 0, session=self.session)
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        self.db.session.query(self.w.ColdWalletTransaction).delete()
+        self.db.session.query(self.w.ColdWallet).delete()
+        self.db.session.commit()
+        self.context.pop()
+        self.websvcs.atb_client = self.atb_client
+
+    def refresh(self):
+        self.session.pages_requested = 0
+        self.websvcs.refresh_cold_wallets({ 'chia': [ ADDRESS ] })
+        return self.db.session.query(self.w.ColdWallet).filter(self.w.ColdWallet.address == ADDRESS).one()
+
+    def stored_coin_ids(self):
+        return set([ row.coin_id for row in self.db.session.query(self.w.ColdWalletTransaction.coin_id).all() ])
+
+    def test_first_refresh_pages_all(self):
+        wallet = self.refresh()
+        self.assertEqual(self.session.pages_requested, 3)
+        self.assertEqual(self.stored_coin_ids(), set([ coin(i)['name'] for i in range(1, 6) ]))
+        self.assertEqual(wallet.last_coin_id, coin(5)['name'])
+        self.assertEqual(wallet.farmed_balance, 5 * 0.25)
+
+    def test_stops_at_last_coin(self):
+        self.refresh()
+        self.session.coins.insert(0, coin(6))
+        wallet = self.refresh()
+        self.assertEqual(self.session.pages_requested, 1)
+        self.assertEqual(len(self.stored_coin_ids()), 6)
+        self.assertEqual(wallet.last_coin_id, coin(6)['name'])
+        self.assertEqual(wallet.farmed_balance, 6 * 0.25)
+
+    def test_last_coin_no_longer_listed(self):
+        self.refresh()
+        self.session.coins.pop(0)
+        self.session.coins.insert(0, coin(7))
+        wallet = self.refresh()
+        self.assertEqual(self.session.pages_requested, 3)
+        self.assertEqual(len(self.stored_coin_ids()), 6)
+        self.assertEqual(wallet.last_coin_id, coin(7)['name'])
+
+if __name__ == '__main__':
+    unittest.main()
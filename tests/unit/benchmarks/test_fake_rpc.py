@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import unittest
+
+import requests
+
+sys.path.insert(1, os.path.join(sys.path[0], '../../..'))
+from benchmarks import fake_rpc, generators
+
+class TestFakeRpc(unittest.TestCase):
+
+    def setUp(self):
+        self.farm = generators.Farm(workers=2, plots=1000, transactions=120, peers=5)
+        self.fake = fake_rpc.FakeRpc(self.farm).start()
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def post(self, service, endpoint, request={}):
+        response = requests.post("{0}/{1}".format(self.fake.url(service), endpoint), json=request, timeout=10)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_farmer(self):
+        harvesters = self.post('farmer', 'get_harvesters')['harvesters']
+        self.assertEqual(sum([ len(harvester['plots']) for harvester in harvesters ]), 1000)
+        summaries = self.post('farmer', 'get_harvesters_summary')['harvesters']
+        self.assertEqual(sum([ summary['plots'] for summary in summaries ]), 1000)
+        self.assertEqual(sum([ summary['total_plot_size'] for summary in summaries ]),
+            sum([ plot['file_size'] for harvester in harvesters for plot in harvester['plots'] ]))
+        node_id = harvesters[0]['connection']['node_id']
+        invalid = self.post('farmer', 'get_harvester_plots_invalid', { 'node_id': node_id, 'page': 0, 'page_size': 1 })
+        self.assertEqual(invalid['total_count'], 2)
+        self.assertEqual(invalid['page_count'], 2)
+        self.assertEqual(len(invalid['plots']), 1)
+        missing = self.post('farmer', 'get_harvester_plots_keys_missing', { 'node_id': node_id[2:], 'page': 0, 'page_size': 1000 })
+        self.assertEqual(missing['total_count'], 1)
+        self.assertFalse(self.post('farmer', 'get_harvester_plots_duplicates', { 'node_id': '0x00' })['success'])
+
+    def test_full_node(self):
+        state = self.post('full_node', 'get_blockchain_state')['blockchain_state']
+        self.assertTrue(state['sync']['synced'])
+        self.assertIsNone(state['peak']['timestamp'])
+        previous = self.post('full_node', 'get_block_record', { 'header_hash': state['peak']['prev_hash'][2:] })['block_record']
+        self.assertEqual(previous['height'], state['peak']['height'] - 1)
+        self.assertIsNotNone(previous['timestamp'])
+        self.assertEqual(len(self.post('full_node', 'get_connections')['connections']), 5)
+
+    def test_wallet(self):
+        self.assertEqual(self.post('wallet', 'get_transaction_count', { 'wallet_id': 1 })['count'], 120)
+        newest = self.post('wallet', 'get_transactions', { 'wallet_id': 1, 'start': 0, 'end': 120, 'reverse': True })['transactions']
+        oldest = self.post('wallet', 'get_transactions', { 'wallet_id': 1, 'start': 0, 'end': 10 })['transactions']
+        self.assertEqual(len(newest), 120)
+        self.assertEqual(oldest[0], newest[-1])
+        self.assertGreater(self.post('wallet', 'get_wallet_balance', { 'wallet_id': '1' })['wallet_balance']['spendable_balance'], 0)
+        self.assertFalse(self.post('wallet', 'get_harvesters')['success'])
+        self.assertEqual(self.fake.requests()['wallet'], 5)
+
+    def test_latency(self):
+        self.fake.stop()
+        self.fake = fake_rpc.FakeRpc(self.farm, latency_secs=0.1).start()
+        started = time.perf_counter()
+        self.post('wallet', 'get_height_info')
+        self.assertGreaterEqual(time.perf_counter() - started, 0.1)
+
+if __name__ == '__main__':
+    unittest.main()
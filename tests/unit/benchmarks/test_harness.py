@@ -0,0 +1,55 @@
+import copy
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(1, os.path.join(sys.path[0], '../../..'))
+from benchmarks import generators, harness
+
+class TestGenerators(unittest.TestCase):
+
+    def test_farm_is_reproducible(self):
+        farm = generators.Farm(workers=3, plots=100, days=1, challenges=30)
+        plots = generators.rpc_plots(generators.harvesters(farm))
+        self.assertEqual(len(plots), 100)
+        self.assertEqual(plots, generators.rpc_plots(generators.harvesters(generators.Farm(workers=3, plots=100, days=1, challenges=30))))
+        self.assertEqual(sum([ len(p) for p in generators.plot_payloads(generators.harvesters(farm)).values() ]), 100)
+        challenges = generators.challenge_payloads(farm)
+        self.assertEqual(len(set([ challenge['unique_id'] for challenge in challenges ])), 30)
+        self.assertEqual(len(generators.disk_stats(farm)), 3 * 4 * 24 * 6)
+
+    def test_write_debug_log(self):
+        farm = generators.Farm(workers=1, plots=100)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'debug.log')
+            written = generators.write_debug_log(farm, path, 1)
+            self.assertEqual(os.path.getsize(path), written)
+            with open(path) as f:
+                lines = f.readlines()
+        self.assertTrue(any([ 'plots were eligible for farming' in line for line in lines ]))
+        self.assertTrue(any([ 'Submitting partial for' in line for line in lines ]))
+
+class TestHarness(unittest.TestCase):
+
+    def test_measure(self):
+        result = harness.measure(harness.Case('sum', lambda state: len(state), setup=lambda: list(range(1000)), iterations=2))
+        self.assertEqual(result['items'], 2000)
+        self.assertEqual(result['iterations'], 2)
+        self.assertIsNotNone(result['throughput_per_sec'])
+
+    def test_compare(self):
+        baseline = harness.report({ 'plots': 10 }, { 'case': { 'latency_secs': { 'p50': 1.0 },
+            'throughput_per_sec': 100, 'peak_alloc_mb': 10 } })
+        current = copy.deepcopy(baseline)
+        current['results']['case']['latency_secs']['p50'] = 1.2
+        self.assertEqual(harness.compare(current, baseline), [])
+        current['results']['case']['latency_secs']['p50'] = 1.5
+        current['results']['case']['throughput_per_sec'] = 60
+        current['results']['case']['peak_alloc_mb'] = 20
+        self.assertEqual(len(harness.compare(current, baseline)), 3)
+        current['params'] = { 'plots': 20 }
+        self.assertTrue(harness.compare(current, baseline)[0].startswith("Params differ"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(1, os.path.join(sys.path[0], '../../../..'))
+from common.utils import caches
+
+class TestJsonFileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'test_cache.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_file(self, data, mtime):
+        with open(self.path, 'w') as f:
+            json.dump(data, f)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_missing_file(self):
+        cache = caches.JsonFileCache(self.path)
+        self.assertEqual(cache.load(), {})
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_parsed_once(self):
+        self.write_file({'a': 1}, 1000)
+        cache = caches.JsonFileCache(self.path)
+        first = cache.load()
+        second = cache.load()
+        self.assertIs(first, second)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_reload_on_mtime_change(self):
+        self.write_file({'a': 1}, 1000)
+        cache = caches.JsonFileCache(self.path)
+        cache.load()
+        self.write_file({'a': 2}, 2000)
+        self.assertEqual(cache.get('a'), 2)
+        self.assertEqual(cache.stats()['misses'], 2)
+
+    def test_save_is_atomic_and_cached(self):
+        cache = caches.JsonFileCache(self.path)
+        cache.save({'a': 1})
+        self.assertEqual(os.listdir(self.tmpdir.name), ['test_cache.json'])
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {'a': 1})
+        self.assertEqual(cache.load(), {'a': 1})
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_typed_keys(self):
+        cache = caches.JsonFileCache(self.path, key_type=int)
+        cache.save({1: 'one'})
+        cache.invalidate()
+        self.assertEqual(cache.get('1'), 'one')
+
+    def test_eviction(self):
+        cache = caches.JsonFileCache(self.path, max_entries=2)
+        cache.save({'a': 1, 'b': 2, 'c': 3})
+        self.assertEqual(list(cache.load().keys()), ['b', 'c'])
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl(self):
+        self.write_file({'a': 1}, 1000)
+        cache = caches.JsonFileCache(self.path, ttl_secs=0)
+        cache.load()
+        cache.loaded_at -= 1
+        cache.load()
+        self.assertEqual(cache.stats()['misses'], 2)
+
+    def test_shared_per_path(self):
+        self.assertIs(caches.get_cache(self.path), caches.get_cache(self.path))
+        del caches.caches[self.path]
+
+if __name__ == '__main__':
+    unittest.main()
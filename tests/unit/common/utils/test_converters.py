@@ -71,3 +71,40 @@ class TestRoundBalance(unittest.TestCase):
         data = 2000000
         result = converters.round_balance(data)
         self.assertEqual(result, "2,000,000")
+
+class TestFormatBytes(unittest.TestCase):
+
+    def test_invalid(self):
+        self.assertEqual(converters.format_bytes(-1), "Invalid")
+        self.assertEqual(converters.format_bytes(1.5), "Invalid")
+
+    def test_mib(self):
+        self.assertEqual(converters.format_bytes(1024 * 1024), "1.000 MiB")
+
+    def test_tib(self):
+        data = 101 * 1024 * 1024 * 1024 * 1024
+        result = converters.format_bytes(data)
+        self.assertEqual(result, "101.000 TiB")
+
+    def test_round_trip(self):
+        data = 3 * 1024 * 1024 * 1024 * 1024 * 1024
+        result = converters.format_bytes(data)
+        self.assertEqual(converters.str_to_gibs(result), 3 * 1024 * 1024)
+
+class TestTransferRates(unittest.TestCase):
+
+    def test_rate_units(self):
+        self.assertEqual(converters.rate_to_mbps("97.00MB/s"), 97.0)
+        self.assertEqual(converters.rate_to_mbps("1.50GB/s"), 1500.0)
+        self.assertEqual(converters.rate_to_mbps("512.00kB/s"), 0.512)
+
+    def test_rate_invalid(self):
+        self.assertIsNone(converters.rate_to_mbps(""))
+        self.assertIsNone(converters.rate_to_mbps(None))
+        self.assertIsNone(converters.rate_to_mbps("0:16:51"))
+
+    def test_destinations(self):
+        self.assertEqual(converters.transfer_destination("rsync://chia@harvester1:12000/disk1/"), ("harvester1", "/disk1/"))
+        self.assertEqual(converters.transfer_destination("chia@harvester2:/plots3/"), ("harvester2", "/plots3/"))
+        self.assertEqual(converters.transfer_destination("harvester3::disk2/"), ("harvester3", "disk2/"))
+        self.assertEqual(converters.transfer_destination("/mnt/disk4/"), (None, "/mnt/disk4/"))
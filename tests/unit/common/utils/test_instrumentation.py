@@ -0,0 +1,76 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import sqlalchemy as sa
+from flask import Flask
+
+sys.path.insert(1, os.path.join(sys.path[0], '../../../..'))
+from common.utils import instrumentation
+
+class TestInstrumentation(unittest.TestCase):
+
+    def tearDown(self):
+        instrumentation.uninstall_hooks()  # So later tests see the original Popen, send, and no listeners
+
+    def test_command_name(self):
+        self.assertEqual(instrumentation.command_name('/chia-blockchain/venv/bin/chia farm summary'), 'chia farm')
+        self.assertEqual(instrumentation.command_name(['plotman', 'status', '--json']), 'plotman status')
+        self.assertEqual(instrumentation.command_name('smartctl -a /dev/sda'), 'smartctl')
+        self.assertEqual(instrumentation.command_name(''), 'unknown')
+
+    def test_stack_sampler(self):
+        def busy_work():
+            deadline = time.monotonic() + 0.2
+            while time.monotonic() < deadline:
+                pass
+        sampler = instrumentation.StackSampler(threading.get_ident(), interval_secs=0.001)
+        sampler.start()
+        busy_work()
+        sampler.stop()
+        folded = sampler.folded()
+        self.assertIn('busy_work (test_instrumentation.py:', folded)
+        for line in folded.splitlines():
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(int(count) > 0)
+
+    def request_counts(self, endpoint):
+        snapshot = instrumentation.request_seconds.snapshot()
+        return { labels[2]: series['count'] for labels, series in snapshot['values'] if labels[0] == endpoint }
+
+    def test_failed_request_recorded(self):
+        app = Flask('test_instrumentation')
+        app.config['PROFILING_ENABLED'] = True
+        app.config['PROPAGATE_EXCEPTIONS'] = True  # So after_request never runs
+        @app.route('/fail')
+        def fail():
+            raise Exception("Failed on purpose.")
+        instrumentation.instrument(app, 'test')
+        with tempfile.TemporaryDirectory() as profiles_dir:
+            profiles_dir_was = instrumentation.PROFILES_DIR
+            instrumentation.PROFILES_DIR = profiles_dir
+            try:
+                with self.assertRaises(Exception):
+                    app.test_client().get('/fail?profile=1')
+                self.assertEqual(len(os.listdir(profiles_dir)), 1)
+            finally:
+                instrumentation.PROFILES_DIR = profiles_dir_was
+        self.assertEqual(self.request_counts('/fail'), { '500': 1 })
+        samplers = [ thread for thread in threading.enumerate() if isinstance(thread, instrumentation.StackSampler) ]
+        self.assertEqual(samplers, [])
+
+    def test_failed_query_start_dropped(self):
+        instrumentation.install_hooks()
+        engine = sa.create_engine('sqlite://')
+        with engine.connect() as conn:
+            with self.assertRaises(sa.exc.OperationalError):
+                conn.execute(sa.text("SELECT * FROM no_such_table"))
+            self.assertEqual(conn.info.get('instrumentation_started'), [])
+            conn.execute(sa.text("SELECT 1"))
+            self.assertEqual(conn.info.get('instrumentation_started'), [])
+
+if __name__ == '__main__':
+    unittest.main()
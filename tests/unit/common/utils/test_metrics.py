@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(1, os.path.join(sys.path[0], '../../../..'))
+from common.utils import metrics
+
+class TestMetrics(unittest.TestCase):
+
+    def test_counter_and_gauge(self):
+        registry = metrics.Registry()
+        partials = registry.counter('machinaris_partials', "Partials.", ('blockchain', 'pool_url'))
+        partials.inc('chia', 'https://pool.example')
+        partials.inc('chia', 'https://pool.example', amount=2)
+        plots = registry.gauge('machinaris_plots', "Plots.", ('hostname', 'ksize'))
+        plots.set('harvester1', 32, value=10)
+        text = metrics.render(registry.snapshot())
+        self.assertIn('# TYPE machinaris_partials counter\n', text)
+        self.assertIn('machinaris_partials_total{blockchain="chia",pool_url="https://pool.example"} 3\n', text)
+        self.assertIn('machinaris_plots{hostname="harvester1",ksize="32"} 10\n', text)
+        self.assertTrue(text.endswith('# EOF\n'))
+        with self.assertRaises(ValueError):
+            partials.inc('chia')
+
+    def test_gauge_replace_prefix(self):
+        gauge = metrics.Registry().gauge('machinaris_plots', "Plots.", ('hostname', 'ksize'))
+        gauge.replace({ ('harvester1', 32): 10, ('harvester1', 33): 2, ('harvester2', 32): 5 })
+        gauge.replace({ ('harvester1', 32): 11 }, prefix=('harvester1',))
+        self.assertEqual(gauge.values, { ('harvester1', '32'): 11, ('harvester2', '32'): 5 })
+
+    def test_histogram(self):
+        registry = metrics.Registry()
+        lookup = registry.histogram('machinaris_lookup_seconds', "Lookups.", ('hostname',), buckets=[0.1, 1])
+        for value in [0.05, 0.1, 0.5, 2]:
+            lookup.observe('harvester1', value=value)
+        text = metrics.render(registry.snapshot())
+        self.assertIn('machinaris_lookup_seconds_bucket{hostname="harvester1",le="0.1"} 2\n', text)
+        self.assertIn('machinaris_lookup_seconds_bucket{hostname="harvester1",le="1"} 3\n', text)
+        self.assertIn('machinaris_lookup_seconds_bucket{hostname="harvester1",le="+Inf"} 4\n', text)
+        self.assertIn('machinaris_lookup_seconds_count{hostname="harvester1"} 4\n', text)
+        self.assertIn('machinaris_lookup_seconds_sum{hostname="harvester1"} 2.65\n', text)
+
+    def test_render_snapshot_from_json(self):
+        # As when another process saved its snapshot to a cache file
+        registry = metrics.Registry()
+        registry.histogram('machinaris_job_seconds', "Jobs.", ('job',)).observe('status "farm"', value=1.5)
+        snapshot = json.loads(json.dumps(registry.snapshot()))
+        self.assertEqual(metrics.render(registry.snapshot()), metrics.render(snapshot))
+        self.assertIn('job="status \\"farm\\""', metrics.render(snapshot))
+
+    def test_render_series_of_both_processes(self):
+        # Chia plots are synced by the scheduler process, chives plots sent to the request worker
+        labels = ('hostname', 'blockchain', 'ksize')
+        worker = metrics.Registry()
+        worker.gauge('machinaris_plots', "Plots.", labels).replace({ ('harvester1', 'chives', 29): 3 })
+        worker.gauge('machinaris_plots', "Plots.", labels).set('harvester1', 'chia', 32, value=1)
+        scheduler = metrics.Registry()
+        scheduler.gauge('machinaris_plots', "Plots.", labels).replace({ ('harvester1', 'chia', 32): 10, ('harvester2', 'chia', 32): 5 })
+        text = metrics.render(worker.snapshot(), json.loads(json.dumps(scheduler.snapshot())))
+        self.assertIn('machinaris_plots{hostname="harvester1",blockchain="chives",ksize="29"} 3\n', text)
+        self.assertIn('machinaris_plots{hostname="harvester2",blockchain="chia",ksize="32"} 5\n', text)
+        # Same series in both, first snapshot wins
+        self.assertIn('machinaris_plots{hostname="harvester1",blockchain="chia",ksize="32"} 1\n', text)
+        self.assertEqual(text.count('# TYPE machinaris_plots gauge'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
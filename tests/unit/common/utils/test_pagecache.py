@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from unittest import mock
+
+sys.path.insert(1, os.path.join(sys.path[0], '../../../..'))
+from common.utils import pagecache
+
+class TestPageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.stamps_dir = mock.patch.object(pagecache, 'PAGE_STAMPS_DIR', self.tmpdir.name)
+        self.stamps_dir.start()
+        self.builds = 0
+
+    def tearDown(self):
+        self.stamps_dir.stop()
+        self.tmpdir.cleanup()
+
+    def build(self):
+        self.builds += 1
+        return { 'build': self.builds }
+
+    def age(self, cache, secs):
+        for entry in cache.entries.values():
+            entry['built_at'] -= secs
+
+    def test_recent_entry_kept_despite_newer_stamp(self):
+        cache = pagecache.PageCache(max_age_secs=120, min_rebuild_secs=30)
+        self.assertEqual(cache.get('index', ('en',), self.build), { 'build': 1 })
+        pagecache.mark_tables_changed(['challenges'])
+        os.utime(pagecache.stamp_file('index'), (time.time() + 1, time.time() + 1))
+        self.assertEqual(cache.get('index', ('en',), self.build), { 'build': 1 })
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(self.builds, 1)
+
+    def test_rebuilt_once_stamp_newer_and_entry_old_enough(self):
+        cache = pagecache.PageCache(max_age_secs=120, min_rebuild_secs=30)
+        cache.get('summary', ('en',), self.build)
+        self.age(cache, 60)
+        self.assertEqual(cache.get('summary', ('en',), self.build), { 'build': 1 })
+        self.assertEqual(cache.stats()['hits'], 1)  # No stamp yet, so still fresh
+        pagecache.mark_tables_changed(['plots'])
+        self.assertEqual(cache.get('summary', ('en',), self.build), { 'build': 1 })  # Previous copy while rebuilding
+        deadline = time.time() + 5
+        while cache.stats()['rebuilds'] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(cache.get('summary', ('en',), self.build), { 'build': 2 })
+
+    def test_rebuilt_after_max_age(self):
+        cache = pagecache.PageCache(max_age_secs=120, min_rebuild_secs=30)
+        cache.get('index', ('en',), self.build)
+        self.age(cache, 121)
+        cache.get('index', ('en',), self.build)
+        self.assertEqual(cache.stats()['stale_hits'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
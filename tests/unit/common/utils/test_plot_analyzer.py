@@ -0,0 +1,105 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(1, os.path.join(sys.path[0], '../../../..'))
+from common.utils import plot_analyzer
+
+PLOT_ID = 'a8b4c2d6e0f1a3b5c7d9e1f3a5b7c9d1e3f5a7b9c1d3e5f7a9b1c3d5e7f9a1b3'
+
+CHIA_LOG = """Starting plotting progress into temporary dirs: /plotting/tmp and /plotting/tmp2
+ID: {0}
+Plot size is: 32
+Buffer size is: 3400MiB
+Using 128 buckets
+Time for phase 1 = 9174.271 seconds. CPU (175.400%) Wed Jun 30 04:32:17 2021
+Time for phase 2 = 3922.015 seconds. CPU (99.650%) Wed Jun 30 05:37:39 2021
+Time for phase 3 = 8200.500 seconds. CPU (98.120%) Wed Jun 30 07:54:20 2021
+Time for phase 4 = 560.100 seconds. CPU (97.800%) Wed Jun 30 08:03:40 2021
+Total time = 21856.886 seconds. CPU (130.500%) Wed Jun 30 08:03:40 2021
+Copy time = 612.330 seconds. CPU (5.200%) Wed Jun 30 08:13:52 2021
+Renamed final file from "/plots/plot-k32-2021-06-30-02-00-{0}.plot.2.tmp" to "/plots/plot-k32-2021-06-30-02-00-{0}.plot"
+""".format(PLOT_ID)
+
+MADMAX_LOG = """Multi-threaded pipelined Chia k32 plotter - 974d6e5
+Final Directory: /plots/
+Number of Plots: 1
+Crafting plot 1 out of 1
+Process ID: 1234
+Number of Threads: 8
+Working Directory:   /plotting/tmp/
+Working Directory 2: /plotting/ram/
+Plot Name: plot-k32-2021-06-30-02-00-{0}
+[P1] Table 1 took 20.5 sec
+Phase 1 took 1000.1 sec
+Phase 2 took 500.2 sec
+Phase 3 took 800.3 sec, wrote 21877610803 entries to final plot
+Phase 4 took 60.4 sec, final plot size is 108836033428 bytes
+Total plot creation time was 2361.0 sec (39.35 min)
+Started copy to /plots/plot-k32-2021-06-30-02-00-{0}.plot
+Copy to /plots/plot-k32-2021-06-30-02-00-{0}.plot finished, took 300.1 sec, 344.2 MB/s avg.
+""".format(PLOT_ID)
+
+BLADEBIT_LOG = """Bladebit Chia Plotter
+Version      : 2.0.1
+ Output path           : /plots/
+ Temp1 path            : /plotting/tmp/
+ Temp2 path            : /plotting/tmp/
+Generating plot 1 / 1: {0}
+Plot temporary file: /plots/plot-k32-2023-01-03-02-00-{0}.plot.tmp
+Finished Phase 1 in 1200.25 seconds ( 20.0 minutes ).
+Finished Phase 2 in 300.50 seconds ( 5.0 minutes ).
+Finished Phase 3 in 900.75 seconds ( 15.0 minutes ).
+Finished plotting in 2401.50 seconds ( 40.0 minutes ).
+""".format(PLOT_ID)
+
+class TestPlotAnalyzer(unittest.TestCase):
+
+    def test_chia(self):
+        record = plot_analyzer.parse(CHIA_LOG.splitlines())
+        self.assertEqual(record['plotter'], 'chia')
+        self.assertEqual(record['plot_id'], PLOT_ID)
+        self.assertEqual(record['k'], 32)
+        self.assertEqual(record['tmp_dirs'], ['/plotting/tmp', '/plotting/tmp2'])
+        self.assertEqual(record['dst_dir'], '/plots')
+        self.assertEqual(record['phase_seconds'], {'1': 9174.271, '2': 3922.015, '3': 8200.5, '4': 560.1})
+        self.assertEqual(record['total_seconds'], 21856.886)
+        self.assertEqual(record['copy_seconds'], 612.33)
+
+    def test_madmax(self):
+        record = plot_analyzer.parse(MADMAX_LOG.splitlines())
+        self.assertEqual(record['plotter'], 'madmax')
+        self.assertEqual(record['plot_id'], PLOT_ID)
+        self.assertEqual(record['k'], 32)
+        self.assertEqual(record['tmp_dirs'], ['/plotting/tmp/', '/plotting/ram/'])
+        self.assertEqual(record['dst_dir'], '/plots/')
+        self.assertEqual(record['phase_seconds']['3'], 800.3)
+        self.assertEqual(record['total_seconds'], 2361.0)
+        self.assertEqual(record['copy_seconds'], 300.1)
+
+    def test_bladebit(self):
+        record = plot_analyzer.parse(BLADEBIT_LOG.splitlines())
+        self.assertEqual(record['plotter'], 'bladebit')
+        self.assertEqual(record['plot_id'], PLOT_ID)
+        self.assertEqual(record['k'], 32)
+        self.assertEqual(record['tmp_dirs'], ['/plotting/tmp/'])
+        self.assertEqual(record['dst_dir'], '/plots/')
+        self.assertEqual(len(record['phase_seconds']), 3)
+        self.assertEqual(record['total_seconds'], 2401.5)
+
+    def test_unfinished(self):
+        record = plot_analyzer.parse(MADMAX_LOG.splitlines()[:11])
+        self.assertEqual(record['phase_seconds'], {'1': 1000.1})
+        self.assertIsNone(record['total_seconds'])
+
+    def test_analyze_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.log') as f:
+            f.write(CHIA_LOG)
+            f.flush()
+            record = plot_analyzer.analyze_file(f.name)
+        self.assertEqual(record['log_file'], os.path.basename(f.name))
+        self.assertIn("Total: 21856.886 seconds (364.3 minutes)", plot_analyzer.format_text(record))
+
+if __name__ == '__main__':
+    unittest.main()
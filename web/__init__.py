@@ -11,6 +11,10 @@ from sqlalchemy import event
 
 from web.default_settings import DefaultConfig
 
+# Time subprocesses and outbound requests of the modules imported below
+from common.utils import instrumentation
+instrumentation.install_hooks()
+
 from common.config import globals
 
 app = Flask(__name__)
@@ -51,6 +55,8 @@ if __name__ != '__main__':
 
 app.logger.debug("CONTROLLER_HOST={0}".format(app.config['CONTROLLER_HOST']))
 
+instrumentation.instrument(app, 'web')
+
 from web import routes
 
 # Jinja template filters
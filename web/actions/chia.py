@@ -28,7 +28,7 @@ from os import path
 
 from web import app, db, utils
 from common.models import farms as f, plots as p, challenges as c, wallets as w, \
-    blockchains as b, connections as co, keys as k
+    blockchains as b, connections as co, keys as k, peers as pe, workers as wr
 from common.config import globals
 from web.models.chia import FarmSummary, FarmPlots, Wallets, Transactions, \
     Blockchains, Connections, Keys, ChallengesChartData, Summaries
@@ -146,7 +146,12 @@ def load_summaries():
 
 def load_connections(lang='en'):
     connections = db.session.query(co.Connection).all()
-    return Connections(connections, lang)
+    peers = db.session.query(pe.Peer).order_by(pe.Peer.type, pe.Peer.ip).all()
+    # Workers live in their own sqlite db, so resolve displaynames from a single query instead of per row
+    workers = {}
+    for worker in db.session.query(wr.Worker).all():
+        workers[(worker.hostname, worker.blockchain)] = worker
+    return Connections(connections, peers, workers, lang)
 
 def load_keys():
     keys = db.session.query(k.Key).order_by(k.Key.blockchain).all()
@@ -15,11 +15,12 @@ import traceback
 
 from common.models import connections as co
 from common.config import globals
+from common.utils import caches
 from web import app
 
 MAXMIND_LICENSE_FILE = '/root/.chia/machinaris/config/maxmind_license.json'
 MAPBOX_LICENSE_FILE = '/root/.chia/machinaris/config/mapbox_license.json'
-GEOIP_CACHE_FILE = '/root/.chia/machinaris/cache/geoip_cache.json'
+GEOIP_DATABASE_FILE = '/root/.chia/machinaris/config/GeoLite2-City.mmdb'
 
 def load_maxmind_license():
     if not os.path.exists(MAXMIND_LICENSE_FILE):
@@ -32,6 +33,9 @@ def load_maxmind_license():
         app.logger.error(msg)
     return data
 
+def geoip_database_found():
+    return os.path.exists(GEOIP_DATABASE_FILE)
+
 def load_mapbox_license():
     if not os.path.exists(MAPBOX_LICENSE_FILE):
         return None
@@ -57,16 +61,7 @@ def save_settings(maxmind_account, maxmind_license_key, mapbox_access_token):
             app.logger.error("Failed to store Mapbox settings in {0} because {1}".format(MAPBOX_LICENSE_FILE, str(ex)))
 
 def load_geoip_cache():
-    data = {}
-    if os.path.exists(GEOIP_CACHE_FILE):
-        try:
-            with open(GEOIP_CACHE_FILE) as f:
-                data = json.load(f)
-        except Exception as ex:
-            msg = "Unable to read geoip cache from {0} because {1}".format(GEOIP_CACHE_FILE, str(ex))
-            app.logger.error(msg)
-            return data
-    return data
+    return caches.geoip_cache().load()
 
 def generate_marker_hues(connections):
     marker_hues = {}
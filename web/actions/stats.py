@@ -10,20 +10,22 @@ import sqlite3
 import time
 
 from flask import g
-from sqlalchemy import or_, func
+from sqlalchemy import or_, func, select
 from shutil import disk_usage
 from flask_babel import _, lazy_gettext as _l, format_decimal
 
 from common.config import globals
-from common.utils import converters, fiat
+from common.utils import caches, converters, fiat
 from common.models.alerts import Alert
-from common.models.challenges import Challenge
+from common.models.challenges import Challenge, ChallengeHistogram
+from common.models import challenges as c
 from common.models.drives import Drive
 from common.models.farms import Farm
 from common.models.pools import POOLABLE_BLOCKCHAINS
 from common.models.plots import Plot
 from common.models.pools import Pool
 from common.models.partials import Partial
+from common.models.transfers import TransferSample
 from common.models.stats import StatPlotCount, StatPlotsSize, StatTotalCoins, StatNetspaceSize, StatTimeToWin, \
         StatPlotsTotalUsed, StatPlotsDiskUsed, StatPlotsDiskFree, StatPlottingTotalUsed, StatEffort, \
         StatPlottingDiskUsed, StatPlottingDiskFree, StatFarmedBlocks, StatWalletBalances, StatTotalBalance, \
@@ -42,20 +44,59 @@ ALL_TABLES_BY_HOSTNAME = [
 MAX_ALLOWED_PATHS_ON_BAR_CHART = 20
 
 def load_daily_diff(farm_summary):
-    for blockchain in farm_summary.farms:
+    since_date = datetime.datetime.now() - datetime.timedelta(hours=24)
+    blockchains = list(farm_summary.farms.keys())
+    plot_counts = latest_and_day_ago_values(StatPlotCount, blockchains, since_date)
+    plots_sizes = latest_and_day_ago_values(StatPlotsSize, blockchains, since_date)
+    total_coins = None
+    if upgrade_marker_at_least_day_old():  # Guard against spurious notification
+        total_coins = latest_and_day_ago_values(StatTotalCoins, blockchains, since_date)
+    wallet_balances = latest_and_day_ago_values(StatWalletBalances, blockchains, since_date)
+    netspace_sizes = latest_and_day_ago_values(StatNetspaceSize, blockchains, since_date)
+    for blockchain in blockchains:
         summary = {}
-        # initialize defaults
-        since_date = datetime.datetime.now() - datetime.timedelta(hours=24)
-        since_str = since_date.strftime("%Y%m%d%H%M%S")
-        summary['plot_count'] = plot_count_diff(since_str, blockchain).strip()
-        summary['plots_size'] = plots_size_diff(since_str, blockchain).strip()
-        if upgrade_marker_at_least_day_old():  # Guard against spurious notification
-            summary['total_coins'] = total_coin_diff(since_str, blockchain).strip()
-        summary['wallet_balance'] = wallet_balance_diff(since_str, blockchain).strip()
-        summary['netspace_size'] = netspace_size_diff(since_str, blockchain).strip()
+        summary['plot_count'] = plot_count_diff(blockchain, plot_counts).strip()
+        summary['plots_size'] = plots_size_diff(blockchain, plots_sizes).strip()
+        if total_coins is not None:
+            summary['total_coins'] = total_coin_diff(blockchain, total_coins).strip()
+        summary['wallet_balance'] = wallet_balance_diff(blockchain, wallet_balances).strip()
+        summary['netspace_size'] = netspace_size_diff(blockchain, netspace_sizes).strip()
         #app.logger.info("{0} -> {1}".format(blockchain, summary))
         farm_summary.farms[blockchain]['daily_diff'] = summary
 
+# Rows older than this before the day-ago mark are not considered, so each window stays small
+DAILY_DIFF_LOOKBACK_DAYS = 7
+
+def latest_and_day_ago_values(stat_table, blockchains, since_date):
+    """
+    Returns {blockchain: [latest_value, day_ago_value]} for all blockchains with one query.
+    Rows are split at the day-ago mark and numbered newest first within each side, so the
+    first row on each side gives the latest value, and the value as of a day ago.
+    """
+    values = {}
+    if not blockchains:
+        return values
+    since = since_date.strftime("%Y%m%d%H%M%S")
+    lookback = (since_date - datetime.timedelta(days=DAILY_DIFF_LOOKBACK_DAYS)).strftime("%Y%m%d%H%M%S")
+    try:
+        is_before = (stat_table.created_at <= since)
+        recent = select(stat_table.blockchain, stat_table.value, is_before.label('is_before'),
+                func.row_number().over(partition_by=(stat_table.blockchain, is_before),
+                    order_by=stat_table.created_at.desc()).label('row_num')) \
+            .where(stat_table.blockchain.in_(blockchains), stat_table.created_at >= lookback).subquery()
+        query = select(recent.c.blockchain, recent.c.value, recent.c.is_before).where(recent.c.row_num == 1)
+        latest, before = {}, {}
+        for row in db.session.execute(query, bind_arguments={'mapper': stat_table}):
+            if row.is_before:
+                before[row.blockchain] = row.value
+            else:
+                latest[row.blockchain] = row.value
+        for blockchain, value in before.items():  # Nothing newer than a day, so latest is the day-ago row
+            values[blockchain] = [latest.get(blockchain, value), value]
+    except Exception as ex:
+        app.logger.info("Failed to query for day diffs of {0} because {1}".format(stat_table.__tablename__, str(ex)))
+    return values
+
 # On upgrade to v0.8.0, farming directly to cold_wallet started to be tracked.
 # To avoid a spurious notification immediatly upon upgrading, use marker file that must be at least a day old
 def upgrade_marker_at_least_day_old():
@@ -72,29 +113,23 @@ def upgrade_marker_at_least_day_old():
         app.logger.debug("Total coins upgrade just occured.  24 hours until a new total coin value diff generated.")
     return False
 
-def plot_count_diff(since, blockchain):
+def plot_count_diff(blockchain, values):
     result = ''
     try:
-        latest = db.session.query(StatPlotCount).filter(StatPlotCount.blockchain==blockchain).order_by(StatPlotCount.created_at.desc()).limit(1).first()
-        #app.logger.info(latest.value)
-        before = db.session.query(StatPlotCount).filter(StatPlotCount.blockchain==blockchain, StatPlotCount.created_at <= since).order_by(StatPlotCount.created_at.desc()).limit(1).first()
-        #app.logger.info(before.value)
-        if (latest and before) and (latest.value - before.value) != 0:
-            result = ("%+0g " % (latest.value - before.value)) + _('in last day.')
+        latest, before = values.get(blockchain, [None, None])
+        if (latest is not None and before is not None) and (latest - before) != 0:
+            result = ("%+0g " % (latest - before)) + _('in last day.')
     except Exception as ex:
         app.logger.debug("Failed to query for day diff of plot_count because {0}".format(str(ex)))
     #app.logger.info("Result is: {0}".format(result))
     return result
 
-def plots_size_diff(since, blockchain):
+def plots_size_diff(blockchain, values):
     result = ''
     try:
-        latest = db.session.query(StatPlotsSize).filter(StatPlotsSize.blockchain==blockchain).order_by(StatPlotsSize.created_at.desc()).limit(1).first()
-        #app.logger.info(latest.value)
-        before = db.session.query(StatPlotsSize).filter(StatPlotsSize.blockchain==blockchain, StatPlotsSize.created_at <= since).order_by(StatPlotsSize.created_at.desc()).limit(1).first()
-        #app.logger.info(before.value)
-        if (latest and before):
-            gibs = (latest.value - before.value)
+        latest, before = values.get(blockchain, [None, None])
+        if (latest is not None and before is not None):
+            gibs = (latest - before)
             fmtted = converters.gib_to_fmt(gibs)
             if fmtted == "0 B":
                 result = ""
@@ -107,43 +142,36 @@ def plots_size_diff(since, blockchain):
     #app.logger.info("Result is: {0}".format(result))
     return result
 
-def total_coin_diff(since, blockchain):
+def total_coin_diff(blockchain, values):
     result = ''
     try:
-        latest = db.session.query(StatTotalCoins).filter(StatTotalCoins.blockchain==blockchain).order_by(StatTotalCoins.created_at.desc()).limit(1).first()
-        #app.logger.info(latest.value)
-        before = db.session.query(StatTotalCoins).filter(StatTotalCoins.blockchain==blockchain, StatTotalCoins.created_at <= since).order_by(StatTotalCoins.created_at.desc()).limit(1).first()
-        #app.logger.info(before.value)
-        if (latest and before) and (latest.value - before.value) != 0:
-            result = ("%+6g " % (latest.value - before.value)) + _('in last day.')
+        latest, before = values.get(blockchain, [None, None])
+        if (latest is not None and before is not None) and (latest - before) != 0:
+            result = ("%+6g " % (latest - before)) + _('in last day.')
             #app.logger.info("Total coins daily diff: {0}".format(result))
     except Exception as ex:
         app.logger.debug("Failed to query for day diff of total_coin because {0}".format(str(ex)))
     #app.logger.info("Result is: {0}".format(result))
     return result
 
-def wallet_balance_diff(since, blockchain):
+def wallet_balance_diff(blockchain, values):
     result = ''
     try:
-        latest = db.session.query(StatWalletBalances).filter(StatWalletBalances.blockchain==blockchain).order_by(StatWalletBalances.created_at.desc()).limit(1).first()
-        before = db.session.query(StatWalletBalances).filter(StatWalletBalances.blockchain==blockchain, StatWalletBalances.created_at <= since).order_by(StatWalletBalances.created_at.desc()).limit(1).first()
-        if (latest and before) and (latest.value - before.value) != 0:
-            result = ("%+6g " % (latest.value - before.value)) + _('in last day.')
+        latest, before = values.get(blockchain, [None, None])
+        if (latest is not None and before is not None) and (latest - before) != 0:
+            result = ("%+6g " % (latest - before)) + _('in last day.')
             #app.logger.info("Total coins daily diff: {0}".format(result))
     except Exception as ex:
         app.logger.info("Failed to query for day diff of wallet_balances because {0}".format(str(ex)))
     #app.logger.info("Result is: {0}".format(result))
     return result
 
-def netspace_size_diff(since, blockchain):
+def netspace_size_diff(blockchain, values):
     result = ''
     try:
-        latest = db.session.query(StatNetspaceSize).filter(StatNetspaceSize.blockchain==blockchain).order_by(StatNetspaceSize.created_at.desc()).limit(1).first()
-        #app.logger.info(latest.value)
-        before = db.session.query(StatNetspaceSize).filter(StatNetspaceSize.blockchain==blockchain, StatNetspaceSize.created_at <= since).order_by(StatNetspaceSize.created_at.desc()).limit(1).first()
-        #app.logger.info(before.value)
-        if (latest and before):
-            gibs = (latest.value - before.value)
+        latest, before = values.get(blockchain, [None, None])
+        if (latest is not None and before is not None):
+            gibs = (latest - before)
             fmtted = converters.gib_to_fmt(gibs)
             if fmtted == "0 B":
                 result = ""
@@ -226,6 +254,85 @@ def load_recent_disk_usage(disk_type):
                 summary_by_worker[hostname][path] = path_values
     return summary_by_worker
 
+# Archiving throughput is charted per 10 minutes over the last day
+TRANSFER_BUCKET_MINS = 10
+
+# A destination is slow when its per-transfer rate over the last hour is below this share of the farm's median
+SLOW_TRANSFER_RATIO = 0.5
+
+# A destination is saturated when concurrent transfers each get below this share of its best single transfer rate
+SATURATED_TRANSFER_RATIO = 0.5
+
+def load_transfer_throughput():
+    throughput = { 'dates': [], 'destinations': [], 'flags': {} }
+    try:
+        now = datetime.datetime.now()
+        hour_ago = now - datetime.timedelta(hours=1)
+        samples = db.session.query(TransferSample).filter(
+            TransferSample.created_at >= now - datetime.timedelta(days=1)).order_by(TransferSample.created_at).all()
+        rates = {}  # (destination, bucket) -> log file -> rate samples
+        for sample in samples:
+            bucket = sample.created_at.replace(second=0, microsecond=0, 
+                minute=sample.created_at.minute - sample.created_at.minute % TRANSFER_BUCKET_MINS)
+            destination = "{0}:{1}".format(sample.dest_host, sample.dest_path)
+            rates.setdefault((destination, bucket), {}).setdefault(sample.log_file, []).append(sample.rate_mbps)
+        buckets = sorted(set([ bucket for destination, bucket in rates.keys() ]))
+        destinations = sorted(set([ destination for destination, bucket in rates.keys() ]))
+        transfer_rates = []
+        per_destination = {}
+        for (destination, bucket), by_transfer in rates.items():
+            means = [ sum(values) / len(values) for values in by_transfer.values() ]
+            transfer_rates.extend(means)
+            stats = per_destination.setdefault(destination, { 'totals': {}, 'best_single': 0, 'recent': [], 'concurrent': 1 })
+            stats['totals'][bucket] = sum(means)
+            if len(means) == 1:
+                stats['best_single'] = max(stats['best_single'], means[0])
+            if bucket >= hour_ago:
+                stats['recent'].extend(means)
+                stats['concurrent'] = max(stats['concurrent'], len(means))
+        farm_median = sorted(transfer_rates)[len(transfer_rates) // 2] if transfer_rates else 0
+        throughput['dates'] = [ bucket.strftime('%Y-%m-%dT%H:%M') for bucket in buckets ]
+        for destination in destinations:
+            stats = per_destination[destination]
+            throughput['destinations'].append({ 'label': destination, 
+                'values': [ round(stats['totals'][bucket], 1) if bucket in stats['totals'] else 'null' for bucket in buckets ] })
+            if not stats['recent']:
+                continue
+            recent_rate = sum(stats['recent']) / len(stats['recent'])
+            if stats['concurrent'] > 1 and recent_rate < SATURATED_TRANSFER_RATIO * stats['best_single']:
+                status = 'saturated'
+            elif len(destinations) > 1 and recent_rate < SLOW_TRANSFER_RATIO * farm_median:
+                status = 'slow'
+            else:
+                continue
+            throughput['flags'][destination] = { 'status': status, 'rate': round(recent_rate, 1), 
+                'concurrent': stats['concurrent'], 'best_single': round(stats['best_single'], 1), 'median': round(farm_median, 1) }
+    except Exception as ex:
+        app.logger.error("Failed to load archiving throughput because {0}".format(str(ex)))
+    return throughput
+
+def load_capacity_forecast():
+    capacity = { 'disks': [], 'plotters': [], 'farm': {}, 'updated_at': None }
+    try:
+        forecast = caches.capacity_cache().load()
+        if not forecast:
+            return capacity
+        now = datetime.datetime.now()
+        disks = [ disk for disk in forecast.get('disks', {}).values() if disk.get('fill_date') ]
+        for disk in sorted(disks, key=lambda disk: disk['fill_date'])[:MAX_ALLOWED_PATHS_ON_BAR_CHART]:
+            fill_date = datetime.datetime.strptime(disk['fill_date'], '%Y-%m-%d %H:%M')
+            capacity['disks'].append({ 'label': "{0}:{1}".format(disk['hostname'], disk['path']),
+                'days': round(max((fill_date - now).total_seconds() / 86400, 0), 1),
+                'gib_per_day': disk['gib_per_day'], 'free_gib': disk['free_gib'] })
+        for hostname, plotter in sorted(forecast.get('plotters', {}).items()):
+            capacity['plotters'].append({ 'hostname': hostname, 'plots_per_day': plotter.get('plots_per_day'),
+                'timing_plots_per_day': plotter.get('timing_plots_per_day'), 'running_jobs': plotter.get('running_jobs', 0) })
+        capacity['farm'] = forecast.get('farm', {})
+        capacity['updated_at'] = forecast.get('updated_at')
+    except Exception as ex:
+        app.logger.error("Failed to load capacity forecast because {0}".format(str(ex)))
+    return capacity
+
 def load_current_disk_usage(disk_type, hostname=None):
     summary_by_worker = {}
     for host in worker.load_workers():
@@ -341,23 +448,24 @@ def load_plotting_stats():
     #app.logger.info(summary_by_size.keys())
     return summary_by_size
 
-def get_current_effort(blockchain):
-    effort = ''
+def load_current_efforts():
+    efforts = {}
     try:
-        result = db.session.query(StatEffort).filter(StatEffort.blockchain == blockchain).order_by(StatEffort.created_at.desc()).first()
-        if result:
-            effort = "{:.0f}%".format(result.value) # Round to zero as this is a percentage
+        latest = db.session.query(StatEffort.blockchain, func.max(StatEffort.created_at).label('created_at')) \
+            .group_by(StatEffort.blockchain).subquery()
+        query = select(StatEffort.blockchain, StatEffort.value).join(latest, 
+            (StatEffort.blockchain == latest.c.blockchain) & (StatEffort.created_at == latest.c.created_at))
+        for row in db.session.execute(query, bind_arguments={'mapper': StatEffort}):
+            efforts[row.blockchain] = "{:.0f}%".format(row.value) # Round to zero as this is a percentage
     except Exception as ex:
-        app.logger.info("Failed to query effort for {0} because {1}".format(blockchain, str(ex)))
-    #app.logger.info("Effort on {0} is {1}".format(blockchain, effort))
-    return effort
+        app.logger.info("Failed to query current efforts because {0}".format(str(ex)))
+    return efforts
 
-def calc_estimated_daily_value(blockchain):
+def calc_estimated_daily_value(blockchain, farm):
     edv = None
     edv_fiat = None
     result = []
     try:
-        farm = db.session.query(Farm).filter(Farm.blockchain == blockchain).first()
         blocks_per_day = globals.get_blocks_per_day(blockchain)
         if blockchain == 'mmx': # Uses a dynamic reward
             block_reward = worker.mmx_block_reward()
@@ -385,52 +493,87 @@ def calc_estimated_daily_value(blockchain):
         result.append('')
     return result
 
+def count_harvesters():
+    counts = {}
+    for host in worker.load_worker_summary().farmers_harvesters():
+        for wk in host.workers:
+            [online, total] = counts.setdefault(wk['blockchain'], [0, 0])
+            if wk['farming_status'] in ['farming', 'harvesting']: 
+                online += 1
+            counts[wk['blockchain']] = [online, total + 1]
+    return counts
+
+def load_max_response_times():
+    max_times = {}
+    try:
+        for blockchain, time_ms in db.session.query(Challenge.blockchain, func.max(Challenge.time_ms)).group_by(Challenge.blockchain).all():
+            if time_ms is not None:
+                max_times[blockchain] = "{0} {1}".format(format_decimal(round(time_ms / 1000, 2)), _('secs'))
+    except Exception as ex:
+        app.logger.error(ex)
+        app.logger.info("No recent challenge response times found.")
+    return max_times
+
+def load_lookup_latencies():
+    latencies = {}
+    try:
+        today = datetime.datetime.now().strftime('%Y-%m-%d')
+        histograms_by_blockchain = {}
+        for histogram in db.session.query(ChallengeHistogram).filter(ChallengeHistogram.day == today).all():
+            histograms_by_blockchain.setdefault(histogram.blockchain, []).append(histogram)
+        for blockchain, histograms in histograms_by_blockchain.items():
+            counts = c.merge_bucket_counts(histograms)
+            max_ms = max([ histogram.max_ms for histogram in histograms ])
+            pcts = [ c.percentile_ms(counts, pct, max_ms) for pct in [50, 95, 99] ]
+            latencies[blockchain] = {
+                'lookup_pcts': "{0} {1}".format(' / '.join([ format_decimal(round(ms / 1000, 2)) for ms in pcts ]), _('secs')),
+                'slow_lookups': sum([ histogram.slow_count for histogram in histograms ]),
+            }
+    except Exception as ex:
+        app.logger.info("Failed to load challenge lookup latencies because {0}".format(str(ex)))
+    return latencies
+
+def load_partials_per_hour():
+    partials_per_hour = {}
+    try:
+        pooled_blockchains = [row.blockchain for row in db.session.query(Pool.blockchain).distinct().all()]
+        day_ago = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y-%m-%d %H:%M")
+        partial_counts = dict(db.session.query(Partial.blockchain, func.count(Partial.unique_id)) \
+            .filter(Partial.created_at >= day_ago).group_by(Partial.blockchain).all())
+        for blockchain in pooled_blockchains:
+            if blockchain in POOLABLE_BLOCKCHAINS:
+                partials_per_hour[blockchain] = "{0} / {1}".format(format_decimal(round(partial_counts.get(blockchain, 0)/24,2)), _('hour'))
+    except Exception as ex:
+        app.logger.error(ex)
+        app.logger.info("No recent partials submitted.")
+    return partials_per_hour
+
 def load_summary_stats(blockchains):
-    all_farmers = worker.load_worker_summary().farmers_harvesters()
+    harvesters = count_harvesters()
+    max_responses = load_max_response_times()
+    partials_per_hour = load_partials_per_hour()
+    efforts = load_current_efforts()
+    latencies = load_lookup_latencies()
+    farms = {}
+    for farm in db.session.query(Farm).all():
+        farms.setdefault(farm.blockchain, farm)
     stats = {}
     for b in blockchains:
         blockchain = b['blockchain']
-        harvesters = ''
-        try:
-            harvsters_online = 0
-            harvesters_total = 0
-            for host in all_farmers:
-                for wk in host.workers:
-                    if wk['blockchain'] == blockchain:
-                        harvesters_total += 1
-                        #app.logger.info(wk['farming_status'])
-                        if wk['farming_status'] in ['farming', 'harvesting']: 
-                            harvsters_online += 1
-            harvesters = "{0} / {1}".format(harvsters_online, harvesters_total)
-        except Exception as ex:
-            app.logger.error(ex)
-            app.logger.info("No recent challenge response times found for {0}".format(blockchain))
-        max_response = ''
-        try:
-            max_record = db.session.query(Challenge).filter(Challenge.blockchain==blockchain).order_by(Challenge.time_taken.desc()).first()
-            if max_record:  # Strip of 'secs' unit before rounding
-                max_response = "{0} {1}".format(format_decimal(round(float(max_record.time_taken.split()[0]),2)), _('secs'))
-        except Exception as ex:
-            app.logger.error(ex)
-            app.logger.info("No recent challenge response times found for {0}".format(blockchain))
-        partials_per_hour = ''
-        if blockchain in POOLABLE_BLOCKCHAINS:
-            if len(db.session.query(Pool).filter(Pool.blockchain==blockchain).all()) > 0:
-                try:
-                    day_ago = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y-%m-%d %H:%M")
-                    partial_records = db.session.query(Partial).filter(Partial.blockchain==blockchain, Partial.created_at >= day_ago ).order_by(Partial.created_at.desc()).all()
-                    partials_per_hour = "{0} / {1}".format(format_decimal(round(len(partial_records)/24,2)), _('hour'))
-                except Exception as ex:
-                    app.logger.error(ex)
-                    app.logger.info("No recent partials submitted for {0}".format(blockchain))
-        [edv, edv_fiat] = calc_estimated_daily_value(blockchain)
+        if blockchain in harvesters:
+            harvesters_summary = "{0} / {1}".format(harvesters[blockchain][0], harvesters[blockchain][1])
+        else:
+            harvesters_summary = "0 / 0"
+        [edv, edv_fiat] = calc_estimated_daily_value(blockchain, farms.get(blockchain))
         stats[blockchain] = {
-            'harvesters': harvesters,
-            'max_resp': max_response,
-            'partials_per_hour': partials_per_hour,
+            'harvesters': harvesters_summary,
+            'max_resp': max_responses.get(blockchain, ''),
+            'lookup_pcts': latencies.get(blockchain, {}).get('lookup_pcts', ''),
+            'slow_lookups': latencies.get(blockchain, {}).get('slow_lookups', 0),
+            'partials_per_hour': partials_per_hour.get(blockchain, ''),
             'edv': edv,
             'edv_fiat': edv_fiat,
-            'effort':  get_current_effort(blockchain)
+            'effort':  efforts.get(blockchain, '')
         }
     return stats
 
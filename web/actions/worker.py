@@ -22,7 +22,7 @@ from flask_babel import _, lazy_gettext as _l
 from web import app, db, utils
 from common.config import globals
 from common.models import alerts, blockchains, challenges, connections, farms, \
-    keys, plots, plottings, plotnfts, pools, wallets, workers
+    keys, peers, plots, plottings, plotnfts, pools, wallets, workers
 from web.models.worker import WorkerSummary, WorkerWarning
 from web.actions import stats
 
@@ -31,6 +31,7 @@ ALL_TABLES_BY_HOSTNAME_AND_BLOCKCHAIN = [
     blockchains.Blockchain,
     challenges.Challenge,
     connections.Connection,
+    peers.Peer,
     farms.Farm, 
     keys.Key,
     plots.Plot,
@@ -45,6 +45,9 @@ class DefaultConfig:
     CONTROLLER_HOST = os.environ['controller_host'] if 'controller_host' in os.environ else 'localhost'
     CONTROLLER_PORT = os.environ['controller_api_port'] if 'controller_api_port' in os.environ else '8926'
 
+    # Allow a request with ?profile=1 to write a sampled profile of itself, see common/utils/instrumentation.py
+    PROFILING_ENABLED = 'profiling_enabled' in os.environ and os.environ['profiling_enabled'].lower() == 'true'
+
     MAX_CHART_CHALLENGES_MINS = 15
 
     # Note, babel looks in /machinaris/web/translations with this path.
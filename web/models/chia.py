@@ -17,12 +17,11 @@ from flask_babel import _, lazy_gettext as _l, format_decimal
 from web import app
 from web.actions import worker as w, mapping
 from common.config import globals
-from common.utils import converters, fiat
+from common.utils import caches, converters, fiat
 
 # Treat *.plot files smaller than this as in-transit (copying) so don't count them
 MINIMUM_K32_PLOT_SIZE_BYTES = 100 * 1024 * 1024
 
-BLOCKCHAIN_STATUSES_CACHE_FILE = '/root/.chia/machinaris/cache/blockchain_statuses_cache.json'
 
 class Summaries:
 
@@ -120,6 +119,8 @@ class Summaries:
                 'plots': plots,
                 'harvesters': harvesters, 
                 'max_resp': max_resp, 
+                'lookup_pcts': blockchain_stats.get('lookup_pcts', '') if blockchain_stats else '',
+                'slow_lookups': blockchain_stats.get('slow_lookups', 0) if blockchain_stats else 0,
                 'partials_per_hour': partials_per_hour,
                 'edv': edv, 
                 'edv_fiat': edv_fiat,
@@ -337,7 +338,10 @@ class ChallengesChartData:
             if not host_chain in datasets:
                 datasets[host_chain] = {}
             dataset = datasets[host_chain]
-            dataset[created_at] = float(challenge.time_taken.split()[0]) # Drop off the 'secs'
+            if challenge.time_ms is not None:
+                dataset[created_at] = challenge.time_ms / 1000
+            else:
+                dataset[created_at] = float(challenge.time_taken.split()[0]) # Drop off the 'secs'
         # Now build a sparse array with null otherwise
         self.data = {}
         for key in datasets.keys():
@@ -596,15 +600,7 @@ class Blockchains:
             self.rows.append(row) 
     
     def load_atb_blockchain_statuses(self):
-        data = {}
-        if os.path.exists(BLOCKCHAIN_STATUSES_CACHE_FILE):
-            try:
-                with open(BLOCKCHAIN_STATUSES_CACHE_FILE) as f:
-                    data = json.load(f)
-            except Exception as ex:
-                msg = "Unable to read ATB blockchain status cache from {0} because {1}".format(BLOCKCHAIN_STATUSES_CACHE_FILE, str(ex))
-                print(msg)
-        return data
+        return caches.chain_statuses_cache().load()
     
     def extract_status(self, blockchain, details, worker_status):
         if worker_status == 'Responding':
@@ -663,18 +659,20 @@ class Blockchains:
 
 class Connections:
 
-    def __init__(self, connections, lang):
+    def __init__(self, connections, peers, workers, lang):
         self.rows = []
         self.blockchains = {}
         geoip_cache = mapping.load_geoip_cache()
+        peers_by_worker = {}
+        for peer in peers:
+            peers_by_worker.setdefault((peer.hostname, peer.blockchain), []).append(peer)
         for connection in connections:
             worker_status = None
-            try:
-                app.logger.debug("Found worker with hostname '{0}'".format(connection.hostname))
-                worker = w.get_worker(connection.hostname, connection.blockchain)
+            worker = workers.get((connection.hostname, connection.blockchain))
+            if worker:
                 worker_status = worker.connection_status()
                 displayname = worker.displayname
-            except:
+            else:
                 app.logger.info("Connections.init(): Unable to find a worker with hostname '{0}'".format(connection.hostname))
                 displayname = connection.hostname
             try:
@@ -689,11 +687,35 @@ class Connections:
                 'farmer_port': farmer_port,
                 'details': connection.details
             })
-            if connection.blockchain == 'mmx':
+            if (connection.hostname, connection.blockchain) in peers_by_worker or not connection.details:
+                self.blockchains[connection.blockchain] = self.load_peers(
+                    peers_by_worker.get((connection.hostname, connection.blockchain), []), geoip_cache, lang)
+            elif connection.blockchain == 'mmx':
                 self.blockchains[connection.blockchain] = self.parse_mmx(connection, connection.blockchain, geoip_cache, lang)
             else:
                 self.blockchains[connection.blockchain] = self.parse_chia(connection, connection.blockchain, geoip_cache, lang)
         self.rows.sort(key=lambda conn: conn['blockchain'])
+
+    def load_peers(self, peers, geoip_cache, lang):
+        conns = []
+        for peer in peers:
+            connection = {
+                'type': peer.type,
+                'ip': peer.ip,
+                'ports': "{0}/{1}".format(peer.peer_port, peer.peer_server_port),
+                'nodeid': peer.node_id,
+                'last_connect': peer.last_message_at.replace(microsecond=0) if peer.last_message_at else '',
+                'mib_up': round((peer.bytes_up or 0) / (1024 * 1024), 1),
+                'mib_down': round((peer.bytes_down or 0) / (1024 * 1024), 1),
+                'height': peer.height if peer.height else '',
+                'hash': peer.hash[2:10] if peer.hash else '',
+            }
+            try:
+                self.set_geolocation(geoip_cache, connection, lang)
+            except:
+                traceback.print_exc()
+            conns.append(connection)
+        return conns
     
     def get_geoname_for_lang(self, ip, location, lang):
         lang_codes = [ lang, ]
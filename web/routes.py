@@ -13,7 +13,7 @@ from flask import Flask, flash, redirect, render_template, abort, escape, \
 from flask_babel import _, lazy_gettext as _l
 
 from common.config import globals
-from common.utils import fiat
+from common.utils import fiat, instrumentation, metrics, pagecache
 from common.models import pools as po, plots as pl
 from web import app, utils
 from web.actions import chia, pools as p, plotman, chiadog, worker, \
@@ -39,6 +39,16 @@ def get_lang(request):
         app.logger.info("LOCALE: Request had no Accept-Language header, returning default locale of 'en'")
         return "en" 
 
+# Dashboards auto-reload every 120 seconds, so rebuild at least that often
+page_cache = pagecache.PageCache(max_age_secs=120)
+
+def cached_view_model(page, build):
+    accept = request.headers.get('Accept-Language', '')
+    def build_in_context():  # Rebuilds may run in a background thread, outside this request
+        with app.test_request_context(headers={'Accept-Language': accept}):
+            return build()
+    return page_cache.get(page, (get_lang(request), request.args.get('blockchain')), build_in_context)
+
 def find_selected_worker(hosts, hostname, blockchain= None):
     if len(hosts) == 0:
         return None
@@ -71,6 +81,12 @@ def index():
         return redirect(url_for('setup'))
     if not utils.is_controller():
         return redirect(url_for('controller'))
+    model = cached_view_model('index', load_index_model)
+    warnings.check_warnings(request.args)
+    return render_template('index.html', reload_seconds=120, farms=model['farms'], \
+        plotting=model['plotting'], workers=model['workers'], global_config=gc, selected_blockchain=model['selected_blockchain'])
+
+def load_index_model():
     workers = worker.load_worker_summary()
     farm_summary = chia.load_farm_summary()
     plotting = plotman.load_plotting_summary_by_blockchains(farm_summary.farms.keys())
@@ -79,9 +95,7 @@ def index():
     p.partials_chart_data(farm_summary)
     stats.load_daily_diff(farm_summary)
     stats.wallet_chart_data(farm_summary)
-    warnings.check_warnings(request.args)
-    return render_template('index.html', reload_seconds=120, farms=farm_summary.farms, \
-        plotting=plotting, workers=workers, global_config=gc, selected_blockchain=selected_blockchain)
+    return { 'farms': farm_summary.farms, 'plotting': plotting, 'workers': workers, 'selected_blockchain': selected_blockchain }
 
 @app.route('/chart')
 def chart():
@@ -119,8 +133,10 @@ def summary():
     gc = globals.load()
     if request.method == 'POST':
         fiat.save_local_currency(request.form.get('local_currency'))
+        page_cache.invalidate('summary')
+        page_cache.invalidate('index')
         flash(_("Saved local currency setting."), 'success')
-    summaries = chia.load_summaries()
+    summaries = cached_view_model('summary', chia.load_summaries)
     fullnodes = worker.get_fullnodes_by_blockchain()
     return render_template('summary.html', reload_seconds=120, summaries=summaries, global_config=gc,
         exchange_rates=fiat.load_exchange_rates_cache(), local_currency=fiat.get_local_currency(), 
@@ -198,11 +214,12 @@ def plotting_transfers():
         return redirect(url_for('plotting_transfers')) # Force a redirect to allow time to update status
     plotters = plotman.load_plotters()
     transfers = plotman.load_archiving_summary()
+    throughput = stats.load_transfer_throughput()
     disk_usage = stats.load_current_disk_usage('plots')
     farmers = chia.load_farmers()
     stats.set_disk_usage_per_farmer(farmers, disk_usage)
     return render_template('plotting/transfers.html', plotters=plotters, farmers=farmers, transfers=transfers, 
-        disk_usage=disk_usage, global_config=gc, lang=get_lang(request), reload_seconds=120)
+        throughput=throughput, disk_usage=disk_usage, global_config=gc, lang=get_lang(request), reload_seconds=120)
 
 @app.route('/plotting/workers')
 def plotting_workers():
@@ -210,8 +227,9 @@ def plotting_workers():
     plotters = plotman.load_plotters()
     disk_usage = stats.load_recent_disk_usage('plotting')
     mem_usage = stats.load_recent_mem_usage('plotting')
+    capacity = stats.load_capacity_forecast()
     return render_template('plotting/workers.html', plotters=plotters, 
-        disk_usage=disk_usage, mem_usage=mem_usage, global_config=gc, lang=get_lang(request))
+        disk_usage=disk_usage, mem_usage=mem_usage, capacity=capacity, global_config=gc, lang=get_lang(request))
 
 @app.route('/farming/plots', methods=['GET', 'POST'])
 def farming_plots():
@@ -413,7 +431,7 @@ def connections():
                 app.logger.info(_("Unknown form action") + ": {0}".format(request.form))
     connections = chia.load_connections(lang=get_lang(request))
     return render_template('connections.html', reload_seconds=120, selected_blockchain = selected_blockchain,
-        maxmind_license = mapping.load_maxmind_license(), mapbox_license = mapping.load_mapbox_license(), marker_hues=mapping.generate_marker_hues(connections),
+        maxmind_license = mapping.load_maxmind_license(), geoip_database = mapping.geoip_database_found(), mapbox_license = mapping.load_mapbox_license(), marker_hues=mapping.generate_marker_hues(connections),
         connections=connections, global_config=gc, lang=get_lang(request))
 
 @app.route('/settings/plotting', methods=['GET', 'POST'])
@@ -600,6 +618,12 @@ def transactions():
     return render_template('transactions.html', transactions=trans, blockchain=blockchain, wallets=wallets,
         selected_wallet_id=selected_wallet_id, reload_seconds=120, global_config=gc, lang=get_lang(request)) 
 
+@app.route('/metrics')
+def request_metrics():
+    response = make_response(instrumentation.openmetrics('web'), 200)
+    response.headers['Content-Type'] = metrics.OPENMETRICS_CONTENT_TYPE
+    return response
+
 @app.route('/favicon.ico')
 def favicon():
     return send_from_directory(os.path.join(app.root_path, 'static'),